@@ -0,0 +1,621 @@
+# Importing the necessary libraries
+import argparse # to choose the benchmarks from the command line
+import asyncio # to send many requests to the node server at the same time
+import cProfile # to profile the methods of the blockchain
+import hashlib # for data hashing
+import json # for data serialization
+import os # to build the paths of the exported files
+import platform # to describe the machine in the results
+import pstats # to read the collected profile
+import random # to make the synthetic data reproducible
+import tempfile # for the directory of the exported chain
+import threading # to run the node server next to the load generator
+import aiohttp # to send requests to the node server
+import time # to measure the duration of the benchmarks
+import tracemalloc # to measure the memory used by objects
+import upchain # the blockchain being measured
+
+# Function for creating a synthetic address from a seed of the seeded generator, so that the data is the same in every run
+def make_address():
+    return upchain.derive_address(random.randbytes(upchain.ADDRESS_SEED_SIZE), 0)
+
+# Function for creating a list of synthetic transactions
+def make_transactions(count):
+    # We send small amounts between generated addresses
+    return [upchain.Transaction(make_address(), make_address(), i, 1, None) for i in range(count)]
+
+# Function for measuring the hash rate of the nonce loop that serializes the whole block for every nonce
+def legacy_hash_rate(transactions, duration):
+    # The transactions are serialized together with the block as dictionaries
+    transaction_data = [transaction.to_dict() for transaction in transactions]
+    timestamp = time.time()
+    nonce = 0
+    start_time = time.time()
+    # We hash as many nonces as possible during the given time
+    while time.time() - start_time < duration:
+        for _ in range(1000):
+            nonce += 1
+            block_string = json.dumps([1, timestamp, transaction_data, "0" * 64, nonce], sort_keys=True).encode()
+            hashlib.sha256(block_string).hexdigest()
+    # Returning the number of hashes per second
+    return nonce / (time.time() - start_time)
+
+# Function for measuring the hash rate of the nonce loop that reuses the hashed header prefix
+def midstate_hash_rate(transactions, duration):
+    # The transactions are included in the header by their Merkle root
+    header_prefix = upchain.block_header_prefix(1, time.time(), upchain.calculate_merkle_root([transaction.hash for transaction in transactions]), "0" * 64, upchain.INITIAL_TARGET)
+    midstate = hashlib.sha256(header_prefix)
+    nonce = 0
+    start_time = time.time()
+    # We hash as many nonces as possible during the given time
+    while time.time() - start_time < duration:
+        for _ in range(1000):
+            nonce += 1
+            block_hash = midstate.copy()
+            block_hash.update(upchain.UINT64.pack(nonce))
+            block_hash.hexdigest()
+    # Returning the number of hashes per second
+    return nonce / (time.time() - start_time)
+
+# Function for comparing the hash rate of both nonce loops for blocks of different sizes
+def benchmark_hash_rate(transaction_counts=(0, 10, 100, 1000), duration=1.0):
+    results = []
+    # We measure both loops for every block size
+    for count in transaction_counts:
+        transactions = make_transactions(count)
+        legacy = legacy_hash_rate(transactions, duration)
+        midstate = midstate_hash_rate(transactions, duration)
+        results.append({"transactions": count, "legacy_hashes_per_second": legacy, "midstate_hashes_per_second": midstate, "speedup": midstate / legacy})
+        print(f"{count} transactions: legacy {legacy:.0f} H/s, midstate {midstate:.0f} H/s, speedup x{midstate / legacy:.1f}")
+    # Returning the results of all measurements
+    return results
+
+# Function for building a synthetic chain of mined blocks, the transactions of every block can be given by a function of its index
+def make_chain(length, transactions_per_block=1, difficulty=1, block_transactions=None):
+    # The genesis block gets a low difficulty so that long chains are built quickly
+    target = 16 ** (64 - difficulty) - 1
+    # The chain ends at the current time, because blocks from the future are rejected
+    start_time = int(time.time()) - length * upchain.TARGET_BLOCK_INTERVAL
+    genesis_block = upchain.Block(0, start_time, [upchain.Transaction("0", make_address(), upchain.MAX_SUPPLY, 0, None)], "0", 0, "0", target)
+    genesis_block.hash = genesis_block.calculate_hash()
+    chain = [genesis_block]
+    for index in range(1, length):
+        transactions = block_transactions(index) if block_transactions else make_transactions(transactions_per_block)
+        # The blocks follow each other exactly at the desired interval, so the target of the genesis block stays unchanged
+        timestamp = start_time + index * upchain.TARGET_BLOCK_INTERVAL
+        previous_hash = chain[-1].hash
+        merkle_root = upchain.calculate_merkle_root([transaction.hash for transaction in transactions])
+        # We search for the nonce that satisfies the target
+        nonce = 0
+        hash = upchain.calculate_block_hash(index, timestamp, merkle_root, previous_hash, target, nonce)
+        while not upchain.meets_target(hash, target):
+            nonce += 1
+            hash = upchain.calculate_block_hash(index, timestamp, merkle_root, previous_hash, target, nonce)
+        chain.append(upchain.Block(index, timestamp, transactions, previous_hash, nonce, hash, target))
+    # Returning the list of blocks
+    return chain
+
+# Function for measuring the time of full chain validation for different chain lengths and numbers of processes
+def benchmark_validation(lengths=(1000, 10000), worker_counts=(1, 2, 4), difficulty=1):
+    results = []
+    for length in lengths:
+        chain = make_chain(length, difficulty=difficulty)
+        for workers in worker_counts:
+            validator = upchain.ChainValidator(workers=workers)
+            # We start the pool in advance so that its start is not measured
+            if workers > 1:
+                validator.get_pool()
+            start_time = time.time()
+            valid = validator.validate(chain, 1)
+            elapsed = time.time() - start_time
+            validator.close()
+            results.append({"blocks": length, "workers": workers, "seconds": elapsed, "blocks_per_second": length / elapsed, "valid": valid})
+            print(f"{length} blocks, {workers} workers: {elapsed:.3f} s, {length / elapsed:.0f} blocks/s")
+    # Returning the results of all measurements
+    return results
+
+# Function for comparing the start of a node by replaying the whole exported chain and by bootstrapping from a snapshot
+def benchmark_bootstrap(length=10000, transactions_per_block=10, replayed_blocks=100, format="binary"):
+    chain = make_chain(length, transactions_per_block)
+    path = os.path.join(tempfile.mkdtemp(), f"chain.{format}")
+    with open(path, "wb") as output:
+        upchain.write_blocks(chain, output, format)
+    # The node that replays and checks all blocks
+    replaying_node = upchain.Blockchain()
+    imported, replay_seconds = timed(lambda: replaying_node.import_chain(path, format))
+    # The node that takes the state from a snapshot and replays only the last blocks
+    snapshot = replaying_node.create_snapshot(length - 1 - replayed_blocks)
+    bootstrapping_node = upchain.Blockchain()
+    with open(path, "rb") as input:
+        message, bootstrap_seconds = timed(lambda: bootstrapping_node.bootstrap(snapshot, upchain.read_blocks(input, format), snapshot["hash"]))
+    results = {"blocks": length, "imported": imported, "replay_seconds": replay_seconds, "bootstrap_seconds": bootstrap_seconds, "speedup": replay_seconds / bootstrap_seconds, "message": message}
+    print(f"{length} blocks: replay {replay_seconds:.3f} s, bootstrap {bootstrap_seconds:.3f} s, speedup x{replay_seconds / bootstrap_seconds:.1f}")
+    # Returning the results of the measurement
+    return results
+
+# Function for sending requests to one path of the node server from many clients for the given time
+async def generate_load(url, concurrency, duration):
+    latencies = []
+    errors = 0
+    async with aiohttp.ClientSession(headers={"Accept-Encoding": "gzip"}) as session:
+        # Every client sends the next request as soon as it has the answer to the previous one
+        async def client(deadline):
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start_time = time.perf_counter()
+                async with session.get(url) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                latencies.append(time.perf_counter() - start_time)
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(client(deadline) for _ in range(concurrency)))
+    return latencies, errors
+
+# Function for measuring the requests per second and the latency of the read endpoints of the node server
+def benchmark_server(length=1000, concurrency=32, duration=3.0, port=18080):
+    # We serve a synthetic chain without checking it again
+    blockchain = upchain.Blockchain()
+    blockchain.rollback_to(-1)
+    for block in make_chain(length, transactions_per_block=10):
+        blockchain.append_block(block)
+    address = blockchain.chain[1].transactions[0].recipient
+    # The server runs in its own thread with its own event loop
+    server = upchain.NodeServer(blockchain, "127.0.0.1", port)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    paths = {
+        "height": "/height",
+        "chain": f"/chain?from={length // 2}&limit={upchain.CHAIN_PAGE_SIZE}",
+        "block": f"/blocks/{blockchain.chain[length // 2].hash}",
+        "balance": f"/balance/{address}"
+    }
+    results = []
+    for name, path in paths.items():
+        latencies, errors = asyncio.run(generate_load(f"http://127.0.0.1:{port}{path}", concurrency, duration))
+        latencies.sort()
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+        results.append({"endpoint": name, "requests": len(latencies), "errors": errors, "requests_per_second": len(latencies) / duration, "p99_seconds": p99})
+        print(f"{name}: {len(latencies) / duration:.0f} requests/s, p99 {p99 * 1000:.1f} ms, {errors} errors")
+    # We stop the server and its event loop
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    # Returning the results of all measurements
+    return results
+
+# Function for running reader and writer threads next to the miner and checking that no accepted transfer is lost
+def stress_concurrency(readers=8, writers=4, duration=5.0, data_dir=None):
+    blockchain = upchain.Blockchain(data_dir)
+    creator = blockchain.chain[0].transactions[0].recipient
+    stop = threading.Event()
+    accepted = [] # hashes of the accepted transfers
+    spent = [] # coins spent by the accepted transfers together with their commissions
+    errors = [] # inconsistencies seen by the readers
+    reads = [0] * readers # number of reads made by every reader
+    # The miner mines blocks all the time
+    def mine():
+        while not stop.is_set():
+            blockchain.mine_block()
+    # Every writer sends transfers with growing amounts from the creator address to its own address, so that all transfers differ
+    def write(recipient):
+        amount = 0
+        while not stop.is_set():
+            amount += 1
+            result = blockchain.transfer_coins(creator, recipient, amount, 1)
+            # Accepted transfers return their hash, rejected ones return a shorter error message
+            if len(result) == 64:
+                accepted.append(result)
+                spent.append(amount + 1)
+    # Every reader checks that what it reads belongs to one state of the chain
+    def read(number):
+        while not stop.is_set():
+            try:
+                height, last_block = blockchain.read(lambda: (len(blockchain.chain) - 1, blockchain.get_last_block()))
+                if last_block.index != height:
+                    errors.append(f"last block {last_block.index} at height {height}")
+                if blockchain.get_available_balance(creator) < 0:
+                    errors.append("negative available balance")
+                headers = blockchain.get_headers([blockchain.chain[0].hash], 50)["headers"]
+                if any(header["previous_hash"] != previous_header["hash"] for previous_header, header in zip(headers, headers[1:])):
+                    errors.append("headers are not linked")
+                if accepted:
+                    hash = accepted[-1]
+                    transaction = blockchain.get_transaction_by_hash(hash)
+                    if transaction is not None and transaction.hash != hash:
+                        errors.append("wrong transaction found by hash")
+                # The check of our chain runs while blocks are added and checks only the blocks that it saw
+                if not blockchain.is_valid():
+                    errors.append("valid chain reported as invalid")
+            except Exception as error:
+                errors.append(repr(error))
+            reads[number] += 1
+    threads = [threading.Thread(target=mine)]
+    threads += [threading.Thread(target=write, args=(make_address(),)) for _ in range(writers)]
+    threads += [threading.Thread(target=read, args=(number,)) for number in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    # We mine the remaining transfers and check that every accepted transfer reached the chain
+    while len(blockchain.mempool):
+        blockchain.mine_block()
+    lost = [hash for hash in accepted if blockchain.get_transaction_by_hash(hash) is None]
+    results = {
+        "blocks": len(blockchain.chain),
+        "accepted_transfers": len(accepted),
+        "lost_transfers": len(lost),
+        "reads": sum(reads),
+        "errors": errors[:10],
+        "balance_matches": blockchain.get_balance(creator) == upchain.MAX_SUPPLY - sum(spent),
+        "valid": blockchain.is_valid(blockchain.chain)
+    }
+    blockchain.miner.close()
+    print(f"{results['blocks']} blocks, {len(accepted)} transfers, {len(lost)} lost, {sum(reads)} reads, {len(errors)} errors")
+    # Returning the results of the run
+    return results
+
+# Defining a dictionary-backed transaction with a JSON hash, as transactions were stored before, for comparison
+class DictTransaction:
+    # Class constructor
+    def __init__(self, sender, recipient, amount, fee, data):
+        self.sender = sender
+        self.recipient = recipient
+        self.amount = amount
+        self.fee = fee
+        self.data = data
+        self.hash = hashlib.sha256(json.dumps(self.__dict__, sort_keys=True).encode()).hexdigest()
+
+# Function for measuring the duration of a function
+def timed(function):
+    start_time = time.time()
+    result = function()
+    return result, time.time() - start_time
+
+# Function for measuring the memory left allocated by a function
+def allocated(function):
+    # If the profiler is already tracing, then we measure the growth of its traced memory and leave the tracing on
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    memory = tracemalloc.get_traced_memory()[0]
+    result = function()
+    memory = tracemalloc.get_traced_memory()[0] - memory
+    if started:
+        tracemalloc.stop()
+    return result, memory
+
+# Function for comparing memory footprint, encoding, hashing and decoding of transactions
+def benchmark_serialization(count=1000000):
+    # A small set of addresses is enough, the strings are shared by all transactions
+    addresses = [make_address() for _ in range(100)]
+    fields = [(addresses[i % 100], addresses[(i + 1) % 100], i, i % 10, None) for i in range(count)]
+    # We measure the memory of both kinds of transactions, and then the time of their creation
+    dict_memory = allocated(lambda: [DictTransaction(*values) for values in fields])[1]
+    slots_memory = allocated(lambda: [upchain.Transaction(*values) for values in fields])[1]
+    dict_seconds = timed(lambda: [DictTransaction(*values) for values in fields])[1]
+    transactions, slots_seconds = timed(lambda: [upchain.Transaction(*values) for values in fields])
+    # We measure the encoding, hashing and decoding
+    encoded, binary_encode_seconds = timed(lambda: [transaction.to_bytes() for transaction in transactions])
+    json_encode_seconds = timed(lambda: [json.dumps(transaction.to_dict(), sort_keys=True).encode() for transaction in transactions])[1]
+    hash_seconds = timed(lambda: [hashlib.sha256(data).hexdigest() for data in encoded])[1]
+    decode_seconds = timed(lambda: [upchain.Transaction.from_bytes(data) for data in encoded])[1]
+    results = {
+        "transactions": count,
+        "dict_bytes_per_transaction": dict_memory / count,
+        "slots_bytes_per_transaction": slots_memory / count,
+        "dict_create_seconds": dict_seconds,
+        "slots_create_seconds": slots_seconds,
+        "json_encode_seconds": json_encode_seconds,
+        "binary_encode_seconds": binary_encode_seconds,
+        "binary_bytes_per_transaction": sum(len(data) for data in encoded) / count,
+        "hash_seconds": hash_seconds,
+        "decode_seconds": decode_seconds
+    }
+    for name, value in results.items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
+    # Returning the results of all measurements
+    return results
+
+# Methods of the blockchain that are profiled when profiling is turned on
+PROFILED_METHODS = ["mine_block", "add_block", "append_block", "get_balance", "get_available_balance", "get_startup_by_name", "get_nft_by_name", "get_token_by_name", "get_dapp_by_name", "get_transaction_by_hash", "get_history", "is_valid", "sync_chain", "transfer_coins", "import_chain", "export_chain"]
+
+# Defining the class that profiles chosen methods of a class while it is active
+class MethodProfiler:
+    # Class constructor
+    def __init__(self, owner, method_names, mode=None, limit=20):
+        self.owner = owner # class whose methods are profiled
+        self.method_names = method_names # names of the profiled methods
+        self.mode = mode # "cprofile" for the time of the functions, "tracemalloc" for the allocated memory, None to measure nothing
+        self.limit = limit # number of the heaviest functions or lines in the report
+        self.originals = {} # original methods replaced while the profiler is active
+        self.profiles = [] # time profiles of all threads that called the methods
+        self.local = threading.local() # number of profiled calls in progress in the current thread, so that nested calls are counted once, and the time profile of the thread
+        self.lock = threading.Lock() # lock for the profiles, the counters and the peaks shared by the threads
+        self.calls = 0 # number of profiled outermost calls
+        self.started = False # whether the profiler started the tracing of memory itself and has to stop it
+        self.snapshot = None # memory snapshot of the blockchain module taken when the profiler is left
+        self.peaks = {} # number of calls and the largest additional memory used by one call of every method
+
+    # Method for replacing the methods with wrappers that turn the measurement on around every call
+    def __enter__(self):
+        if self.mode is None:
+            return self
+        if self.mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started = True
+        for name in self.method_names:
+            self.originals[name] = self.owner.__dict__[name]
+            setattr(self.owner, name, self.wrap(name, self.originals[name]))
+        return self
+
+    # Method for creating the wrapper of a method
+    def wrap(self, name, method):
+        def wrapper(*args, **kwargs):
+            local = self.local
+            local.depth = getattr(local, "depth", 0) + 1
+            outermost = local.depth == 1
+            if outermost:
+                with self.lock:
+                    self.calls += 1
+            if outermost and self.mode == "cprofile":
+                # A profile measures only the thread that enabled it, so every thread gets its own one and they are merged in the report
+                if not hasattr(local, "profile"):
+                    local.profile = cProfile.Profile()
+                    with self.lock:
+                        self.profiles.append(local.profile)
+                local.profile.enable()
+            elif outermost:
+                # We measure the peak of the memory used during the call above the memory used before it, the memory of the whole process when several threads run at once
+                tracemalloc.reset_peak()
+                memory = tracemalloc.get_traced_memory()[0]
+            try:
+                return method(*args, **kwargs)
+            finally:
+                local.depth -= 1
+                if outermost and self.mode == "cprofile":
+                    local.profile.disable()
+                elif outermost:
+                    with self.lock:
+                        calls, peak = self.peaks.get(name, (0, 0))
+                        self.peaks[name] = (calls + 1, max(peak, tracemalloc.get_traced_memory()[1] - memory))
+        return wrapper
+
+    # Method for restoring the original methods
+    def __exit__(self, *exception):
+        for name, method in self.originals.items():
+            setattr(self.owner, name, method)
+        self.originals = {}
+        # We keep only the memory allocated by the lines of the blockchain module
+        if self.mode == "tracemalloc" and tracemalloc.is_tracing():
+            self.snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, upchain.__file__)])
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+
+    # Method to get the heaviest functions or lines of code
+    def report(self):
+        # A benchmark that called none of the methods has nothing to report
+        if self.mode == "cprofile" and not self.calls:
+            return []
+        if self.mode == "cprofile":
+            stats = pstats.Stats(*self.profiles)
+            entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.limit]
+            return [{"function": f"{path}:{line}({function})", "calls": calls, "total_seconds": total, "cumulative_seconds": cumulative} for (path, line, function), (_, calls, total, cumulative, _) in entries]
+        if self.mode == "tracemalloc" and self.snapshot is not None:
+            return {
+                "methods": {name: {"calls": calls, "peak_bytes": peak} for name, (calls, peak) in self.peaks.items()},
+                "lines": [{"line": str(statistic.traceback), "bytes": statistic.size, "blocks": statistic.count} for statistic in self.snapshot.statistics("lineno")[:self.limit]]
+            }
+        return None
+
+# Function for building a blockchain with a synthetic chain of the given number of transactions between a fixed set of addresses
+def make_blockchain(transaction_count, transactions_per_block=1000, address_count=1000, entity_interval=100):
+    addresses = [make_address() for _ in range(address_count)]
+    names = {kind: [] for kind in ("startup", "nft", "token", "dapp")}
+    # Every block gets the next part of the transactions, every hundredth of them registers a startup, an NFT, a token or a DApp
+    def block_transactions(index):
+        transactions = []
+        for number in range((index - 1) * transactions_per_block, min(index * transactions_per_block, transaction_count)):
+            sender = addresses[number % address_count]
+            if number % entity_interval == 0:
+                kind = list(names)[number // entity_interval % len(names)]
+                name = f"{kind}-{number}"
+                names[kind].append(name)
+                data = {f"{kind}_name": name, "token_symbol": f"T{number}"} if kind == "token" else {f"{kind}_name": name}
+                transactions.append(upchain.Transaction(sender, upchain.BURN_ADDRESS, 0, upchain.NFT_FEE, data))
+            else:
+                transactions.append(upchain.Transaction(sender, addresses[(number * 7 + 1) % address_count], number % 1000 + 1, 1, None))
+        return transactions
+    chain = make_chain(-(-transaction_count // transactions_per_block) + 1, block_transactions=block_transactions)
+    # The blocks are appended without checking, the checking itself is measured separately
+    blockchain = upchain.Blockchain()
+    blockchain.rollback_to(-1)
+    for block in chain:
+        blockchain.append_block(block)
+    return {"blockchain": blockchain, "transactions": transaction_count, "addresses": addresses, "names": names}
+
+# Function for measuring the latency of calls of a function with the given arguments
+def latency(function, arguments):
+    samples = []
+    for argument in arguments:
+        start_time = time.perf_counter()
+        function(argument)
+        samples.append(time.perf_counter() - start_time)
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "mean_us": sum(samples) / len(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(int(len(samples) * 0.99), len(samples) - 1)] * 1e6
+    }
+
+# Function for measuring the latency of balance queries
+def benchmark_balance(fixture, calls=10000):
+    blockchain = fixture["blockchain"]
+    addresses = [random.choice(fixture["addresses"]) for _ in range(calls)]
+    results = {"get_balance": latency(blockchain.get_balance, addresses), "get_available_balance": latency(blockchain.get_available_balance, addresses)}
+    for name, result in results.items():
+        print(f"{name}: mean {result['mean_us']:.2f} us, p99 {result['p99_us']:.2f} us")
+    return results
+
+# Function for measuring the latency of the lookups of startups, NFTs, tokens, DApps and transactions
+def benchmark_lookups(fixture, calls=10000):
+    blockchain = fixture["blockchain"]
+    getters = {"startup": blockchain.get_startup_by_name, "nft": blockchain.get_nft_by_name, "token": blockchain.get_token_by_name, "dapp": blockchain.get_dapp_by_name}
+    results = {}
+    for kind, getter in getters.items():
+        if fixture["names"][kind]:
+            results[f"get_{kind}_by_name"] = latency(getter, [random.choice(fixture["names"][kind]) for _ in range(calls)])
+    # The transactions are looked up in the last blocks, which are in the cache of a block store
+    transaction_hashes = [transaction.hash for block in blockchain.chain[-10:] for transaction in block.transactions]
+    results["get_transaction_by_hash"] = latency(blockchain.get_transaction_by_hash, [random.choice(transaction_hashes) for _ in range(calls)])
+    for name, result in results.items():
+        print(f"{name}: mean {result['mean_us']:.2f} us, p99 {result['p99_us']:.2f} us")
+    return results
+
+# Function for measuring the latency of pages of address histories, from the newest page and from a page deep in the history
+def benchmark_history(fixture, calls=1000, limit=upchain.HISTORY_PAGE_SIZE):
+    blockchain = fixture["blockchain"]
+    results = {}
+    # The burn address receives every entity registration, so it has the longest history
+    for name, address, kind in [("address", random.choice(fixture["addresses"]), None), ("burn_address", upchain.BURN_ADDRESS, None), ("burn_address_nft", upchain.BURN_ADDRESS, "nft")]:
+        locations = blockchain.chain_index.get_address_locations(address, kind)
+        middle = "%d:%d" % locations[len(locations) // 2] if locations else None
+        results[name] = {
+            "history_length": len(locations),
+            "first_page": latency(lambda cursor: blockchain.get_history(address, cursor, limit, kind), [None] * calls),
+            "middle_page": latency(lambda cursor: blockchain.get_history(address, cursor, limit, kind), [middle] * calls)
+        }
+        print(f"get_history {name} ({len(locations)} transactions): first page {results[name]['first_page']['mean_us']:.2f} us, middle page {results[name]['middle_page']['mean_us']:.2f} us")
+    return results
+
+# Function for measuring the throughput of the full check of the chain
+def benchmark_is_valid(fixture):
+    blockchain = fixture["blockchain"]
+    valid, seconds = timed(lambda: blockchain.is_valid(blockchain.chain))
+    blockchain.validator.close()
+    results = {"blocks": len(blockchain.chain), "seconds": seconds, "blocks_per_second": len(blockchain.chain) / seconds, "transactions_per_second": fixture["transactions"] / seconds, "valid": valid}
+    print(f"is_valid: {seconds:.3f} s, {fixture['transactions'] / seconds:.0f} transactions/s")
+    return results
+
+# Function for measuring the synchronization of an empty node with a local node server
+def benchmark_sync(fixture, port=18081):
+    # The node with the synthetic chain runs in its own thread with its own event loop
+    server = upchain.NodeServer(fixture["blockchain"], "127.0.0.1", port)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    blockchain = upchain.Blockchain()
+    blockchain.add_node(f"http://127.0.0.1:{port}")
+    message, seconds = timed(blockchain.sync_chain)
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    results = {"blocks": len(blockchain.chain), "seconds": seconds, "transactions_per_second": fixture["transactions"] / seconds, "synchronized": blockchain.get_last_block().hash == fixture["blockchain"].get_last_block().hash, "message": message}
+    print(f"sync_chain: {seconds:.3f} s, {fixture['transactions'] / seconds:.0f} transactions/s")
+    return results
+
+# Function for measuring the hash rate reached by mine_block
+def benchmark_mining(blocks=5):
+    blockchain = upchain.Blockchain()
+    for _ in range(blocks):
+        blockchain.mine_block()
+    stats = blockchain.get_mining_stats()
+    blockchain.miner.close()
+    results = {"blocks": blocks, "hashes_per_second": stats["local_hash_rate"], "mining": stats["mining"], "difficulty": stats["difficulty"]}
+    print(f"mine_block: {stats['local_hash_rate']:.0f} H/s")
+    return results
+
+# Function for measuring the bulk generation of addresses into a file and the search for addresses with a prefix
+def benchmark_addresses(count=100000, prefix="abcd"):
+    generator = upchain.AddressGenerator()
+    path = os.path.join(tempfile.mkdtemp(), "addresses.txt")
+    with open(path, "wb") as output:
+        generator.generate(count, output)
+    bulk_rate = generator.rate
+    address, seed, index, vanity_rate = generator.find_vanity(prefix)
+    generator.close()
+    os.remove(path)
+    results = {"count": count, "addresses_per_second": bulk_rate, "prefix": prefix, "attempts": index + 1, "attempts_per_second": vanity_rate}
+    print(f"generate: {bulk_rate:.0f} addresses/s, find_vanity {prefix!r}: {vanity_rate:.0f} attempts/s after {index + 1} attempts")
+    return results
+
+# Benchmarks measured on a synthetic chain of every size
+SIZED_BENCHMARKS = {
+    "balance": benchmark_balance,
+    "lookups": benchmark_lookups,
+    "history": benchmark_history,
+    "validation": benchmark_is_valid,
+    "serialization": lambda fixture: benchmark_serialization(fixture["transactions"]),
+    "sync": benchmark_sync
+}
+
+# Benchmarks that build their own data
+OTHER_BENCHMARKS = {
+    "mining": benchmark_mining,
+    "addresses": benchmark_addresses,
+    "hash_rate": benchmark_hash_rate,
+    "validation_workers": benchmark_validation,
+    "bootstrap": benchmark_bootstrap,
+    "server": benchmark_server,
+    "stress": stress_concurrency
+}
+
+# Function for running a benchmark with the chosen profiling and recording its result
+def run_benchmark(name, function, profile, size=None):
+    print(f"== {name}" + (f" ({size} transactions)" if size else ""))
+    with MethodProfiler(upchain.Blockchain, PROFILED_METHODS, profile) as profiler:
+        result, seconds = timed(function)
+    entry = {"benchmark": name, "size": size, "seconds": seconds, "result": result}
+    if profile:
+        entry["profile"] = profiler.report()
+    return entry
+
+# Function for writing the results to a JSON file, replacing the previous file only when the new one is completely written
+def write_results(results, path):
+    with open(path + ".tmp", "w") as output:
+        json.dump(results, output, indent=2)
+    os.replace(path + ".tmp", path)
+
+# Function for running the chosen benchmarks for all sizes of the synthetic chain, writing the results after every benchmark if a path is given
+def run_suite(sizes=(1000, 10000, 100000), names=None, profile=None, seed=0, output=None):
+    names = names or list(SIZED_BENCHMARKS) + list(OTHER_BENCHMARKS)
+    # The same seed gives the same synthetic addresses and samples
+    random.seed(seed)
+    results = {
+        "metadata": {"time": time.time(), "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(), "seed": seed, "sizes": list(sizes), "profile": profile},
+        "results": []
+    }
+    # The results of the finished benchmarks are kept even if a later benchmark fails
+    def record(entry):
+        results["results"].append(entry)
+        if output:
+            write_results(results, output)
+    for size in sizes:
+        if any(name in SIZED_BENCHMARKS for name in names):
+            fixture = make_blockchain(size)
+            for name in names:
+                if name in SIZED_BENCHMARKS:
+                    record(run_benchmark(name, lambda: SIZED_BENCHMARKS[name](fixture), profile, size))
+    for name in names:
+        if name in OTHER_BENCHMARKS:
+            record(run_benchmark(name, OTHER_BENCHMARKS[name], profile))
+    return results
+
+# Running the benchmarks
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the upchain hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="numbers of transactions in the synthetic chains, up to 1000000")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(SIZED_BENCHMARKS) + list(OTHER_BENCHMARKS), help="benchmarks to run, all by default")
+    parser.add_argument("--profile", choices=["cprofile", "tracemalloc"], help="profile the methods of the blockchain during the benchmarks")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data")
+    parser.add_argument("--output", help="path of the JSON file with the results")
+    arguments = parser.parse_args()
+    # The results are written as JSON so that they can be compared between releases
+    run_suite(arguments.sizes, arguments.benchmarks, arguments.profile, arguments.seed, arguments.output)
@@ -0,0 +1,45 @@
+# Making the modules of the project importable from the tests
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import upchain
+
+GENESIS_TARGET = 2 ** 248 # easy target of the test chains, so that their blocks are mined at once
+CREATOR = "c" * 64 # address that receives all coins in the genesis block of the test chains
+
+
+# Function for mining a block on top of a blockchain in this process
+def mine(blockchain, timestamp, transactions):
+    last_block = blockchain.get_last_block()
+    target = blockchain.get_next_target()
+    block = upchain.Block(last_block.index + 1, timestamp, transactions, last_block.hash, 0, None, target)
+    block.hash = block.calculate_hash()
+    while not upchain.meets_target(block.hash, target):
+        block.nonce += 1
+        block.hash = block.calculate_hash()
+    return block
+
+
+# Function for creating a node whose chain consists of the given blocks, kept in a block store if a directory is given
+def make_node(blocks, data_dir=None):
+    blockchain = upchain.Blockchain(data_dir)
+    blockchain.rollback_to(-1)
+    blockchain.append_block(blocks[0])
+    for block in blocks[1:]:
+        assert blockchain.add_block(block)
+    return blockchain
+
+
+# Function for creating a chain that ends in the past, whose blocks follow each other at the desired interval, transfer coins and register NFTs
+def make_chain(length):
+    start_time = time.time() - length * upchain.TARGET_BLOCK_INTERVAL
+    genesis_block = upchain.Block(0, start_time, [upchain.Transaction("0", CREATOR, upchain.MAX_SUPPLY, 0, None)], "0", 0, None, GENESIS_TARGET)
+    genesis_block.hash = genesis_block.calculate_hash()
+    blockchain = make_node([genesis_block])
+    for index in range(1, length):
+        transactions = [upchain.Transaction(CREATOR, f"{index:064x}", index * 1000, 1, None), upchain.Transaction(CREATOR, upchain.BURN_ADDRESS, 0, upchain.NFT_FEE, {"nft_name": f"nft {index}"})]
+        assert blockchain.add_block(mine(blockchain, start_time + index * upchain.TARGET_BLOCK_INTERVAL, transactions))
+    return list(blockchain.chain)
@@ -0,0 +1,68 @@
+# Tests of submitting batches of transfers
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+import upchain
+
+RECIPIENT = "a" * 64 # address that receives the transfers of the tests
+
+
+# Malformed items get their own error and do not stop the other transfers of the batch
+def test_malformed_items_are_rejected_one_by_one():
+    blockchain = upchain.Blockchain()
+    sender = blockchain.get_last_block().transactions[0].recipient
+    results = blockchain.submit_batch([
+        (sender, RECIPIENT, 10, 1),
+        (["not", "hashable"], RECIPIENT, 10, 1),
+        (None, RECIPIENT, 10, 1),
+        (sender, RECIPIENT, 10),
+        "transfer",
+        None,
+        (sender, RECIPIENT, 10 ** 400, 1),
+        (sender, RECIPIENT, float("nan"), 1),
+        (sender, RECIPIENT, True, 1),
+        (sender, RECIPIENT, 20, 1)
+    ])
+    assert results[0] == upchain.Transaction(sender, RECIPIENT, 10, 1, None).hash
+    assert results[1:3] == ["Invalid sender or recipient address"] * 2
+    assert results[3:6] == ["Invalid transfer"] * 3
+    assert results[6:9] == ["Invalid amount or fee"] * 3
+    assert results[9] == upchain.Transaction(sender, RECIPIENT, 20, 1, None).hash
+    assert len(blockchain.mempool) == 2
+
+
+# A transaction has no nonce, so a row identical to an earlier row of the batch is the same transaction and is rejected as a duplicate
+def test_identical_rows_are_duplicates():
+    blockchain = upchain.Blockchain()
+    sender = blockchain.get_last_block().transactions[0].recipient
+    available = blockchain.get_available_balance(sender)
+    results = blockchain.submit_batch([(sender, RECIPIENT, 10, 1), (sender, RECIPIENT, 10, 1), (sender, RECIPIENT, 10, 2), (sender, RECIPIENT, upchain.MAX_SUPPLY + 1, 1), (sender, RECIPIENT, 10, -1)])
+    assert results[0] == upchain.Transaction(sender, RECIPIENT, 10, 1, None).hash
+    assert results[1] == "Duplicate transaction"
+    assert results[2] == upchain.Transaction(sender, RECIPIENT, 10, 2, None).hash
+    assert results[3:] == ["Invalid amount or fee"] * 2
+    # The rejected duplicate does not reduce the available balance of the sender
+    assert blockchain.get_available_balance(sender) == available - 11 - 12
+    assert blockchain.submit_batch([]) == []
+
+
+# Over HTTP an item with a missing or null field is rejected alone instead of failing the whole request
+def test_http_batch_with_null_sender():
+    blockchain = upchain.Blockchain()
+    sender = blockchain.get_last_block().transactions[0].recipient
+    batch = [{"sender": sender, "recipient": RECIPIENT, "amount": 10, "fee": 1}, {"sender": None, "recipient": RECIPIENT, "amount": 10, "fee": 1}, {"sender": sender}, ["list"]]
+    async def scenario():
+        runner = web.AppRunner(upchain.NodeServer(blockchain).create_app())
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post("http://127.0.0.1:%d/transactions" % runner.addresses[0][1], json=batch) as response:
+                    return response.status, await response.json()
+        finally:
+            await runner.cleanup()
+    status, data = asyncio.run(scenario())
+    assert status == 200
+    assert data["results"] == [upchain.Transaction(sender, RECIPIENT, 10, 1, None).hash, "Invalid sender or recipient address", "Invalid sender or recipient address", "Invalid transfer"]
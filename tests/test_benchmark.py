@@ -0,0 +1,41 @@
+# Tests of the profiling of the benchmark suite
+import threading
+import time
+
+import pytest
+
+import benchmark
+
+THREADS = 4 # number of threads that call the profiled method at the same time
+CALLS = 20 # number of calls made by every thread
+
+
+# Defining a class whose method takes long enough for the calls of the threads to overlap
+class Worker:
+    # Method that waits for a moment
+    def work(self):
+        time.sleep(0.002)
+        return [0] * 100
+
+
+# The calls of all threads are measured, not only those of the first thread that entered a profiled method
+@pytest.mark.parametrize("mode", ["cprofile", "tracemalloc"])
+def test_profiler_measures_all_threads(mode):
+    worker = Worker()
+    start = threading.Barrier(THREADS)
+    def call():
+        start.wait()
+        for _ in range(CALLS):
+            worker.work()
+    with benchmark.MethodProfiler(Worker, ["work"], mode) as profiler:
+        threads = [threading.Thread(target=call) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert profiler.calls == THREADS * CALLS
+    report = profiler.report()
+    if mode == "cprofile":
+        assert {entry["function"].rsplit(":", 1)[1]: entry["calls"] for entry in report}[f"{Worker.work.__code__.co_firstlineno}(work)"] == THREADS * CALLS
+    else:
+        assert report["methods"]["work"]["calls"] == THREADS * CALLS
@@ -0,0 +1,115 @@
+# Tests of exporting and importing chains and of starting nodes from snapshots
+import pytest
+
+import upchain
+from conftest import CREATOR, make_chain, make_node
+
+CHAIN_LENGTH = 12 # number of blocks in the exported chain
+SNAPSHOT_HEIGHT = 8 # height of the snapshot from which the nodes start
+
+
+# The chain of the node that exports its blocks and creates the snapshot
+@pytest.fixture(scope="module")
+def chain():
+    return make_chain(CHAIN_LENGTH)
+
+
+# Function for getting the balances of a node without the zero balances that removed blocks may leave
+def get_balances(blockchain):
+    return {address: balance for address, balance in blockchain.ledger.balances.items() if balance}
+
+
+# Function for writing blocks to a file in the given format
+def export(blocks, path, format):
+    with open(path, "wb") as output:
+        upchain.write_blocks(blocks, output, format)
+    return str(path)
+
+
+# Function for starting a node from a snapshot and the blocks of a file
+def bootstrap(blockchain, snapshot, path, format, expected_hash):
+    with open(path, "rb") as input:
+        return blockchain.bootstrap(snapshot, upchain.read_blocks(input, format), expected_hash)
+
+
+# An exported chain is imported by a new node with the same blocks and balances, in both formats
+@pytest.mark.parametrize("format", ["ndjson", "binary"])
+def test_export_import_round_trip(chain, tmp_path, format):
+    exporter = make_node(chain)
+    path = str(tmp_path / "chain")
+    assert exporter.export_chain(path, format=format) == CHAIN_LENGTH
+    importer = upchain.Blockchain()
+    assert importer.import_chain(path, format) == CHAIN_LENGTH
+    assert [block.hash for block in importer.chain] == [block.hash for block in chain]
+    assert get_balances(importer) == get_balances(exporter)
+    # A second import skips the blocks that the node already has
+    assert importer.import_chain(path, format) == 0
+
+
+# The import stops at the first block that is not valid
+def test_import_stops_at_invalid_block(chain, tmp_path):
+    blocks = list(chain)
+    forged = upchain.Block.from_dict(blocks[5].to_dict())
+    forged.nonce += 1
+    forged.hash = forged.calculate_hash()
+    blocks[5] = forged
+    importer = upchain.Blockchain()
+    assert importer.import_chain(export(blocks, tmp_path / "chain", "binary"), "binary") == 5
+    assert len(importer.chain) == 5
+
+
+# A node started from a trusted snapshot has the state of a node that replayed the whole chain, and replays only the blocks after the snapshot
+@pytest.mark.parametrize("format", ["ndjson", "binary"])
+def test_bootstrap_from_trusted_snapshot(chain, tmp_path, format):
+    exporter = make_node(chain)
+    snapshot = exporter.create_snapshot(SNAPSHOT_HEIGHT)
+    blockchain = upchain.Blockchain()
+    assert bootstrap(blockchain, snapshot, export(chain, tmp_path / "chain", format), format, snapshot["hash"]) == "Chain bootstrapped from the snapshot"
+    assert [block.hash for block in blockchain.chain] == [block.hash for block in chain]
+    assert get_balances(blockchain) == get_balances(exporter)
+    assert blockchain.ledger.get_supply() == exporter.ledger.get_supply()
+    assert blockchain.get_nft_by_name("nft 3") == exporter.get_nft_by_name("nft 3")
+    assert blockchain.validated_height == SNAPSHOT_HEIGHT
+    assert blockchain.is_valid()
+
+
+# A node with a block store keeps the bootstrapped chain after a restart
+def test_bootstrap_into_block_store(chain, tmp_path):
+    snapshot = make_node(chain).create_snapshot(SNAPSHOT_HEIGHT)
+    path = export(chain, tmp_path / "chain", "binary")
+    data_dir = str(tmp_path / "node")
+    blockchain = upchain.Blockchain(data_dir)
+    assert bootstrap(blockchain, snapshot, path, "binary", snapshot["hash"]) == "Chain bootstrapped from the snapshot"
+    blockchain.chain.close()
+    restarted = upchain.Blockchain(data_dir)
+    assert [block.hash for block in restarted.chain] == [block.hash for block in chain]
+
+
+# A snapshot with forged balances is rejected even with its hash recalculated, and the node keeps its chain
+def test_bootstrap_rejects_forged_snapshot(chain, tmp_path):
+    snapshot = make_node(chain).create_snapshot(SNAPSHOT_HEIGHT)
+    forged = dict(snapshot, balances=dict(snapshot["balances"], **{"e" * 64: 10 ** 12}))
+    forged["hash"] = upchain.calculate_snapshot_hash(forged)
+    path = export(chain, tmp_path / "chain", "binary")
+    blockchain = upchain.Blockchain()
+    genesis_hash = blockchain.chain[0].hash
+    # The hash of the forged snapshot is not the trusted one
+    assert bootstrap(blockchain, forged, path, "binary", snapshot["hash"]) == "Invalid snapshot"
+    # Even a trusted hash does not make balances that do not add up to the supply acceptable
+    assert bootstrap(blockchain, forged, path, "binary", forged["hash"]) == "Invalid snapshot"
+    assert [block.hash for block in blockchain.chain] == [genesis_hash]
+
+
+# Blocks before the snapshot without valid proof of work are rejected and the node keeps its chain
+def test_bootstrap_rejects_blocks_without_work(chain, tmp_path):
+    snapshot = make_node(chain).create_snapshot(SNAPSHOT_HEIGHT)
+    blocks = list(chain)
+    # The block is given a target that every hash satisfies, the hash matches its fields but the block has no work
+    forged = upchain.Block.from_dict(blocks[3].to_dict())
+    forged.target = upchain.MAX_TARGET
+    forged.hash = forged.calculate_hash()
+    blocks[3] = forged
+    blockchain = make_node(chain[:4])
+    assert bootstrap(blockchain, snapshot, export(blocks, tmp_path / "chain", "binary"), "binary", snapshot["hash"]) == "Blocks do not match the snapshot"
+    assert [block.hash for block in blockchain.chain] == [block.hash for block in chain[:4]]
+    assert blockchain.get_balance(CREATOR) == make_node(chain[:4]).get_balance(CREATOR)
@@ -0,0 +1,56 @@
+# Tests of changing and reading the blockchain from many threads at once
+import threading
+import time
+
+import benchmark
+import upchain
+
+STRESS_DURATION = 3.0 # time in seconds for which the threads mine, send transfers and read
+LONG_READS = 5 # number of long reads made while the blockchain is changed
+LONG_READ_SECONDS = 0.05 # duration of one long read, much longer than the gaps between the changes
+
+
+# Transfers accepted while blocks are mined and the chain is read all reach the chain, and the readers see only consistent states
+def test_stress_keeps_transfers_and_balances():
+    results = benchmark.stress_concurrency(readers=4, writers=4, duration=STRESS_DURATION)
+    assert results["accepted_transfers"] > 0
+    assert results["blocks"] > 1
+    assert results["lost_transfers"] == 0
+    assert results["balance_matches"]
+    assert results["valid"]
+    assert results["errors"] == []
+
+
+# A read that takes longer than the gaps between changes still finishes while other threads change the blockchain all the time
+def test_long_read_finishes_under_constant_writes():
+    blockchain = upchain.Blockchain()
+    creator = blockchain.chain[0].transactions[0].recipient
+    stop = threading.Event()
+    def write(recipient):
+        amount = 0
+        while not stop.is_set():
+            amount += 1
+            blockchain.transfer_coins(creator, recipient, amount, 1)
+    writers = [threading.Thread(target=write, args=(f"{number:064x}",)) for number in range(2)]
+    for writer in writers:
+        writer.start()
+    results = []
+    def read():
+        for _ in range(LONG_READS):
+            results.append(blockchain.read(lambda: (time.sleep(LONG_READ_SECONDS), len(blockchain.chain), len(blockchain.mempool))[1:]))
+    reader = threading.Thread(target=read)
+    try:
+        # The writers must be changing the blockchain while the reads run
+        while len(blockchain.mempool) < 10:
+            time.sleep(0.01)
+        reader.start()
+        reader.join(LONG_READS * LONG_READ_SECONDS * (upchain.READ_ATTEMPTS + 1) * 2)
+        finished = not reader.is_alive()
+    finally:
+        # Without the writers even a starved reader finishes
+        stop.set()
+        for writer in writers:
+            writer.join()
+        reader.join()
+    assert finished
+    assert all(length == 1 and pending > 0 for length, pending in results)
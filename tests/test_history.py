@@ -0,0 +1,90 @@
+# Tests of the paged transaction histories of addresses
+import pytest
+
+import upchain
+from conftest import CREATOR, make_chain, make_node
+
+CHAIN_LENGTH = 12 # number of blocks in the chain of the tests
+FORK_HEIGHT = 6 # height of the last block that stays in the chain after the reorganization
+
+
+# A node whose chain transfers coins and registers an NFT in every block after the genesis block
+@pytest.fixture
+def blockchain():
+    return make_node(make_chain(CHAIN_LENGTH))
+
+
+# Function for getting the locations of all pages of a history by following the cursors
+def read_pages(blockchain, address, limit, kind=None):
+    pages = []
+    cursor = None
+    while True:
+        history = blockchain.get_history(address, cursor, limit, kind)
+        pages.append([(entry["height"], entry["position"]) for entry in history["transactions"]])
+        cursor = history["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+# Following the cursors gives every transaction of the address once, from the newest to the oldest, whatever the page size
+@pytest.mark.parametrize("limit", [1, 3, 4, 100])
+def test_cursor_round_trip(blockchain, limit):
+    pages = read_pages(blockchain, CREATOR, limit)
+    locations = [location for page in pages for location in page]
+    expected = sorted(blockchain.chain_index.get_address_locations(CREATOR), reverse=True)
+    assert locations == expected
+    assert all(len(page) == limit for page in pages[:-1]) and 0 < len(pages[-1]) <= limit
+    # The returned transactions are the ones at the returned locations
+    history = blockchain.get_history(CREATOR, limit=2)
+    assert [entry["transaction"].hash for entry in history["transactions"]] == [blockchain.chain[height].transactions[position].hash for height, position in expected[:2]]
+    # A cursor at the start of the history gives an empty last page
+    assert blockchain.get_history(CREATOR, f"{expected[-1][0]}:{expected[-1][1]}") == {"transactions": [], "next_cursor": None}
+
+
+# The kind filter keeps only the transactions that register an entity of that kind
+def test_kind_filter(blockchain):
+    locations = [location for page in read_pages(blockchain, CREATOR, 4, "nft") for location in page]
+    assert locations == [(height, 1) for height in range(CHAIN_LENGTH - 1, 0, -1)]
+    assert all(blockchain.chain[height].transactions[position].data["nft_name"] == f"nft {height}" for height, position in locations)
+    assert blockchain.get_history(CREATOR, kind="token") == {"transactions": [], "next_cursor": None}
+    # The recipients of the transfers have no registrations
+    assert blockchain.get_history(f"{3:064x}", kind="nft")["transactions"] == []
+    assert [entry["height"] for entry in blockchain.get_history(f"{3:064x}")["transactions"]] == [3]
+
+
+# Cursors, kinds and page sizes that are not valid are rejected
+@pytest.mark.parametrize("cursor, limit, kind, error", [
+    ("5", 10, None, "Invalid cursor"),
+    ("5:1:2", 10, None, "Invalid cursor"),
+    ("a:b", 10, None, "Invalid cursor"),
+    (5, 10, None, "Invalid cursor"),
+    (None, 0, None, "Invalid limit"),
+    (None, "10", None, "Invalid limit"),
+    (None, 10, "coin", "Invalid kind")
+])
+def test_invalid_arguments(blockchain, cursor, limit, kind, error):
+    assert blockchain.get_history(CREATOR, cursor, limit, kind) == error
+
+
+# Removing blocks in a reorganization truncates the histories, drops addresses that appeared only in the removed blocks, and adding the blocks back restores them
+def test_reorganization_truncates_history(blockchain):
+    blocks = list(blockchain.chain)
+    full_history = read_pages(blockchain, CREATOR, 100)
+    removed_address = f"{FORK_HEIGHT + 1:064x}"
+    blockchain.rollback_to(FORK_HEIGHT)
+    assert [location for page in read_pages(blockchain, CREATOR, 100) for location in page] == [location for location in full_history[0] if location[0] <= FORK_HEIGHT]
+    assert [height for height, position in blockchain.chain_index.get_address_locations(CREATOR, "nft")] == list(range(1, FORK_HEIGHT + 1))
+    assert removed_address not in blockchain.chain_index.addresses
+    assert (removed_address, "nft") not in blockchain.chain_index.address_kinds
+    assert blockchain.get_history(removed_address) == {"transactions": [], "next_cursor": None}
+    for block in blocks[FORK_HEIGHT + 1:]:
+        assert blockchain.add_block(block)
+    assert read_pages(blockchain, CREATOR, 100) == full_history
+
+
+# Only the entries of the given height are removed from the end of a history, and an emptied history is dropped
+def test_unindex_history():
+    histories = {"a": [(1, 0), (2, 0), (3, 0), (3, 1)], "b": [(3, 0)], "c": [(2, 0)]}
+    for key in "abcd":
+        upchain.ChainIndex.unindex_history(histories, key, 3)
+    assert histories == {"a": [(1, 0), (2, 0)], "c": [(2, 0)]}
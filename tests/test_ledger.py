@@ -0,0 +1,112 @@
+# Tests of the confirmed balances and the supply index of the ledger
+import pytest
+
+import upchain
+from conftest import CREATOR, make_chain, make_node
+
+BURN_THRESHOLD = 15 # number of burned coins after which the test ledgers stop burning
+AMOUNT = 100000 # amount of the test transfers, of which BURN_RATE burns 10 coins
+SNAPSHOT_INTERVAL = 4 # number of blocks after which the test nodes save their state
+CHAIN_LENGTH = 11 # number of blocks in the chains of the tests
+
+
+# The chain whose blocks are applied and reverted by the tests
+@pytest.fixture(scope="module")
+def chain():
+    return make_chain(CHAIN_LENGTH)
+
+
+# Function for creating a block with the given transactions, the ledger does not check its hash or its work
+def make_block(index, transactions):
+    return upchain.Block(index, 0, transactions, "0", 0, None, upchain.INITIAL_TARGET)
+
+
+# Function for getting the balances of a ledger without the zero balances that reverted blocks may leave
+def get_balances(ledger):
+    return {address: balance for address, balance in ledger.balances.items() if balance}
+
+
+# Transfers burn their share of the amount until the threshold, a block crossing it burns only the rest, and nothing is burned after it
+def test_burns_stop_at_threshold(monkeypatch):
+    monkeypatch.setattr(upchain, "BURN_THRESHOLD", BURN_THRESHOLD)
+    ledger = upchain.Ledger()
+    ledger.apply_block(make_block(0, [upchain.Transaction("0", CREATOR, upchain.MAX_SUPPLY, 0, None)]))
+    transfer = upchain.Transaction(CREATOR, "a" * 64, AMOUNT, 1, None)
+    assert ledger.get_burns(make_block(1, [transfer]), 0) == [int(AMOUNT * upchain.BURN_RATE)]
+    # Coins issued by the chain are never burned
+    assert ledger.get_burns(make_block(1, [upchain.Transaction("0", CREATOR, AMOUNT, 0, None)]), 0) == [0]
+    ledger.apply_block(make_block(1, [transfer]))
+    assert ledger.get_supply()["burned"] == 10
+    # The second transfer burns only the 5 coins left below the threshold and the third burns nothing
+    block = make_block(2, [upchain.Transaction(CREATOR, "b" * 64, AMOUNT, 1, None), upchain.Transaction(CREATOR, "d" * 64, AMOUNT, 1, None)])
+    assert ledger.get_burns(block, 10) == [5, 0]
+    ledger.apply_block(block)
+    assert ledger.get_supply()["burned"] == BURN_THRESHOLD
+    assert ledger.get_balance("b" * 64) == AMOUNT - 5 and ledger.get_balance("d" * 64) == AMOUNT
+    assert ledger.get_balance(upchain.BURN_ADDRESS) == BURN_THRESHOLD
+    # The commissions of transfers to the burning address count towards the threshold even though they are burned whole
+    registration = upchain.Transaction(CREATOR, upchain.BURN_ADDRESS, 0, 20, {"nft_name": "name"})
+    assert ledger.get_burns(make_block(3, [registration, transfer]), 0) == [0, 0]
+
+
+# Reverting blocks and applying them again gives the same supply totals, work and balances after every block
+def test_revert_and_apply_round_trip(chain):
+    ledger = upchain.Ledger()
+    states = []
+    for block in chain:
+        ledger.apply_block(block)
+        states.append((ledger.get_supply(), ledger.get_work(), get_balances(ledger)))
+    assert states[-1][0]["burned"] > states[1][0]["burned"]
+    for block in reversed(chain[3:]):
+        ledger.revert_block(block)
+        assert (ledger.get_supply(), ledger.get_work(), get_balances(ledger)) == states[block.index - 1]
+    for block in chain[3:]:
+        ledger.apply_block(block)
+        assert (ledger.get_supply(), ledger.get_work(), get_balances(ledger)) == states[block.index]
+    assert ledger.supply == [tuple(state[0][key] for key in ("mined", "burned", "fees")) for state in states]
+
+
+# The supply is known after every block of a chain replayed from the genesis block, and not beyond it
+def test_supply_at_historical_heights(chain):
+    blockchain = make_node(chain)
+    ledger = blockchain.ledger
+    assert ledger.get_supply(0) == {"height": 0, "mined": upchain.MAX_SUPPLY, "burned": 0, "fees": 0, "circulating": upchain.MAX_SUPPLY}
+    for height in range(1, CHAIN_LENGTH):
+        supply = ledger.get_supply(height)
+        # Every block pays one coin of commission for its transfer and registers a name, whose commission is burned
+        assert supply["fees"] == height
+        assert supply["burned"] == sum(upchain.NFT_FEE + int(index * 1000 * upchain.BURN_RATE) for index in range(1, height + 1))
+        assert supply["circulating"] == supply["mined"] - supply["burned"] - supply["fees"]
+    assert ledger.get_supply() == ledger.get_supply(CHAIN_LENGTH - 1)
+    assert ledger.get_supply(CHAIN_LENGTH) is None and ledger.get_supply(-1) is None
+
+
+# A node restored from its snapshot knows the supply only from the snapshot height, with the same totals as a full replay
+def test_supply_after_restore_from_snapshot(chain, tmp_path, monkeypatch):
+    monkeypatch.setattr(upchain, "SNAPSHOT_INTERVAL", SNAPSHOT_INTERVAL)
+    replayed = make_node(chain, str(tmp_path))
+    replayed.chain.close()
+    restored = upchain.Blockchain(str(tmp_path))
+    snapshot_height = (CHAIN_LENGTH - 1) // SNAPSHOT_INTERVAL * SNAPSHOT_INTERVAL
+    assert restored.ledger.supply_start == snapshot_height
+    for height in range(CHAIN_LENGTH):
+        assert restored.ledger.get_supply(height) == (replayed.ledger.get_supply(height) if height >= snapshot_height else None)
+        assert restored.ledger.get_work(height) == (replayed.ledger.get_work(height) if height >= snapshot_height else None)
+    # Reverting and applying the blocks after the snapshot keeps the totals of the replayed node
+    for block in reversed(chain[snapshot_height + 1:]):
+        restored.ledger.revert_block(block)
+    assert restored.ledger.get_supply() == replayed.ledger.get_supply(snapshot_height)
+    for block in chain[snapshot_height + 1:]:
+        restored.ledger.apply_block(block)
+    assert restored.ledger.get_supply() == replayed.ledger.get_supply()
+    assert get_balances(restored.ledger) == get_balances(replayed.ledger)
+
+
+# A node bootstrapped from a snapshot does not know the supply below the snapshot height
+def test_supply_after_bootstrap(chain):
+    exporter = make_node(chain)
+    snapshot = exporter.create_snapshot(SNAPSHOT_INTERVAL)
+    blockchain = upchain.Blockchain()
+    assert blockchain.bootstrap(snapshot, chain, snapshot["hash"]) == "Chain bootstrapped from the snapshot"
+    assert blockchain.ledger.get_supply(SNAPSHOT_INTERVAL - 1) is None
+    assert [blockchain.ledger.get_supply(height) for height in range(SNAPSHOT_INTERVAL, CHAIN_LENGTH)] == [exporter.ledger.get_supply(height) for height in range(SNAPSHOT_INTERVAL, CHAIN_LENGTH)]
@@ -0,0 +1,87 @@
+# Tests of the pool of pending transactions
+import upchain
+
+SENDER = "a" * 64 # address that sends the transactions of the tests
+RECIPIENT = "b" * 64 # address that receives the transactions of the tests
+
+
+# Function for creating a transaction from the sender with the given amount and commission
+def make_transaction(amount, fee, sender=SENDER):
+    return upchain.Transaction(sender, RECIPIENT, amount, fee, None)
+
+
+# Function for creating a pool that holds exactly the given number of transactions of the size of the test transactions
+def make_pool(count):
+    return upchain.Mempool(count * make_transaction(1, 1).get_size())
+
+
+# A transaction paying more per byte evicts the cheapest transactions, and the funds they reserved are released
+def test_eviction_by_fee_rate():
+    mempool = make_pool(3)
+    cheap, middle, expensive = make_transaction(1, 1), make_transaction(2, 5), make_transaction(3, 9)
+    for transaction in (middle, cheap, expensive):
+        assert mempool.add(transaction) == []
+    richer = make_transaction(4, 7, "c" * 64)
+    assert mempool.add(richer) == [cheap]
+    assert set(mempool.transactions) == {middle.hash, expensive.hash, richer.hash}
+    assert mempool.get_pending_spend(SENDER) == middle.amount + middle.fee + expensive.amount + expensive.fee
+    assert mempool.size == mempool.max_size
+
+
+# A full pool rejects a transaction that pays no more per byte than the cheapest one, or that is larger than the whole pool, and stays unchanged
+def test_full_pool_rejects_transactions():
+    mempool = make_pool(2)
+    first, second = make_transaction(1, 5), make_transaction(2, 5)
+    mempool.add(first)
+    mempool.add(second)
+    assert mempool.add(make_transaction(3, 5)) == "Mempool is full"
+    assert mempool.add(make_transaction(3, 4)) == "Mempool is full"
+    assert mempool.add(first) == "Duplicate transaction"
+    assert set(mempool.transactions) == {first.hash, second.hash}
+    # The rejected candidates stay in the heap and can still be evicted by a better transaction
+    assert mempool.add(make_transaction(3, 6)) == [second]
+    assert upchain.Mempool(10).add(make_transaction(1, 10 ** 6)) == "Mempool is full"
+
+
+# Removing transactions leaves outdated heap entries that are dropped when they outnumber the transactions, without changing the order of the pool
+def test_remove_compacts_heaps():
+    mempool = upchain.Mempool()
+    transactions = [make_transaction(amount, amount % 7 + 1) for amount in range(1, 201)]
+    for transaction in transactions:
+        mempool.add(transaction)
+    for transaction in transactions[:190]:
+        assert mempool.remove(transaction.hash) == transaction
+        assert max(len(mempool.best), len(mempool.worst)) <= 2 * len(mempool) + 64
+    assert mempool.remove(transactions[0].hash) is None
+    # Without the compaction the heaps would still hold an entry for every added transaction
+    assert len(mempool) == 10 and len(mempool.best) == len(mempool.worst) < len(transactions) // 2
+    expected = sorted(transactions[190:], key=lambda transaction: (-transaction.fee / transaction.get_size(), transactions.index(transaction)))
+    assert mempool.get_block_template() == expected
+    assert mempool.get_pending_spend(SENDER) == sum(transaction.amount + transaction.fee for transaction in transactions[190:])
+
+
+# The newest transactions of a sender are reported until the rest is covered by the balance
+def test_get_overspends():
+    mempool = upchain.Mempool()
+    transactions = [make_transaction(amount, 1) for amount in (10, 20, 30)]
+    for transaction in transactions:
+        mempool.add(transaction)
+    assert mempool.get_overspends(SENDER, 63) == []
+    assert mempool.get_overspends(SENDER, 62) == [transactions[2].hash]
+    assert mempool.get_overspends(SENDER, 11) == [transactions[2].hash, transactions[1].hash]
+    assert mempool.get_overspends(SENDER, 0) == [transaction.hash for transaction in reversed(transactions)]
+    assert mempool.get_overspends("c" * 64, 0) == []
+
+
+# The block template takes the transactions with the highest fee per byte until the next one does not fit, and keeps them in the pool
+def test_block_template_size_limit():
+    mempool = upchain.Mempool()
+    transactions = [make_transaction(amount, fee) for amount, fee in ((1, 3), (2, 9), (3, 1), (4, 5))]
+    for transaction in transactions:
+        mempool.add(transaction)
+    size = transactions[0].get_size()
+    assert mempool.get_block_template(2 * size) == [transactions[1], transactions[3]]
+    assert mempool.get_block_template(2 * size - 1) == [transactions[1]]
+    assert mempool.get_block_template(size - 1) == []
+    assert mempool.get_block_template() == [transactions[1], transactions[3], transactions[0], transactions[2]]
+    assert len(mempool) == 4 and len(mempool.best) == 4
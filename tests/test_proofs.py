@@ -0,0 +1,54 @@
+# Tests of the Merkle trees and the transaction inclusion proofs
+import pytest
+
+import upchain
+from conftest import CREATOR, make_chain, make_node
+
+
+# Function for creating the hashes of the given number of distinct transactions
+def make_hashes(count):
+    return [upchain.Transaction(CREATOR, f"{index:064x}", index, 1, None).hash for index in range(count)]
+
+
+# The proof of every leaf leads to the root, also for odd numbers of leaves whose last hash is paired with itself
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 7, 8, 13])
+def test_proofs_of_all_leaves(count):
+    hashes = make_hashes(count)
+    tree = upchain.MerkleTree(hashes)
+    assert tree.get_root() == upchain.calculate_merkle_root(hashes)
+    for position, hash in enumerate(hashes):
+        assert upchain.verify_merkle_proof(hash, tree.get_proof(position), tree.get_root())
+
+
+# A proof fails for another transaction, with a neighbour on the wrong side or with a changed neighbour
+def test_tampered_proofs_fail():
+    hashes = make_hashes(5)
+    tree = upchain.MerkleTree(hashes)
+    proof = tree.get_proof(2)
+    assert not upchain.verify_merkle_proof(hashes[3], proof, tree.get_root())
+    wrong_side = [[sibling, "left" if side == "right" else "right"] for sibling, side in proof]
+    assert not upchain.verify_merkle_proof(hashes[2], wrong_side, tree.get_root())
+    changed = [["0" * 64, proof[0][1]]] + proof[1:]
+    assert not upchain.verify_merkle_proof(hashes[2], changed, tree.get_root())
+
+
+# The proof served by a node is checked against the header of a mined block
+def test_transaction_proof_against_header():
+    blockchain = make_node(make_chain(4))
+    transaction = blockchain.chain[2].transactions[1]
+    answer = blockchain.get_transaction_proof(transaction.hash)
+    assert upchain.verify_transaction_proof(transaction.hash, answer["proof"], answer["header"])
+    assert not upchain.verify_transaction_proof(blockchain.chain[2].transactions[0].hash, answer["proof"], answer["header"])
+    # A header whose fields do not match its hash is rejected
+    tampered = dict(answer["header"], timestamp=answer["header"]["timestamp"] + 1)
+    assert not upchain.verify_transaction_proof(transaction.hash, answer["proof"], tampered)
+
+
+# A header made without work is rejected even though its hash matches its fields and its Merkle root contains the transaction
+def test_header_without_work_is_rejected():
+    blockchain = make_node(make_chain(3))
+    transaction = blockchain.chain[2].transactions[0]
+    answer = blockchain.get_transaction_proof(transaction.hash)
+    header = dict(answer["header"], target=1, nonce=0)
+    header["hash"] = upchain.calculate_block_hash(header["index"], header["timestamp"], header["merkle_root"], header["previous_hash"], header["target"], header["nonce"])
+    assert not upchain.verify_transaction_proof(transaction.hash, answer["proof"], header)
@@ -0,0 +1,78 @@
+# Tests of the HTTP server of a node
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+import upchain
+
+SLOW_DELAY = 1 # time in seconds for which a slow request keeps a thread of the server busy
+
+
+# Function for starting the server of a node, sending requests to it and stopping it
+def serve(blockchain, requests):
+    async def scenario():
+        runner = web.AppRunner(upchain.NodeServer(blockchain).create_app())
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await requests(session, "http://127.0.0.1:%d" % runner.addresses[0][1])
+        finally:
+            await runner.cleanup()
+    return asyncio.run(scenario())
+
+
+# Function for sending a request and getting the time when its answer arrived, its status and its JSON data
+async def fetch(session, method, url, **kwargs):
+    async with session.request(method, url, **kwargs) as response:
+        return time.monotonic(), response.status, await response.json()
+
+
+# A slow request does not stop the server from answering other requests in the meantime
+def test_slow_request_does_not_block_other_requests(monkeypatch):
+    blockchain = upchain.Blockchain()
+    get_headers = blockchain.get_headers
+    monkeypatch.setattr(blockchain, "get_headers", lambda locator, limit: time.sleep(SLOW_DELAY) or get_headers(locator, limit))
+    async def requests(session, url):
+        slow = asyncio.ensure_future(fetch(session, "GET", f"{url}/headers?locator=x"))
+        await asyncio.sleep(0.1)
+        fast = await fetch(session, "GET", f"{url}/height")
+        return fast, await slow
+    (fast_time, fast_status, _), (slow_time, slow_status, _) = serve(blockchain, requests)
+    assert fast_status == slow_status == 200
+    assert fast_time < slow_time - SLOW_DELAY / 2
+
+
+# A transfer is reported as accepted by the result of the transfer even if a block has already taken it from the pool, and a rejected one returns its error
+def test_submitted_transfer_result(monkeypatch):
+    blockchain = upchain.Blockchain()
+    sender = blockchain.get_last_block().transactions[0].recipient
+    transfer = {"sender": sender, "recipient": "a" * 64, "amount": 100, "fee": 1}
+    transfer_coins = blockchain.transfer_coins
+    def transfer_and_mine(*args):
+        result = transfer_coins(*args)
+        blockchain.mempool.remove(result)
+        return result
+    monkeypatch.setattr(blockchain, "transfer_coins", transfer_and_mine)
+    async def requests(session, url):
+        return [await fetch(session, "POST", f"{url}/transactions", json=data) for data in (transfer, dict(transfer, amount=upchain.MAX_SUPPLY + 1), {"sender": sender})]
+    (_, accepted_status, accepted), (_, rejected_status, rejected), (_, invalid_status, invalid) = serve(blockchain, requests)
+    assert accepted_status == 201 and accepted["hash"] == upchain.Transaction(sender, "a" * 64, 100, 1, None).hash
+    assert rejected_status == 400 and rejected["error"] == "Invalid amount or fee"
+    assert invalid_status == 400 and invalid["error"] == "Invalid transaction"
+
+
+# The cache forgets the least recently used entries when it holds too many entries or bytes, and does not keep values larger than itself
+def test_byte_cache_bounds():
+    cache = upchain.ByteCache(3, 100)
+    for key in "abc":
+        cache.put(key, key, 30)
+    cache.get("a")
+    cache.put("d", "d", 30)
+    assert [cache.get(key) for key in "abcd"] == ["a", None, "c", "d"]
+    cache.put("e", "e", 60)
+    assert len(cache) == 2 and cache.size == 90 and cache.get("e") == "e"
+    cache.put("f", "f", 101)
+    assert cache.get("f") is None and cache.size == 90
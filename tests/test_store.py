@@ -0,0 +1,99 @@
+# Tests of restarting a node from its block store
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+import upchain
+from conftest import CREATOR, make_chain, make_node
+
+SNAPSHOT_INTERVAL = 4 # number of blocks after which the test nodes save their state
+CHAIN_LENGTH = 11 # number of blocks in the stored chain, so that some blocks follow the last snapshot
+
+
+# Function for getting the balances and the index of a node, by which two states can be compared, reverted blocks may leave zero balances
+def get_state(ledger, chain_index):
+    return {address: balance for address, balance in ledger.balances.items() if balance}, ledger.get_work(), chain_index.blocks, chain_index.transactions, chain_index.addresses, chain_index.address_kinds, chain_index.entities
+
+
+# A node with a block store whose chain transfers coins and registers names, closed after creating it
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upchain, "SNAPSHOT_INTERVAL", SNAPSHOT_INTERVAL)
+    blockchain = make_node(make_chain(CHAIN_LENGTH), str(tmp_path))
+    blockchain.chain.close()
+    return str(tmp_path)
+
+
+# After a restart only the blocks after the last snapshot are replayed, and the state equals a full rebuild
+def test_restart_replays_only_blocks_after_snapshot(data_dir, monkeypatch):
+    applied = []
+    apply_block = upchain.Ledger.apply_block
+    monkeypatch.setattr(upchain.Ledger, "apply_block", lambda ledger, block: applied.append(block.index) or apply_block(ledger, block))
+    blockchain = upchain.Blockchain(data_dir)
+    last_snapshot = (CHAIN_LENGTH - 1) // SNAPSHOT_INTERVAL * SNAPSHOT_INTERVAL
+    assert applied == list(range(last_snapshot + 1, CHAIN_LENGTH))
+    assert blockchain.validated_height == last_snapshot
+    # A full rebuild of the same chain gives the same balances and index
+    ledger = upchain.Ledger()
+    ledger.rebuild(blockchain.chain)
+    chain_index = upchain.ChainIndex()
+    chain_index.rebuild(blockchain.chain, [])
+    assert get_state(blockchain.ledger, blockchain.chain_index) == get_state(ledger, chain_index)
+    assert len(blockchain.get_history(CREATOR, kind="nft")["transactions"]) == CHAIN_LENGTH - 1
+    assert blockchain.is_valid()
+
+
+# A saved state that does not match the stored chain is ignored and the whole chain is replayed
+def test_restart_ignores_state_of_another_chain(data_dir, monkeypatch):
+    locations_path = os.path.join(data_dir, "locations", f"{SNAPSHOT_INTERVAL}.json")
+    with open(locations_path) as locations_file:
+        locations = json.load(locations_file)
+    locations["block_hash"] = "0" * 64
+    with open(locations_path, "w") as locations_file:
+        json.dump(locations, locations_file)
+    applied = []
+    apply_block = upchain.Ledger.apply_block
+    monkeypatch.setattr(upchain.Ledger, "apply_block", lambda ledger, block: applied.append(block.index) or apply_block(ledger, block))
+    blockchain = upchain.Blockchain(data_dir)
+    assert applied == list(range(CHAIN_LENGTH))
+    assert blockchain.ledger.get_balance(f"{5:064x}") == 5000 - int(5000 * upchain.BURN_RATE)
+
+
+# Every save of the locations contains only the blocks since the previous snapshot
+def test_locations_are_saved_in_parts(data_dir):
+    for height in range(SNAPSHOT_INTERVAL, CHAIN_LENGTH, SNAPSHOT_INTERVAL):
+        with open(os.path.join(data_dir, "locations", f"{height}.json")) as locations_file:
+            locations = json.load(locations_file)
+        heights = {location[0] for location in locations["transactions"].values()}
+        assert heights == set(range(height - SNAPSHOT_INTERVAL + 1 if height > SNAPSHOT_INTERVAL else 0, height + 1))
+
+
+# The node started as a program keeps its chain in its data directory and has the same chain after a restart
+def test_program_keeps_chain_after_restart(tmp_path):
+    genesis_hashes = []
+    for _ in range(2):
+        with socket.socket() as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            port = free_socket.getsockname()[1]
+        node = subprocess.Popen([sys.executable, upchain.__file__, "--data-dir", str(tmp_path), "--host", "127.0.0.1", "--port", str(port)])
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/chain") as response:
+                        genesis_hashes.append(json.load(response)["chain"][0]["hash"])
+                    break
+                except OSError:
+                    assert time.monotonic() < deadline and node.poll() is None
+                    time.sleep(0.1)
+        finally:
+            node.terminate()
+            node.wait()
+    assert genesis_hashes[0] == genesis_hashes[1]
+    assert os.path.getsize(os.path.join(tmp_path, "blocks.dat")) > 0
@@ -0,0 +1,162 @@
+# Tests of the concurrent chain synchronization against a local network of slow, failing and valid nodes
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+import upchain
+from conftest import make_chain, make_node
+
+CHAIN_LENGTH = 9 # number of blocks in the chain of the best node
+TIMEOUT = 0.5 # time in seconds after which the synchronizer abandons a request
+SLOW_DELAY = 3 # time in seconds for which slow nodes delay their answers
+MAX_CONCURRENCY = 8 # maximum number of simultaneous requests of the synchronizer
+STUB_NODES = ["slow"] * 10 + ["error"] * 10 + ["malformed"] * 5 + ["wrong"] * 5 + ["behind"] * 6 + ["same", "liar"] # kinds of the misbehaving nodes
+
+
+# Function for getting the answer of the height endpoint of a node with the given blocks
+def get_status(blocks, work=None):
+    return {"height": len(blocks) - 1, "tip_hash": blocks[-1].hash, "work": make_node(blocks).ledger.get_work() if work is None else work}
+
+
+# The chain of the best node
+@pytest.fixture(scope="module")
+def chain():
+    return make_chain(CHAIN_LENGTH)
+
+
+# Defining the class of a local network that serves the stub nodes and real nodes and records the requests they receive
+class Network:
+    # Class constructor
+    def __init__(self, chain, our_tip_hash):
+        self.chain = chain # chain of the best node
+        self.our_tip_hash = our_tip_hash # hash of the last block of the synchronized node
+        self.requests = [] # name of the node and path of every received request
+        self.runners = [] # runners of the started servers
+        self.in_flight = 0 # number of requests sent by the synchronizer and not answered yet
+        self.max_in_flight = 0 # largest number of simultaneous requests of the synchronizer
+
+    # Method for creating the client tracing that counts the simultaneous requests
+    def trace_config(self):
+        async def on_start(session, context, params):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        async def on_end(session, context, params):
+            self.in_flight -= 1
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_start)
+        trace_config.on_request_end.append(on_end)
+        trace_config.on_request_exception.append(on_end)
+        return trace_config
+
+    # Method for starting an application on a free port and getting its address
+    async def serve(self, app, name=None):
+        @web.middleware
+        async def record(request, handler):
+            self.requests.append((name or request.match_info["name"], request.path))
+            return await handler(request)
+        app.middlewares.append(record)
+        # Slow handlers that the client has abandoned do not delay the shutdown
+        runner = web.AppRunner(app, shutdown_timeout=0.1)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        self.runners.append(runner)
+        return "http://127.0.0.1:%d" % runner.addresses[0][1]
+
+    # Handler of all requests to the stub nodes, whose kind is the first part of their name
+    async def stub(self, request):
+        kind = request.match_info["name"].split("-")[0]
+        endpoint = request.match_info["endpoint"]
+        if kind == "slow":
+            # The node would be the best one if it answered in time
+            await asyncio.sleep(SLOW_DELAY)
+            return web.json_response({"height": 100, "tip_hash": "e" * 64, "work": 2 ** 300})
+        if kind == "error":
+            return web.Response(status=500)
+        if kind == "malformed":
+            return web.Response(text="{not json", content_type="application/json")
+        if kind == "wrong":
+            return web.json_response({"height": "8", "tip_hash": None, "work": "a lot"})
+        if kind == "behind":
+            return web.json_response(get_status(self.chain[:2]))
+        if kind == "same":
+            # The node has our last block, so it is skipped whatever work it reports
+            return web.json_response({"height": 100, "tip_hash": self.our_tip_hash, "work": 2 ** 300})
+        # The lying node reports the most work and sends headers whose hashes do not match
+        if endpoint == "height":
+            return web.json_response({"height": len(self.chain) - 1, "tip_hash": "f" * 64, "work": 2 ** 300})
+        headers = [block.get_header() for block in self.chain[3:]]
+        for header in headers:
+            header["nonce"] += 1
+        return web.json_response({"fork_height": 2, "headers": headers})
+
+    # Method for starting the stub nodes and the real nodes, returning the addresses of all nodes
+    async def start(self, real_nodes):
+        app = web.Application()
+        app.router.add_get("/{name}/{endpoint}", self.stub)
+        stub_address = await self.serve(app)
+        nodes = [f"{stub_address}/{kind}-{number}" for number, kind in enumerate(STUB_NODES)]
+        for name, blockchain in real_nodes.items():
+            nodes.append(await self.serve(upchain.NodeServer(blockchain).create_app(), name))
+        return nodes
+
+    # Method for stopping all servers
+    async def stop(self):
+        for runner in self.runners:
+            await runner.cleanup()
+
+
+# Function for synchronizing a node with a network of the stub nodes and the given real nodes, returning the result and its duration
+def synchronize(blockchain, network, real_nodes, monkeypatch):
+    # Every session of the synchronizer counts its requests
+    create_session = aiohttp.ClientSession
+    monkeypatch.setattr(aiohttp, "ClientSession", lambda **kwargs: create_session(trace_configs=[network.trace_config()], **kwargs))
+    async def scenario():
+        blockchain.nodes = set(await network.start(real_nodes))
+        try:
+            start_time = time.monotonic()
+            result = await upchain.ChainSynchronizer(blockchain, TIMEOUT, MAX_CONCURRENCY).sync()
+            return result, time.monotonic() - start_time
+        finally:
+            await network.stop()
+    return asyncio.run(scenario())
+
+
+# The missing blocks are downloaded only from the node with the most work, past slow, failing and lying nodes
+def test_sync_downloads_missing_blocks_from_best_node(chain, monkeypatch):
+    ours = make_node(chain[:3])
+    network = Network(chain, ours.get_last_block().hash)
+    result, seconds = synchronize(ours, network, {"good": make_node(chain), "second": make_node(chain[:6])}, monkeypatch)
+    fork_height, blocks = result
+    assert fork_height == 2
+    assert [block.hash for block in blocks] == [block.hash for block in chain[3:]]
+    # Slow nodes are abandoned after the timeout instead of delaying the synchronization
+    assert seconds < SLOW_DELAY
+    # The nodes are queried at the same time, but never more of them than the limit allows
+    assert 1 < network.max_in_flight <= MAX_CONCURRENCY
+    # The headers are requested from the candidates in the order of their work, and the blocks only from the first valid one
+    assert [name.split("-")[0] for name, path in network.requests if path.endswith("/headers")] == ["liar", "good"]
+    assert {name for name, path in network.requests if path.endswith("/blocks")} == {"good"}
+
+
+# Every node is asked for its height, and the requests to slow nodes end with the timeout
+def test_sync_queries_all_nodes_with_timeout(chain, monkeypatch):
+    ours = make_node(chain[:3])
+    network = Network(chain, ours.get_last_block().hash)
+    result, seconds = synchronize(ours, network, {}, monkeypatch)
+    # Without a valid node with more work there is nothing to download
+    assert result is None
+    assert sorted(name.split("-")[0] for name, path in network.requests if path.endswith("/height")) == sorted(STUB_NODES)
+    # The ten slow nodes take two rounds of the limit of simultaneous requests, each ending with the timeout
+    assert 2 * TIMEOUT <= seconds < SLOW_DELAY
+
+
+# A node whose chain has less work than ours is not used even if the node with more work fails
+def test_sync_ignores_nodes_with_less_work(chain, monkeypatch):
+    ours = make_node(chain[:7])
+    network = Network(chain, ours.get_last_block().hash)
+    result, seconds = synchronize(ours, network, {"second": make_node(chain[:6])}, monkeypatch)
+    assert result is None
+    assert not any(path.endswith("/blocks") for name, path in network.requests)
@@ -0,0 +1,82 @@
+# Tests of the difficulty adjustment and of the rules for the times of blocks
+import collections
+
+import pytest
+
+import upchain
+
+TARGET = 2 ** 240 # target of the blocks in the windows of the tests
+START_TIME = 1000000 # time of the first block in the windows of the tests
+
+
+# Function for creating a window of times and targets of blocks with the given target that follow each other at the given interval, as the nodes keep it
+def make_window(interval, length=upchain.RETARGET_WINDOW + 1, target=TARGET):
+    return collections.deque(((START_TIME + index * interval, target) for index in range(length)), maxlen=upchain.RETARGET_WINDOW + 1)
+
+
+# Function for creating a window of the given block times with the test target
+def make_times(times):
+    return [(block_time, TARGET) for block_time in times]
+
+
+# Blocks at the desired interval keep the target, slower blocks make it larger and faster blocks make it smaller in proportion
+@pytest.mark.parametrize("factor", [1, 2, 0.5, 1.5, 0.75])
+def test_target_follows_block_interval(factor):
+    assert upchain.calculate_next_target(make_window(upchain.TARGET_BLOCK_INTERVAL * factor)) == int(TARGET * factor)
+
+
+# The change of the target is limited to the maximum factor in both directions
+def test_target_change_is_clamped():
+    assert upchain.calculate_next_target(make_window(upchain.TARGET_BLOCK_INTERVAL * 100)) == TARGET * upchain.MAX_RETARGET_FACTOR
+    assert upchain.calculate_next_target(make_window(0)) == TARGET // upchain.MAX_RETARGET_FACTOR
+    # Times that go back are treated as the fastest possible blocks
+    assert upchain.calculate_next_target(make_window(-upchain.TARGET_BLOCK_INTERVAL)) == TARGET // upchain.MAX_RETARGET_FACTOR
+    # The target never exceeds the largest possible target and never falls below one
+    assert upchain.calculate_next_target(make_window(upchain.TARGET_BLOCK_INTERVAL * 100, target=upchain.MAX_TARGET)) == upchain.MAX_TARGET
+    assert upchain.calculate_next_target(make_window(0, target=1)) == 1
+
+
+# A window shorter than two blocks keeps the target of the last block, or the initial target without blocks, and shorter windows scale by their own length
+def test_target_of_short_windows():
+    assert upchain.calculate_next_target(make_window(upchain.TARGET_BLOCK_INTERVAL, 0)) == upchain.INITIAL_TARGET
+    assert upchain.calculate_next_target(make_window(upchain.TARGET_BLOCK_INTERVAL, 1)) == TARGET
+    assert upchain.calculate_next_target(make_window(upchain.TARGET_BLOCK_INTERVAL * 2, 2)) == TARGET * 2
+    # The window keeps only the last blocks, so older slow blocks no longer count
+    window = make_window(upchain.TARGET_BLOCK_INTERVAL * 3)
+    for _ in range(upchain.RETARGET_WINDOW + 1):
+        window.append((window[-1][0] + upchain.TARGET_BLOCK_INTERVAL, TARGET))
+    assert len(window) == upchain.RETARGET_WINDOW + 1
+    assert upchain.calculate_next_target(window) == TARGET
+
+
+# The target of the first block of the window does not count, only the targets of the blocks whose times are measured
+def test_average_target_of_window():
+    window = make_window(upchain.TARGET_BLOCK_INTERVAL, 3)
+    window[0] = (window[0][0], 1)
+    window[2] = (window[2][0], TARGET * 3)
+    assert upchain.calculate_next_target(window) == TARGET * 2
+
+
+# A block must be later than the median time of the last blocks, whose order does not matter, and older blocks are ignored
+def test_timestamp_after_median_time():
+    times = [10, 30, 20, 50, 40, 60, 70, 90, 80, 100, 110]
+    window = make_times(times)
+    assert not upchain.check_timestamp(60, window, 1000)
+    assert upchain.check_timestamp(61, window, 1000)
+    # Only the last blocks count, so a very late block before them does not raise the median
+    assert upchain.check_timestamp(61, make_times([10 ** 6] + times), 1000)
+    assert len(times) == upchain.MEDIAN_TIME_SPAN
+    # With an even number of blocks the later of the two middle times is used
+    assert not upchain.check_timestamp(30, make_times([10, 20, 30, 40]), 1000)
+    assert upchain.check_timestamp(31, make_times([10, 20, 30, 40]), 1000)
+    # Without earlier blocks any time that is not too far in the future is accepted
+    assert upchain.check_timestamp(0, [], 1000)
+
+
+# A block may be ahead of the clock of the node by at most the allowed drift
+def test_timestamp_future_drift():
+    now = START_TIME + 500
+    window = make_times([START_TIME])
+    assert upchain.check_timestamp(now + upchain.MAX_FUTURE_DRIFT, window, now)
+    assert not upchain.check_timestamp(now + upchain.MAX_FUTURE_DRIFT + 1, window, now)
+    assert not upchain.check_timestamp(now + upchain.MAX_FUTURE_DRIFT + 1, [], now)
@@ -1,505 +1,2747 @@
-# Importing the necessary libraries
-import hashlib # for data hashing
-import json # for data serialization
-import time # to get timestamps
-import random # to generate random numbers and words
-import requests # to send and receive requests to other network nodes
-
-# Defining constants
-MAX_SUPPLY = 100000000000 # the maximum number of coins that can be mined
-BURN_RATE = 0.0001 # percentage of coins burned from the transaction amount
-BURN_THRESHOLD = 50000000000 # the number of coins burned, after which the burning stops
-BURN_ADDRESS = "0x0000000000000000000000000000000000000000" # the address to which the burned coins are sent
-MINING_REWARD = 50 # reward for mining a block in coins (The number is indicated as an example)
-DIFFICULTY = 4 # initial mining difficulty (the number of zeros at the beginning of the block hash)
-STARTUP_FEE = 10 # commission for adding a startup to a block in coins
-NFT_FEE = 5 # commission for adding NFT to a block in coins
-TOKEN_FEE = 5 # commission for adding a token to a block in coins
-DAPP_FEE = 5 # commission for adding a DApp to a block in coins
-WORD_LIST = ["apple", "banana", "carrot", "dog", "elephant", "fish", "giraffe", "house", "ice", "jacket", "kite", "lion", "moon", "nose", "orange", "pencil", "queen", "rainbow", "star", "tree", "umbrella", "vase", "water", "xylophone", "yarn", "zebra"] # list of words for generating addresses
-
-# Defining the block class
-class Block:
-    # Class constructor
-    def _init_(self, index, timestamp, transactions, previous_hash, nonce, hash):
-        self.index = index # sequence number of the block in the chain
-        self.timestamp = timestamp # block creation time
-        self.transactions = transactions # list of transactions in the block
-        self.previous_hash = previous_hash # hash of the previous block
-        self.nonce = nonce # random number used for mining
-        self.hash = hash # current block hash
-
-    # Method for serializing a block into JSON format
-    def to_json(self):
-        return json.dumps(self._dict_, sort_keys=True)
-
-# Defining the transaction class
-class Transaction:
-    # Class constructor
-    def _init_(self, sender, recipient, amount, fee, data):
-        self.sender = sender # sender's address
-        self.recipient = recipient # address of the recipient
-        self.amount = amount # transfer amount in coins
-        self.fee = fee # transaction fee in coins
-        self.data = data # additional transaction data (for example, information about the startup, NFT, token or DApp)
-        self.hash = self.calculate_hash() # transaction hash
-
-    # Method for calculating transaction hash
-    def calculate_hash(self):
-        # We serialize the transaction in JSON format and encode it into bytes
-        transaction_string = json.dumps(self._dict_, sort_keys=True).encode()
-        # Returning the transaction hash in hexadecimal format
-        return hashlib.sha256(transaction_string).hexdigest()
-
-# Defining the blockchain class
-class Blockchain:
-    # Class constructor
-    def _init_(self):
-        self.chain = [] # list of blocks in the chain
-        self.pending_transactions = [] # list of pending transactions
-        self.nodes = set() # many addresses of other network nodes
-        self.burned_coins = 0 # number of coins burned
-        self.create_genesis_block() # create a genesis block
-
-    # Method for creating a genesis block
-    def create_genesis_block(self):
-        # Create the first block with arbitrary data
-        genesis_block = Block(0, time.time(), [], "0", 0, "0")
-        # Add it to the chain
-        self.chain.append(genesis_block)
-        # Generating the first address of the blockchain creator
-        creator_address = self.generate_address()
-        # We create a transaction that credits the maximum number of coins to this address
-        genesis_transaction = Transaction("0", creator_address, MAX_SUPPLY, 0, None)
-        # Add this transaction to the block
-        genesis_block.transactions.append(genesis_transaction)
-
-    # Method for generating a new address
-    def generate_address(self):
-        # Selecting 24 random words from the list
-        words = random.sample(WORD_LIST, 24)
-        # We connect them into one line with spaces
-        address_string = " ".join(words)
-        # We hash this string using SHA256 and return the result in hexadecimal format
-        return hashlib.sha256(address_string.encode()).hexdigest()
-
-    # Method to get the last block in the chain
-    def get_last_block(self):
-        return self.chain[-1]
-
-    # Method for adding a new block to the chain
-    def add_block(self, block):
-        # We check that the block has the correct index, hash and link to the previous block
-        if block.index == len(self.chain) and block.hash == block.calculate_hash() and block.previous_hash == self.get_last_block().hash:
-            # Adding a block to the chain
-            self.chain.append(block)
-            # Clearing the list of pending transactions
-            self.pending_transactions = []
-            # Clearing the list of pending transactions
-            return True
-        else:
-            # Return False if the block is invalid
-            return False
-
-    # Method for creating a new transaction
-    def create_transaction(self, sender, recipient, amount, fee, data):
-        # Checking that the sender and recipient have the correct address format
-        if len(sender) == 64 and len(recipient) == 64:
-            # We check that the amount and commission are non-negative and do not exceed the maximum number of coins
-            if 0 <= amount <= MAX_SUPPLY and 0 <= fee <= MAX_SUPPLY:
-                # We check that the sender has sufficient funds for the transfer
-                if self.get_balance(sender) >= amount + fee:
-                    # Create a new transaction
-                    transaction = Transaction(sender, recipient, amount, fee, data)
-                    # Add it to the list of pending transactions
-                    self.pending_transactions.append(transaction)
-                    # Returning the transaction hash
-                    return transaction.hash
-                else:
-                    # Return an error message if there are insufficient funds
-                    return "Insufficient funds"
-            else:
-                # We return an error message if the amount or commission is incorrect
-                return "Invalid amount or fee"
-        else:
-            # Return an error message if the addresses are incorrect
-            return "Invalid sender or recipient address"
-
-    # Method to get address balance
-    def get_balance(self, address):
-        # Initialize the balance to zero
-        balance = 0
-        # We go through all the blocks in the chain
-        for block in self.chain:
-            # We go through all transactions in the block
-            for transaction in block.transactions:
-                # If the address is the sender, then we reduce the balance by the transfer amount and commission
-                if transaction.sender == address:
-                    balance -= transaction.amount + transaction.fee
-                # If the address is the recipient, then we increase the balance by the transfer amount
-                if transaction.recipient == address:
-                    balance += transaction.amount
-        # We return the balance
-        return balance
-
-    # Method for calculating block hash
-    def calculate_hash(self, index, timestamp, transactions, previous_hash, nonce):
-        # We serialize the block data into JSON format and encode it into bytes
-        block_string = json.dumps([index, timestamp, transactions, previous_hash, nonce], sort_keys=True).encode()
-        # Returning the block hash in hexadecimal format
-        return hashlib.sha256(block_string).hexdigest()
-
-    # Method for mining a new block
-    def mine_block(self):
-        # We get the index, time and hash of the last block
-        last_block = self.get_last_block()
-        index = last_block.index + 1
-        timestamp = time.time()
-        previous_hash = last_block.hash
-        # Initialize nonce and hash to zero
-        nonce = 0
-        hash = "0"
-        # While the hash does not satisfy the complexity condition, we increase the nonce and recalculate the hash
-        while not hash.startswith("0" * DIFFICULTY):
-            nonce += 1
-            hash = self.calculate_hash(index, timestamp, self.pending_transactions, previous_hash, nonce)
-        # Create a new block with the received data
-        block = Block(index, timestamp, self.pending_transactions, previous_hash, nonce, hash)
-        # Adding a new block to the chain
-        self.add_block(block)
-        # Returning a new block
-        return block
-
-    # Method for checking the validity of the chain
-    def is_valid(self):
-        # We go through all the blocks in the chain, starting from the secondы
-        for i in range(1, len(self.chain)):
-            # We get the current and previous blocks
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
-            # We check that the hash of the current block matches the calculated hash
-            if current_block.hash != current_block.calculate_hash():
-                return False
-            # We check that the hash of the previous block matches the link to the previous block
-            if current_block.previous_hash != previous_block.hash:
-                return False
-        # Return True if all blocks are valid
-        return True
-
-    # Method for adding a new node to the network
-    def add_node(self, node_address):
-        # Checking that the host address is in the correct format
-        if node_address.startswith("http://") or node_address.startswith("https://"):
-            # Adding a node address to a set of nodes
-            self.nodes.add(node_address)
-            # Returning a success message
-            return f"Node {node_address} added to the network"
-        else:
-            # Returning an error message
-            return "Invalid node address"
-
-    # Method for synchronizing the chain with other network nodes
-    def sync_chain(self):
-        # Initialize a variable to store the longest chain
-        longest_chain = None
-        # Initialize a variable to store the length of the longest chain
-        max_length = len(self.chain)
-        # We go through all the nodes in the network
-        for node in self.nodes:
-            # Send a request to receive the node chain
-            response = requests.get(f"{node}/chain")
-            # If the request is successful
-            if response.status_code == 200:
-                # We get the length and chain of the node from the answer
-                length = response.json()["length"]
-                chain = response.json()["chain"]
-                # If the length of the node chain is greater than the length of the longest chain
-                if length > max_length:
-                    # Update the longest chain and its length
-                    longest_chain = chain
-                    max_length = length
-        # If the longest chain is found and it is valid
-        if longest_chain and self.is_valid(longest_chain):
-            # Replace our chain with the longest chain
-            self.chain = longest_chain
-            # Returning a success message
-            return "Chain synchronized with the network"
-        else:
-            # We return a message that our chain is up to date
-            return "Our chain is up to date"
-
-    # Method for adding a new startup to a block
-    def create_startup(self, sender, startup_name, startup_description, startup_date, fundraising_date, investment_offer, nft_info, required_funds, token_name, dapp_name, dapp_url):
-        # Checking that the sender has the correct address format
-        if len(sender) == 64:
-            # We check that the startup name is not empty and unique
-            if startup_name and not self.get_startup_by_name(startup_name):
-                # We check that the required amount of funds in dollars is positive and does not exceed the maximum number of coins
-                if 0 < required_funds <= MAX_SUPPLY:
-                    # We check that the sender has enough funds to pay the commission for adding a startup to the block
-                    if self.get_balance(sender) >= STARTUP_FEE:
-                        # Creating a dictionary with startup data
-                        startup_data = {
-                            "startup_name": startup_name,
-                            "startup_description": startup_description,
-                            "startup_date": startup_date,
-                            "fundraising_date": fundraising_date,
-                            "investment_offer": investment_offer,
-                            "nft_info": nft_info,
-                            "required_funds": required_funds,
-                            "token_name": token_name,
-                            "dapp_name": dapp_name,
-                            "dapp_url": dapp_url
-                        }
-                        # We create a transaction that sends a commission to the burning address and adds data about the startup to the block
-                        transaction = Transaction(sender, BURN_ADDRESS, 0, STARTUP_FEE, startup_data)
-                        # Adding a transaction to the list of pending transactions
-                        self.pending_transactions.append(transaction)
-                        # We increase the number of burned coins by commission
-                        self.burned_coins += STARTUP_FEE
-                        # Returning the transaction hash
-                        return transaction.hash
-                    else:
-                        # Return an error message if there are insufficient funds
-                        return "Insufficient funds"
-                else:
-                    # Return an error message if the required amount of funds is incorrect
-                    return "Invalid required funds"
-            else:
-                # Return an error message if the startup name is empty or not unique
-                return "Invalid or duplicate startup name"
-        else:
-            # Return an error message if the sender address is incorrect
-            return "Invalid sender address"
-
-    # Method to get startup by name
-    def get_startup_by_name(self, startup_name):
-        # We go through all the blocks in the chain
-        for block in self.chain:
-            # We go through all transactions in the block
-            for transaction in block.transactions:
-                # If the transaction contains startup data
-                if transaction.data and "startup_name" in transaction.data:
-                    # If the startup name matches what you are looking for
-                    if transaction.data["startup_name"] == startup_name:
-                        # We return data about the startup
-                        return transaction.data
-        # Return None if the startup is not found
-        return None
-
-    # Method for creating a new NFT into a block
-    def create_nft(self, sender, nft_name, nft_description, nft_image, nft_price, nft_owner):
-        # Checking that the sender has the correct address format
-        if len(sender) == 64:
-            # Checking that the NFT name is not empty and unique
-            if nft_name and not self.get_nft_by_name(nft_name):
-                # We check that the NFT price is positive and does not exceed the maximum number of coins
-                if 0 < nft_price <= MAX_SUPPLY:
-                    # We check that the sender has enough funds to pay the fee for adding the NFT to the block
-                    if self.get_balance(sender) >= NFT_FEE:
-                        # Creating a dictionary with NFT data
-                        nft_data = {
-                            "nft_name": nft_name,
-                            "nft_description": nft_description,
-                            "nft_image": nft_image,
-                            "nft_price": nft_price,
-                            "nft_owner": nft_owner
-                        }
-                        # Create a transaction that sends a fee to the burn address and adds NFT data to the block
-                        transaction = Transaction(sender, BURN_ADDRESS, 0, NFT_FEE, nft_data)
-                        # Adding a transaction to the list of pending transactions
-                        self.pending_transactions.append(transaction)
-                        # We increase the number of burned coins by commission
-                        self.burned_coins += NFT_FEE
-                        # Returning the transaction hash
-                        return transaction.hash
-                    else:
-                        # Return an error message if there are insufficient funds
-                        return "Insufficient funds"
-                else:
-                    # Returning an error message if the NFT price is incorrect
-                    return "Invalid nft price"
-            else:
-                # Return an error message if the NFT name is empty or not unique
-                return "Invalid or duplicate nft name"
-        else:
-            # Return an error message if the sender address is incorrect
-            return "Invalid sender address"
-
-    # Method to get NFT by name
-    def get_nft_by_name(self, nft_name):
-        # We go through all the blocks in the chain
-        for block in self.chain:
-            # We go through all transactions in the block
-            for transaction in block.transactions:
-                # If the transaction contains NFT data
-                if transaction.data and "nft_name" in transaction.data:
-                    # If the NFT name matches what you're looking for
-                    if transaction.data["nft_name"] == nft_name:
-                        # Returning NFT data
-                        return transaction.data
-        # Return None if NFT is not found
-        return None
-
-    # Method for creating a new token in a block
-    def create_token(self, sender, token_name, token_symbol, token_supply, token_price, token_owner):
-        # Checking that the sender has the correct address format
-        if len(sender) == 64:
-            # We check that the name and symbol of the token are not empty and unique
-            if token_name and token_symbol and not self.get_token_by_name(token_name) and not self.get_token_by_symbol(token_symbol):
-                # We check that the total quantity and price of the token are positive and do not exceed the maximum number of coins
-                if 0 < token_supply <= MAX_SUPPLY and 0 < token_price <= MAX_SUPPLY:
-                    # We check that the sender has enough funds to pay the commission for adding the token to the block
-                    if self.get_balance(sender) >= TOKEN_FEE:
-                        # Create a dictionary with token data
-                        token_data = {
-                            "token_name": token_name,
-                            "token_symbol": token_symbol,
-                            "token_supply": token_supply,
-                            "token_price": token_price,
-                            "token_owner": token_owner
-                        }
-                        # Create a transaction that sends a commission to the burn address and adds token data to the block
-                        transaction = Transaction(sender, BURN_ADDRESS, 0, TOKEN_FEE, token_data)
-                        # Adding a transaction to the list of pending transactions
-                        self.pending_transactions.append(transaction)
-                        # We increase the number of burned coins by commission
-                        self.burned_coins += TOKEN_FEE
-                        # Returning the transaction hash
-
-                        return transaction.hash
-                    else:
-                        # Return an error message if there are insufficient funds
-                        return "Insufficient funds"
-                else:
-                    # Return an error message if the total supply or price of a token is incorrect
-                    return "Invalid token supply or price"
-            else:
-                # Return an error message if the token name or symbol is empty or not unique
-                return "Invalid or duplicate token name or symbol"
-        else:
-            # Return an error message if the sender address is incorrect
-            return "Invalid sender address"
-
-    # Method for getting a token by name
-    def get_token_by_name(self, token_name):
-        # We go through all the blocks in the chain
-        for block in self.chain:
-            # We go through all transactions in the block
-            for transaction in block.transactions:
-                # If the transaction contains token data
-                if transaction.data and "token_name" in transaction.data:
-                    # If the token name matches the one you are looking for
-                    if transaction.data["token_name"] == token_name:
-                        # Returning token data
-                        return transaction.data
-        # Return None if the token is not found
-        return None
-
-    # Method for getting a token by symbol
-    def get_token_by_symbol(self, token_symbol):
-        # We go through all the blocks in the chain
-        for block in self.chain:
-            # We go through all transactions in the block
-            for transaction in block.transactions:
-                # If the transaction contains token data
-                if transaction.data and "token_symbol" in transaction.data:
-                    # If the token character matches the one you are looking for
-                    if transaction.data["token_symbol"] == token_symbol:
-                        # Returning token data
-                        return transaction.data
-        # Return None if the token is not found
-        return None
-
-    # Method for creating a new DApp in a block
-    def create_dapp(self, sender, dapp_name, dapp_description, dapp_url, dapp_owner):
-        # Checking that the sender has the correct address format
-        if len(sender) == 64:
-            # Checking that the DApp name is not empty and unique
-            if dapp_name and not self.get_dapp_by_name(dapp_name):
-                # Checking that the DApp URL is in the correct format
-                if dapp_url.startswith("http://") or dapp_url.startswith("https://"):
-                    # We check that the sender has enough funds to pay the commission for adding the DApp to the block
-                    if self.get_balance(sender) >= DAPP_FEE:
-                        # Creating a dictionary with data about DApp
-                        dapp_data = {
-                            "dapp_name": dapp_name,
-                            "dapp_description": dapp_description,
-                            "dapp_url": dapp_url,
-                            "dapp_owner": dapp_owner
-                        }
-                        # Create a transaction that sends a commission to the burn address and adds data about the DApp to the block
-                        transaction = Transaction(sender, BURN_ADDRESS, 0, DAPP_FEE, dapp_data)
-                        # Adding a transaction to the list of pending transactions
-                        self.pending_transactions.append(transaction)
-                        # We increase the number of burned coins by commission
-                        self.burned_coins += DAPP_FEE
-                        # Returning the transaction hash
-                        return transaction.hash
-                    else:
-                        # Return an error message if there are insufficient funds
-                        return "Insufficient funds"
-                else:
-                    # Return an error message if the DApp URL is incorrect
-                    return "Invalid dapp url"
-            else:
-                # Return an error message if the DApp name is empty or not unique
-                return "Invalid or duplicate dapp name"
-        else:
-            # Return an error message if the sender address is incorrect
-            return "Invalid sender address"
-
-    # Method to get DApp by name
-    def get_dapp_by_name(self, dapp_name):
-        # We go through all the blocks in the chain
-        for block in self.chain:
-            # We go through all transactions in the block
-            for transaction in block.transactions:
-                # If the transaction contains DApp data
-                if transaction.data and "dapp_name" in transaction.data:
-                    # If the DApp name matches the searched one
-                    if transaction.data["dapp_name"] == dapp_name:
-                        # Returning data about the DApp
-                        return transaction.data
-        # Return None if DApp is not found
-        return None
-
-    # Method for receiving a transaction by hash
-    def get_transaction_by_hash(self, transaction_hash):
-        # We go through all the blocks in the chain
-        for block in self.chain:
-            # We go through all transactions in the block
-            for transaction in block.transactions:
-                # If the transaction hash matches the searched one
-                if transaction.hash == transaction_hash:
-                    # Returning the transaction
-                    return transaction
-        # Return None if transaction not found
-        return None
-
-    # Method for transferring coins between addresses
-    def transfer_coins(self, sender, recipient, amount, fee):
-        # Checking that the sender and recipient have the correct address format
-        if len(sender) == 64 and len(recipient) == 64:
-            # We check that the amount and commission are non-negative and do not exceed the maximum number of coins
-            if 0 <= amount <= MAX_SUPPLY and 0 <= fee <= MAX_SUPPLY:
-                # We check that the sender has sufficient funds for the transfer
-                if self.get_balance(sender) >= amount + fee:
-                    # Create a new transaction
-                    transaction = Transaction(sender, recipient, amount, fee, None)
-                    # Add it to the list of pending transactions
-                    self.pending_transactions.append(transaction)
-                    # Returning the transaction hash
-                    return transaction.hash
-                else:
-                    # Return an error message if there are insufficient funds
-                    return "Insufficient funds"
-            else:
-                # We return an error message if the amount or commission is incorrect
-                return "Invalid amount or fee"
-        else:
-            # Return an error message if the addresses are incorrect
-            return "Invalid sender or recipient address"
-
-# Creating a Blockchain Instance
-up_chain = Blockchain()
+# Importing the necessary libraries
+import argparse # to choose the data directory of the node from the command line
+import hashlib # for data hashing
+import json # for data serialization
+import time # to get timestamps
+import secrets # to generate the seeds of addresses with a cryptographically secure generator
+import multiprocessing # to mine blocks on all processor cores
+import os # to work with the files of the block store
+import mmap # to read the block store without loading it into memory
+import struct # for the binary encoding of blocks and transactions
+import collections # for the cache of recently read blocks
+import heapq # for ordering pending transactions by fee
+import bisect # for finding the page of an address history by its cursor
+import statistics # for the block interval statistics
+import asyncio # to query the network nodes concurrently
+import threading # to let the miner and the request handlers use the blockchain at the same time
+import contextlib # for the context manager of the committer
+import shutil # to remove the block store of a node that failed to bootstrap
+import gzip # to compress the responses of the node server
+import aiohttp # to send and receive requests to other network nodes
+from aiohttp import web # to serve the chain to other network nodes and clients
+import numpy as np # to validate batches of transfers at once
+
+# Defining constants
+MAX_SUPPLY = 100000000000 # the maximum number of coins that can be mined
+BURN_RATE = 0.0001 # percentage of coins burned from the transaction amount
+BURN_THRESHOLD = 50000000000 # the number of coins burned, after which the burning stops
+BURN_ADDRESS = "0x0000000000000000000000000000000000000000" # the address to which the burned coins are sent
+MINING_REWARD = 50 # reward for mining a block in coins (The number is indicated as an example)
+DIFFICULTY = 4 # initial mining difficulty (the number of zeros at the beginning of the block hash), from which the initial target is derived
+MAX_TARGET = 2 ** 256 - 1 # the largest possible target, any hash satisfies it
+INITIAL_TARGET = 16 ** (64 - DIFFICULTY) - 1 # target of the genesis block, the largest hash with DIFFICULTY zeros at the beginning
+TARGET_BLOCK_INTERVAL = 10 # desired time between blocks in seconds
+RETARGET_WINDOW = 20 # number of recent block intervals from which the next target is calculated
+MAX_RETARGET_FACTOR = 4 # maximum factor by which the target can change from the average of the window
+MEDIAN_TIME_SPAN = 11 # number of last blocks whose median time a new block must exceed
+MAX_FUTURE_DRIFT = 2 * 60 * 60 # number of seconds by which the time of a block may be ahead of the clock of the node
+STARTUP_FEE = 10 # commission for adding a startup to a block in coins
+NFT_FEE = 5 # commission for adding NFT to a block in coins
+TOKEN_FEE = 5 # commission for adding a token to a block in coins
+DAPP_FEE = 5 # commission for adding a DApp to a block in coins
+MINING_WORKERS = multiprocessing.cpu_count() # number of processes that search for the nonce in parallel
+NONCE_CHUNK_SIZE = 50000 # number of nonces checked by one mining task
+CANCEL_CHECK_INTERVAL = 1024 # number of nonces checked between checks of the cancellation flag
+ADDRESS_WORKERS = multiprocessing.cpu_count() # number of processes that generate addresses in parallel
+ADDRESS_CHUNK_SIZE = 10000 # number of addresses generated or checked by one address task
+ADDRESS_SEED_SIZE = 32 # number of random bytes in the seed from which addresses are derived
+VALIDATION_WORKERS = multiprocessing.cpu_count() # number of processes that check the blocks of the chain in parallel
+VALIDATION_CHUNK_SIZE = 1000 # number of blocks checked by one validation task
+BLOCK_CACHE_SIZE = 256 # number of recently read blocks kept in memory by the block store
+INDEX_RECORD = struct.Struct(">QI64s") # offset, length and hash of a block in the index file of the block store
+UINT32 = struct.Struct(">I") # lengths and counts in the binary encoding
+UINT64 = struct.Struct(">Q") # nonce appended to the block header
+INT64 = struct.Struct(">q") # integers in the binary encoding
+FLOAT64 = struct.Struct(">d") # fractional numbers in the binary encoding
+HEADER_FIELDS = struct.Struct(">Qd") # index and timestamp at the beginning of the block header
+TARGET_SIZE = 32 # number of bytes of the target in the block header and the encoded block
+BLOCK_FIELDS = struct.Struct(">QdQ") # index, timestamp and nonce at the beginning of an encoded block
+SYNC_TIMEOUT = 10 # time in seconds after which a request to a network node is abandoned
+SYNC_MAX_CONCURRENCY = 16 # maximum number of simultaneous requests to network nodes
+HEADERS_BATCH_SIZE = 2000 # maximum number of block headers requested from a node at once
+BLOCKS_BATCH_SIZE = 100 # maximum number of full blocks requested from a node at once
+MEMPOOL_MAX_SIZE = 10000000 # maximum total size of pending transactions in bytes
+MAX_BLOCK_SIZE = 1000000 # maximum total size of the transactions in a mined block in bytes
+SNAPSHOT_INTERVAL = 10000 # number of blocks after which a node with a block store saves a snapshot of its state
+READ_ATTEMPTS = 3 # number of times a read is repeated after concurrent changes before it takes the lock, so that long reads always finish
+NODE_HOST = "0.0.0.0" # address on which the node server listens
+DATA_DIR = "upchain_data" # directory in which a node started as a program keeps its chain, unless another one is given
+NODE_PORT = 5000 # port on which the node server listens
+CHAIN_PAGE_SIZE = 100 # number of blocks returned by the node server when the limit is not given
+MAX_CHAIN_PAGE_SIZE = 1000 # maximum number of blocks or headers returned by the node server at once
+RESPONSE_CACHE_SIZE = 1024 # number of ready responses kept by the node server for the current last block
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024 # maximum total size in bytes of the ready responses kept by the node server
+SERIALIZED_BLOCK_CACHE_SIZE = 10000 # number of serialized blocks kept by the node server
+SERIALIZED_BLOCK_CACHE_BYTES = 64 * 1024 * 1024 # maximum total size in bytes of the serialized blocks kept by the node server
+GZIP_MIN_SIZE = 512 # size in bytes from which the responses of the node server are compressed
+HISTORY_PAGE_SIZE = 50 # number of transactions in one page of an address history when the limit is not given
+ENTITY_KEYS = {"startup": "startup_name", "nft": "nft_name", "token": "token_name", "token_symbol": "token_symbol", "dapp": "dapp_name"} # transaction data fields by which startups, NFTs, tokens and DApps are looked up
+ENTITY_KINDS = ("startup", "nft", "token", "dapp") # kinds of entities by which an address history can be filtered
+
+# Defining the Merkle tree class
+class MerkleTree:
+    # Class constructor
+    def __init__(self, transaction_hashes):
+        # The lowest level consists of the transaction hashes
+        self.levels = [list(transaction_hashes)] # levels of the tree from the leaves to the root
+        # We hash the pairs of neighbouring hashes until one hash remains
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            # If the number of hashes is odd, then we pair the last hash with itself
+            if len(level) % 2 == 1:
+                level.append(level[-1])
+            self.levels.append([hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)])
+
+    # Method to get the root of the tree
+    def get_root(self):
+        # A block without transactions has a root made of zeros
+        if not self.levels[0]:
+            return "0" * 64
+        return self.levels[-1][0]
+
+    # Method for building the inclusion proof of the transaction at the given position
+    def get_proof(self, position):
+        proof = []
+        # We go up from the leaves and collect the neighbouring hash on every level except the root
+        for level in self.levels[:-1]:
+            # The neighbour of an even position is on the right, the neighbour of an odd position is on the left
+            if position % 2 == 0:
+                proof.append([level[position + 1], "right"])
+            else:
+                proof.append([level[position - 1], "left"])
+            position //= 2
+        # Returning the list of neighbouring hashes with their sides
+        return proof
+
+# Function to get the kind of entity registered by a transaction, or None for an ordinary transfer
+def get_entity_kind(transaction):
+    if isinstance(transaction.data, dict):
+        # The first name found decides, a startup also names its token and DApp
+        for kind, key in ENTITY_KEYS.items():
+            if key in transaction.data:
+                return "token" if kind == "token_symbol" else kind
+    return None
+
+# Function for hashing a pair of neighbouring hashes of the Merkle tree
+def hash_pair(left, right):
+    return hashlib.sha256((left + right).encode()).hexdigest()
+
+# Function for calculating the Merkle root of a list of transaction hashes
+def calculate_merkle_root(transaction_hashes):
+    return MerkleTree(transaction_hashes).get_root()
+
+# Function for checking whether a list of transaction hashes contains the same hash twice
+def has_duplicate_hashes(transaction_hashes):
+    # A repeated last hash gives the same Merkle root as the list without it, so such blocks are never valid
+    return len(set(transaction_hashes)) != len(transaction_hashes)
+
+# Function for checking the inclusion proof of a transaction against a Merkle root
+def verify_merkle_proof(transaction_hash, proof, merkle_root):
+    hash = transaction_hash
+    # We combine the hash with the neighbouring hashes from the leaf up to the root
+    for sibling, side in proof:
+        if side == "left":
+            hash = hash_pair(sibling, hash)
+        else:
+            hash = hash_pair(hash, sibling)
+    # The proof is valid if we have arrived at the root
+    return hash == merkle_root
+
+# Function for checking the inclusion proof of a transaction against a block header
+def verify_transaction_proof(transaction_hash, proof, header):
+    # We check that the header hash matches its fields
+    if header["hash"] != calculate_block_hash(header["index"], header["timestamp"], header["merkle_root"], header["previous_hash"], header["target"], header["nonce"]):
+        return False
+    # A header without proof of work can be made by anyone, only the genesis block is not mined and is known in advance
+    if header["index"] > 0 and not meets_target(header["hash"], header["target"]):
+        return False
+    # We check that the transaction is included in the Merkle root of the header
+    return verify_merkle_proof(transaction_hash, proof, header["merkle_root"])
+
+# Function for appending the canonical binary encoding of a value to a buffer
+def encode_value(value, output):
+    # Every value starts with a one-letter type tag, strings and collections also carry their length
+    if value is None:
+        output += b"N"
+    elif value is True:
+        output += b"T"
+    elif value is False:
+        output += b"F"
+    elif isinstance(value, int):
+        # Integers that do not fit into 64 bits are written as decimal digits
+        if -2 ** 63 <= value < 2 ** 63:
+            output += b"I"
+            output += INT64.pack(value)
+        else:
+            digits = str(value).encode()
+            output += b"B"
+            output += UINT32.pack(len(digits))
+            output += digits
+    elif isinstance(value, float):
+        output += b"D"
+        output += FLOAT64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode()
+        output += b"S"
+        output += UINT32.pack(len(data))
+        output += data
+    elif isinstance(value, (list, tuple)):
+        output += b"L"
+        output += UINT32.pack(len(value))
+        for item in value:
+            encode_value(item, output)
+    elif isinstance(value, dict):
+        # Dictionary keys must be strings and are written in sorted order, so that equal dictionaries have equal encodings
+        output += b"M"
+        output += UINT32.pack(len(value))
+        for key in sorted(value):
+            if not isinstance(key, str):
+                raise TypeError("dictionary keys must be strings")
+            encode_value(key, output)
+            encode_value(value[key], output)
+    else:
+        raise TypeError(f"cannot encode a value of type {type(value).__name__}")
+
+# Function for decoding a value from a buffer, returning the value and the position after it
+def decode_value(data, offset):
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag == b"T":
+        return True, offset
+    if tag == b"F":
+        return False, offset
+    if tag == b"I":
+        return INT64.unpack_from(data, offset)[0], offset + INT64.size
+    if tag == b"D":
+        return FLOAT64.unpack_from(data, offset)[0], offset + FLOAT64.size
+    if tag in (b"B", b"S"):
+        length = UINT32.unpack_from(data, offset)[0]
+        offset += UINT32.size
+        text = bytes(data[offset:offset + length]).decode()
+        if len(text.encode()) != length:
+            raise ValueError("truncated value")
+        return (int(text) if tag == b"B" else text), offset + length
+    if tag == b"L":
+        count = UINT32.unpack_from(data, offset)[0]
+        offset += UINT32.size
+        items = []
+        for _ in range(count):
+            item, offset = decode_value(data, offset)
+            items.append(item)
+        return items, offset
+    if tag == b"M":
+        count = UINT32.unpack_from(data, offset)[0]
+        offset += UINT32.size
+        items = {}
+        for _ in range(count):
+            key, offset = decode_value(data, offset)
+            items[key], offset = decode_value(data, offset)
+        return items, offset
+    raise ValueError(f"unknown type tag {tag!r}")
+
+# Function for encoding a list of blocks as length-prefixed frames
+def encode_blocks(blocks):
+    output = bytearray()
+    for block in blocks:
+        data = block.to_bytes()
+        output += UINT32.pack(len(data))
+        output += data
+    return bytes(output)
+
+# Function for decoding a list of blocks from length-prefixed frames
+def decode_blocks(data):
+    blocks = []
+    offset = 0
+    while offset < len(data):
+        length = UINT32.unpack_from(data, offset)[0]
+        offset += UINT32.size
+        if offset + length > len(data):
+            raise ValueError("truncated block")
+        blocks.append(Block.from_bytes(data[offset:offset + length]))
+        offset += length
+    return blocks
+
+# Function for writing blocks to a binary file one by one as JSON lines or length-prefixed frames, returning their number
+def write_blocks(blocks, output, format="ndjson"):
+    count = 0
+    for block in blocks:
+        if format == "ndjson":
+            output.write(block.to_json().encode() + b"\n")
+        elif format == "binary":
+            data = block.to_bytes()
+            output.write(UINT32.pack(len(data)))
+            output.write(data)
+        else:
+            raise ValueError(f"unknown block format {format!r}")
+        count += 1
+    return count
+
+# Function for reading blocks one by one from a binary file written by write_blocks
+def read_blocks(input, format="ndjson"):
+    if format == "ndjson":
+        for line in input:
+            # Empty lines are skipped
+            if line.strip():
+                yield Block.from_dict(json.loads(line))
+    elif format == "binary":
+        while True:
+            prefix = input.read(UINT32.size)
+            # The file ends after the last frame
+            if not prefix:
+                return
+            if len(prefix) != UINT32.size:
+                raise ValueError("truncated block")
+            length = UINT32.unpack(prefix)[0]
+            data = input.read(length)
+            if len(data) != length:
+                raise ValueError("truncated block")
+            yield Block.from_bytes(data)
+    else:
+        raise ValueError(f"unknown block format {format!r}")
+
+# Function for converting a number of coins to a float for the checks of whole arrays, values that are not numbers or do not fit in a float become NaN
+def coin_to_float(value):
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except OverflowError:
+        return np.nan
+
+# Function for checking that the balances of a state snapshot add up to its supply totals: issued coins leave the issuing address, and only commissions leave the balances
+def check_snapshot_balances(snapshot):
+    try:
+        mined, burned, fees = snapshot["supply"]
+        balances = snapshot["balances"]
+        return balances.get("0", 0) == -mined and sum(balances.values()) == -fees
+    except (TypeError, ValueError, AttributeError, KeyError):
+        return False
+
+# Function for calculating the hash that commits to the contents of a state snapshot
+def calculate_snapshot_hash(snapshot):
+    # We hash the canonical binary encoding of all fields except the hash itself
+    output = bytearray()
+    encode_value({key: value for key, value in snapshot.items() if key != "hash"}, output)
+    return hashlib.sha256(output).hexdigest()
+
+# Function for loading a state snapshot saved by a node
+def load_snapshot(path):
+    with open(path) as snapshot_file:
+        return json.load(snapshot_file)
+
+# Function for serializing the part of the block header that does not change while mining
+def block_header_prefix(index, timestamp, merkle_root, previous_hash, target):
+    # We encode the index and the time followed by the Merkle root, the hash of the previous block and the target
+    output = bytearray(HEADER_FIELDS.pack(index, timestamp))
+    encode_value(merkle_root, output)
+    encode_value(previous_hash, output)
+    output += target.to_bytes(TARGET_SIZE, "big")
+    return bytes(output)
+
+# Function for calculating the hash of a block from its header fields
+def calculate_block_hash(index, timestamp, merkle_root, previous_hash, target, nonce):
+    # We hash the fixed part of the header followed by the nonce
+    block_hash = hashlib.sha256(block_header_prefix(index, timestamp, merkle_root, previous_hash, target))
+    block_hash.update(UINT64.pack(nonce))
+    # Returning the block hash in hexadecimal format
+    return block_hash.hexdigest()
+
+# Function for checking that a block hash satisfies the target of the block
+def meets_target(hash, target):
+    # The hash is read as a number, which must not be greater than the target
+    return int(hash, 16) <= target
+
+# Function for calculating the target of the next block from the times and targets of the last blocks
+def calculate_next_target(window):
+    # The window holds the time and the target of the last blocks, the first block keeps the target of the previous one
+    if len(window) < 2:
+        return window[-1][1] if window else INITIAL_TARGET
+    # We compare the time taken by the blocks of the window with the desired time in whole milliseconds, so that all nodes get the same result
+    actual = round(window[-1][0] * 1000) - round(window[0][0] * 1000)
+    expected = round((len(window) - 1) * TARGET_BLOCK_INTERVAL * 1000)
+    # We limit the change so that a few blocks with wrong times cannot change the target too much
+    actual = min(max(actual, expected // MAX_RETARGET_FACTOR), expected * MAX_RETARGET_FACTOR)
+    # We scale the average target of the window: slow blocks make the target larger and mining easier
+    average_target = sum(target for _, target in list(window)[1:]) // (len(window) - 1)
+    return max(1, min(average_target * actual // expected, MAX_TARGET))
+
+# Function for checking that the time of a block is later than the median time of the last blocks and not too far in the future
+def check_timestamp(timestamp, window, now):
+    block_times = sorted(block_time for block_time, _ in list(window)[-MEDIAN_TIME_SPAN:])
+    # Without earlier blocks only the limit on the future applies
+    return (not block_times or timestamp > block_times[len(block_times) // 2]) and timestamp <= now + MAX_FUTURE_DRIFT
+
+# Function for calculating the expected number of hashes needed to mine a block, the genesis block is not mined and adds no work
+def calculate_block_work(index, target):
+    return 2 ** 256 // (target + 1) if index > 0 else 0
+
+# Function for creating the window of times and targets from the last blocks
+def target_window(blocks):
+    return collections.deque(((block.timestamp, block.target) for block in blocks), maxlen=RETARGET_WINDOW + 1)
+
+# Defining the block class
+class Block:
+    # Fixed set of attributes without a dictionary per block
+    __slots__ = ("index", "timestamp", "transactions", "previous_hash", "nonce", "hash", "target", "merkle_root")
+
+    # Class constructor
+    def __init__(self, index, timestamp, transactions, previous_hash, nonce, hash, target=INITIAL_TARGET):
+        self.index = index # sequence number of the block in the chain
+        self.timestamp = timestamp # block creation time
+        self.transactions = transactions # list of transactions in the block
+        self.previous_hash = previous_hash # hash of the previous block
+        self.nonce = nonce # random number used for mining
+        self.hash = hash # current block hash
+        self.target = target # the largest block hash that satisfies the proof of work
+        self.merkle_root = calculate_merkle_root([transaction.hash for transaction in transactions]) # root of the Merkle tree of transaction hashes
+
+    # Method for calculating the block hash from its fields
+    def calculate_hash(self):
+        # We recalculate the Merkle root so that any change in the transactions changes the hash
+        return calculate_block_hash(self.index, self.timestamp, calculate_merkle_root([transaction.hash for transaction in self.transactions]), self.previous_hash, self.target, self.nonce)
+
+    # Method to get the block header, which is enough to check the block hash without the transactions
+    def get_header(self):
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "merkle_root": self.merkle_root,
+            "previous_hash": self.previous_hash,
+            "target": self.target,
+            "nonce": self.nonce,
+            "hash": self.hash
+        }
+
+    # Method for building the inclusion proof of a transaction in the block
+    def get_transaction_proof(self, transaction_hash):
+        transaction_hashes = [transaction.hash for transaction in self.transactions]
+        # Return None if the transaction is not in the block
+        if transaction_hash not in transaction_hashes:
+            return None
+        # We build the Merkle tree and take the path from the transaction to the root
+        return MerkleTree(transaction_hashes).get_proof(transaction_hashes.index(transaction_hash))
+
+    # Method for converting a block into a dictionary
+    def to_dict(self):
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "transactions": [transaction.to_dict() for transaction in self.transactions],
+            "previous_hash": self.previous_hash,
+            "target": self.target,
+            "nonce": self.nonce,
+            "hash": self.hash
+        }
+
+    # Method for creating a block from a dictionary
+    @staticmethod
+    def from_dict(data):
+        return Block(data["index"], data["timestamp"], [Transaction.from_dict(transaction) for transaction in data["transactions"]], data["previous_hash"], data["nonce"], data["hash"], data["target"])
+
+    # Method for serializing a block into JSON format, used only for export
+    def to_json(self):
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    # Method for encoding a block into its canonical binary form, used for storage and exchange between nodes
+    def to_bytes(self):
+        # Fixed fields, then the target, then the hashes, then every transaction with its length
+        output = bytearray(BLOCK_FIELDS.pack(self.index, self.timestamp, self.nonce))
+        output += self.target.to_bytes(TARGET_SIZE, "big")
+        encode_value(self.previous_hash, output)
+        encode_value(self.hash, output)
+        output += UINT32.pack(len(self.transactions))
+        for transaction in self.transactions:
+            data = transaction.to_bytes()
+            output += UINT32.pack(len(data))
+            output += data
+        return bytes(output)
+
+    # Method for decoding a block from its binary form
+    @staticmethod
+    def from_bytes(data):
+        index, timestamp, nonce = BLOCK_FIELDS.unpack_from(data, 0)
+        target = int.from_bytes(data[BLOCK_FIELDS.size:BLOCK_FIELDS.size + TARGET_SIZE], "big")
+        previous_hash, offset = decode_value(data, BLOCK_FIELDS.size + TARGET_SIZE)
+        hash, offset = decode_value(data, offset)
+        count = UINT32.unpack_from(data, offset)[0]
+        offset += UINT32.size
+        transactions = []
+        for _ in range(count):
+            length = UINT32.unpack_from(data, offset)[0]
+            offset += UINT32.size
+            transactions.append(Transaction.from_bytes(data[offset:offset + length]))
+            offset += length
+        return Block(index, timestamp, transactions, previous_hash, nonce, hash, target)
+
+# Defining the transaction class
+class Transaction:
+    # Fixed set of attributes without a dictionary per transaction
+    __slots__ = ("sender", "recipient", "amount", "fee", "data", "hash")
+
+    # Class constructor
+    def __init__(self, sender, recipient, amount, fee, data):
+        self.sender = sender # sender's address
+        self.recipient = recipient # address of the recipient
+        self.amount = amount # transfer amount in coins
+        self.fee = fee # transaction fee in coins
+        self.data = data # additional transaction data (for example, information about the startup, NFT, token or DApp)
+        self.hash = self.calculate_hash() # transaction hash
+
+    # Method for calculating transaction hash
+    def calculate_hash(self):
+        # We hash the binary encoding of the transaction fields, which does not include the hash itself
+        return hashlib.sha256(self.to_bytes()).hexdigest()
+
+    # Method for encoding a transaction into its canonical binary form
+    def to_bytes(self):
+        output = bytearray()
+        for value in (self.sender, self.recipient, self.amount, self.fee, self.data):
+            encode_value(value, output)
+        return bytes(output)
+
+    # Method for decoding a transaction from its binary form
+    @staticmethod
+    def from_bytes(data):
+        values = []
+        offset = 0
+        for _ in range(5):
+            value, offset = decode_value(data, offset)
+            values.append(value)
+        # The encoding must contain exactly the transaction fields
+        if offset != len(data):
+            raise ValueError("unexpected data after the transaction")
+        return Transaction(*values)
+
+    # Method for converting a transaction into a dictionary
+    def to_dict(self):
+        return {
+            "sender": self.sender,
+            "recipient": self.recipient,
+            "amount": self.amount,
+            "fee": self.fee,
+            "data": self.data,
+            "hash": self.hash
+        }
+
+    # Method to get the size of the encoded transaction in bytes
+    def get_size(self):
+        return len(self.to_bytes())
+
+    # Method for creating a transaction from a dictionary
+    @staticmethod
+    def from_dict(data):
+        # The hash is calculated again from the transaction fields
+        return Transaction(data["sender"], data["recipient"], data["amount"], data["fee"], data["data"])
+
+# Defining the append-only on-disk block store class
+class BlockStore:
+    # Class constructor
+    def __init__(self, directory):
+        # We create the directory of the store if it does not exist yet
+        os.makedirs(directory, exist_ok=True)
+        self.segment_path = os.path.join(directory, "blocks.dat") # file with serialized blocks written one after another
+        self.index_path = os.path.join(directory, "blocks.idx") # file with the offset, length and hash of every block
+        self.cache = collections.OrderedDict() # recently read blocks by height
+        self.hashes = {} # height of every block by its hash
+        self.segment_map = None # memory map of the segment file
+        self.index_map = None # memory map of the index file
+        self.lock = threading.RLock() # lock for the files, the memory maps and the cache, which readers share with the writer
+        # We cut off the records left unfinished by an interrupted write
+        self.count = self.recover() # number of blocks in the store
+        # We open the files for appending new blocks
+        self.segment_file = open(self.segment_path, "ab")
+        self.index_file = open(self.index_path, "ab")
+        # We load the hashes of all blocks from the index without reading the blocks themselves
+        self.remap()
+        for height in range(self.count):
+            self.hashes[self.get_location(height)[2]] = height
+
+    # Method for removing the records of an interrupted write and counting the stored blocks
+    def recover(self):
+        # We create the files if they do not exist yet
+        for path in (self.segment_path, self.index_path):
+            if not os.path.exists(path):
+                open(path, "wb").close()
+        # We drop an incomplete record at the end of the index
+        count = os.path.getsize(self.index_path) // INDEX_RECORD.size
+        os.truncate(self.index_path, count * INDEX_RECORD.size)
+        # We drop the data written after the last indexed block
+        end = 0
+        if count:
+            with open(self.index_path, "rb") as index_file:
+                index_file.seek((count - 1) * INDEX_RECORD.size)
+                offset, length, _ = INDEX_RECORD.unpack(index_file.read(INDEX_RECORD.size))
+                end = offset + length
+        os.truncate(self.segment_path, end)
+        return count
+
+    # Method for mapping the files of the store into memory again after they have grown
+    def remap(self):
+        self.close_maps()
+        # Empty files cannot be mapped
+        if os.path.getsize(self.segment_path):
+            with open(self.segment_path, "rb") as segment_file:
+                self.segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if os.path.getsize(self.index_path):
+            with open(self.index_path, "rb") as index_file:
+                self.index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Method for closing the memory maps of the files
+    def close_maps(self):
+        if self.segment_map is not None:
+            self.segment_map.close()
+            self.segment_map = None
+        if self.index_map is not None:
+            self.index_map.close()
+            self.index_map = None
+
+    # Method to get the offset, length and hash of the block at the given height
+    def get_location(self, height):
+        with self.lock:
+            # We map the files again if the block was written after the last mapping
+            if self.index_map is None or len(self.index_map) < (height + 1) * INDEX_RECORD.size:
+                self.remap()
+            offset, length, hash = INDEX_RECORD.unpack_from(self.index_map, height * INDEX_RECORD.size)
+        return offset, length, hash.rstrip(b"\0").decode()
+
+    # Method for reading the block at the given height from the segment file
+    def read_block(self, height):
+        with self.lock:
+            offset, length, _ = self.get_location(height)
+            # We map the files again if the block was written after the last mapping
+            if self.segment_map is None or len(self.segment_map) < offset + length:
+                self.remap()
+            data = self.segment_map[offset:offset + length]
+        # We decode the block from its bytes without holding the lock
+        return Block.from_bytes(data)
+
+    # Method for appending a new block to the end of the store
+    def append(self, block):
+        # We encode the block and write it to the end of the segment file
+        payload = block.to_bytes()
+        with self.lock:
+            offset = self.segment_file.tell()
+            self.segment_file.write(payload)
+            self.segment_file.flush()
+            # Only after that we write the index record, so that the index never points to missing data
+            self.index_file.write(INDEX_RECORD.pack(offset, len(payload), block.hash.encode()))
+            self.index_file.flush()
+            # We remember the hash of the block
+            self.hashes[block.hash] = self.count
+            self.count += 1
+
+    # Method for removing all blocks starting from the given height
+    def truncate(self, height):
+        with self.lock:
+            # Nothing to do if the store has no blocks at this height
+            if height >= self.count:
+                return
+            # We cut both files at the position of the first removed block
+            offset = self.get_location(height)[0]
+            self.close_maps()
+            self.segment_file.close()
+            self.index_file.close()
+            os.truncate(self.segment_path, offset)
+            os.truncate(self.index_path, height * INDEX_RECORD.size)
+            self.segment_file = open(self.segment_path, "ab")
+            self.index_file = open(self.index_path, "ab")
+            # We forget the removed blocks
+            self.hashes = {hash: block_height for hash, block_height in self.hashes.items() if block_height < height}
+            self.cache.clear()
+            self.count = height
+
+    # Method to get the block at the given height
+    def get_block(self, height):
+        with self.lock:
+            # We return the block from the cache if it was read recently
+            if height in self.cache:
+                self.cache.move_to_end(height)
+                return self.cache[height]
+        # We read the block and remember it in the cache, removing the oldest block when it is full
+        block = self.read_block(height)
+        with self.lock:
+            self.cache[height] = block
+            if len(self.cache) > BLOCK_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return block
+
+    # Method to get a block by its hash
+    def get_block_by_hash(self, hash):
+        height = self.hashes.get(hash)
+        # Return None if the block is not in the store
+        if height is None:
+            return None
+        return self.get_block(height)
+
+    # Method for closing the files of the store
+    def close(self):
+        with self.lock:
+            self.close_maps()
+            self.segment_file.close()
+            self.index_file.close()
+
+    # Method to get the number of blocks in the store
+    def __len__(self):
+        return self.count
+
+    # Method to get a block or a list of blocks by height, like in a list
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.get_block(height) for height in range(*key.indices(self.count))]
+        # Negative heights are counted from the end of the chain
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError("block height out of range")
+        return self.get_block(key)
+
+    # Method for going through all blocks without keeping them in the cache
+    def __iter__(self):
+        return self.iter_blocks()
+
+    # Method for going through the blocks from the given height without keeping them in the cache
+    def iter_blocks(self, start=0):
+        for height in range(start, self.count):
+            yield self.read_block(height)
+
+# Defining the class that synchronizes the chain with other network nodes
+class ChainSynchronizer:
+    # Class constructor
+    def __init__(self, blockchain, timeout=SYNC_TIMEOUT, max_concurrency=SYNC_MAX_CONCURRENCY):
+        self.blockchain = blockchain # blockchain being synchronized
+        self.timeout = timeout # time in seconds after which a request to a node is abandoned
+        self.max_concurrency = max_concurrency # maximum number of simultaneous requests
+
+    # Method for sending a request to a node and decoding the JSON answer
+    async def fetch_json(self, session, semaphore, url):
+        # We limit the number of simultaneous requests
+        async with semaphore:
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    # Return None if the request is unsuccessful
+                    if response.status != 200:
+                        return None
+                    # We decode the answer only once
+                    return await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                # Return None if the node is unavailable, too slow or answered with invalid data
+                return None
+
+    # Method for sending a request to a node and reading the binary answer
+    async def fetch_bytes(self, session, semaphore, url):
+        # We limit the number of simultaneous requests
+        async with semaphore:
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                    # Return None if the request is unsuccessful
+                    if response.status != 200:
+                        return None
+                    return await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Return None if the node is unavailable or too slow
+                return None
+
+    # Method to get the height and the hash of the last block of a node
+    async def fetch_status(self, session, semaphore, node):
+        status = await self.fetch_json(session, semaphore, f"{node}/height")
+        # We ignore nodes that returned an answer in an unexpected format
+        if not isinstance(status, dict) or not isinstance(status.get("height"), int) or not isinstance(status.get("tip_hash"), str) or not isinstance(status.get("work"), int):
+            return None
+        return node, status["height"], status["tip_hash"], status["work"]
+
+    # Method for downloading the headers of the blocks that we are missing from a node
+    async def fetch_headers(self, session, semaphore, node, height):
+        # We send the locator of our chain so that the node can find the last common block
+        locator = self.blockchain.get_block_locator()
+        fork_height = None
+        headers = []
+        while True:
+            data = await self.fetch_json(session, semaphore, f"{node}/headers?locator={','.join(locator)}&limit={HEADERS_BATCH_SIZE}")
+            # Return None if the node returned an answer in an unexpected format
+            if not isinstance(data, dict) or not isinstance(data.get("headers"), list) or not isinstance(data.get("fork_height"), int):
+                return None
+            # The last common block is found by the first request
+            if fork_height is None:
+                fork_height = data["fork_height"]
+            headers.extend(data["headers"])
+            # We stop when the node has no more headers or we have reached the height it reported
+            if len(data["headers"]) < HEADERS_BATCH_SIZE or fork_height + len(headers) >= height or not isinstance(headers[-1], dict):
+                return fork_height, headers[:max(height - fork_height, 0)]
+            # The next batch continues after the last received header
+            locator = [str(headers[-1].get("hash"))]
+
+    # Method for checking that the headers continue our chain after the last common block
+    def check_headers(self, fork_height, headers):
+        chain = self.blockchain.chain
+        # The headers must continue our chain from one of its blocks
+        if not headers or fork_height >= len(chain):
+            return False
+        previous_hash = chain[fork_height].hash if fork_height >= 0 else None
+        # The targets of the headers are calculated from the times and targets of the blocks before them, starting with our common blocks
+        window = target_window(chain[max(fork_height - RETARGET_WINDOW, 0):fork_height + 1])
+        now = time.time()
+        try:
+            for height, header in enumerate(headers, fork_height + 1):
+                # The headers must follow each other without gaps
+                if header["index"] != height:
+                    return False
+                # We check that the hash matches the header fields
+                if header["hash"] != calculate_block_hash(header["index"], header["timestamp"], header["merkle_root"], header["previous_hash"], header["target"], header["nonce"]):
+                    return False
+                # The genesis block of another node is not mined, the other blocks must be linked, have a valid time and the expected target and satisfy it
+                if height > 0 and (header["previous_hash"] != previous_hash or not check_timestamp(header["timestamp"], window, now) or header["target"] != calculate_next_target(window) or not meets_target(header["hash"], header["target"])):
+                    return False
+                previous_hash = header["hash"]
+                window.append((header["timestamp"], header["target"]))
+            # The chain of the node must have more work after the common block than ours, a longer chain of easy blocks is not enough
+            work = sum(calculate_block_work(header["index"], header["target"]) for header in headers)
+        except (TypeError, KeyError, AttributeError, ValueError, OverflowError, struct.error):
+            # Return False if a header has an unexpected format
+            return False
+        return work > self.blockchain.get_work_after(fork_height)
+
+    # Method for downloading one batch of full blocks and checking them against their headers
+    async def fetch_blocks(self, session, semaphore, node, start, headers):
+        # The blocks are transferred in their binary encoding
+        data = await self.fetch_bytes(session, semaphore, f"{node}/blocks?from={start}&limit={len(headers)}")
+        if data is None:
+            return None
+        try:
+            # We decode the received blocks
+            blocks = decode_blocks(data)
+        except (struct.error, ValueError, TypeError):
+            # Return None if the node returned an answer in an unexpected format
+            return None
+        # The node must return exactly the requested blocks
+        if len(blocks) != len(headers):
+            return None
+        for block, header in zip(blocks, headers):
+            # The transactions must match the Merkle root of the checked header and must not repeat
+            if block.index != header["index"] or block.hash != header["hash"] or block.merkle_root != header["merkle_root"] or has_duplicate_hashes([transaction.hash for transaction in block.transactions]):
+                return None
+        return blocks
+
+    # Method for downloading the blocks that we are missing from a node
+    async def fetch_missing_blocks(self, session, semaphore, node, height):
+        # First we download and check only the headers
+        result = await self.fetch_headers(session, semaphore, node, height)
+        if result is None or not self.check_headers(*result):
+            return None
+        fork_height, headers = result
+        # Then we download the full blocks in batches at the same time
+        batches = [headers[i:i + BLOCKS_BATCH_SIZE] for i in range(0, len(headers), BLOCKS_BATCH_SIZE)]
+        results = await asyncio.gather(*(self.fetch_blocks(session, semaphore, node, fork_height + 1 + i * BLOCKS_BATCH_SIZE, batch) for i, batch in enumerate(batches)))
+        # Return None if any of the batches could not be downloaded
+        if any(blocks is None for blocks in results):
+            return None
+        # Returning the height of the last common block and the missing blocks
+        return fork_height, [block for blocks in results for block in blocks]
+
+    # Method for finding the best chain in the network and downloading the blocks that we are missing
+    async def sync(self):
+        # All requests go through one pool of connections
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            # We ask all the nodes for their height at the same time
+            statuses = await asyncio.gather(*(self.fetch_status(session, semaphore, node) for node in self.blockchain.nodes))
+            # We consider only the nodes that report more work than our chain has, starting from the one with the most work, nodes with our last block have nothing new
+            work = self.blockchain.get_work_after(-1)
+            tip_hash = self.blockchain.get_last_block().hash
+            candidates = sorted((status for status in statuses if status and status[2] != tip_hash and status[3] > work), key=lambda status: status[3], reverse=True)
+            # We download the blocks only from the best node, and from the next one if it fails
+            for node, height, node_tip_hash, node_work in candidates:
+                result = await self.fetch_missing_blocks(session, semaphore, node, height)
+                if result:
+                    return result
+        # Return None if no valid chain with more work is found
+        return None
+
+    # Method for running the synchronization from ordinary code
+    def run(self):
+        return asyncio.run(self.sync())
+
+# Defining the account state index class
+class Ledger:
+    # Class constructor
+    def __init__(self):
+        self.balances = {} # confirmed balance of every address that appears in the chain
+        self.supply = [] # total mined, burned and fee coins after every block, starting from the first block applied to the ledger
+        self.supply_start = 0 # height of the first block in the supply index
+        self.work = [] # total work of the chain after every block, in the same order as the supply index
+
+    # Method for calculating the coins burned from every transaction of a block, given the number of coins burned before it
+    def get_burns(self, block, burned):
+        burns = []
+        for transaction in block.transactions:
+            burn = 0
+            # The commission of a transaction to the burning address is burned completely
+            if transaction.recipient == BURN_ADDRESS:
+                burned += transaction.fee
+            # A share of the amount of every other transfer is burned until the threshold is reached, coins issued by the chain are not burned
+            elif transaction.sender != "0":
+                burn = min(int(transaction.amount * BURN_RATE), max(BURN_THRESHOLD - burned, 0))
+                burned += burn
+            burns.append(burn)
+        return burns
+
+    # Method for applying a single transaction to the confirmed balances
+    def apply_transaction(self, transaction, burn=0):
+        # The sender loses the transfer amount and commission
+        self.balances[transaction.sender] = self.balances.get(transaction.sender, 0) - (transaction.amount + transaction.fee)
+        # The recipient receives the transfer amount without the burned share
+        self.balances[transaction.recipient] = self.balances.get(transaction.recipient, 0) + transaction.amount - burn
+        # The burned coins are sent to the burning address
+        if burn:
+            self.balances[BURN_ADDRESS] = self.balances.get(BURN_ADDRESS, 0) + burn
+        # The commission of a transaction to the burning address also goes there
+        if transaction.recipient == BURN_ADDRESS:
+            self.balances[BURN_ADDRESS] += transaction.fee
+
+    # Method for applying all transactions of a new block to the confirmed balances and the supply index
+    def apply_block(self, block):
+        mined, burned, fees = self.supply[-1] if self.supply else (0, 0, 0)
+        # We go through all transactions in the block in order
+        for transaction, burn in zip(block.transactions, self.get_burns(block, burned)):
+            self.apply_transaction(transaction, burn)
+            # Coins issued by the chain are counted as mined, the commissions of transfers to the burning address as burned
+            if transaction.sender == "0":
+                mined += transaction.amount
+            elif transaction.recipient == BURN_ADDRESS:
+                burned += transaction.fee
+            else:
+                fees += transaction.fee
+            burned += burn
+        self.supply.append((mined, burned, fees))
+        self.work.append((self.work[-1] if self.work else 0) + calculate_block_work(block.index, block.target))
+
+    # Method for cancelling all transactions of a block removed from the chain
+    def revert_block(self, block):
+        # We forget the totals of the block and calculate its burns again from the totals before it
+        if self.supply:
+            self.supply.pop()
+            self.work.pop()
+        burns = self.get_burns(block, self.supply[-1][1] if self.supply else 0)
+        # We go through the transactions in reverse order and return the coins to the senders
+        for transaction, burn in reversed(list(zip(block.transactions, burns))):
+            self.balances[transaction.sender] = self.balances.get(transaction.sender, 0) + transaction.amount + transaction.fee
+            self.balances[transaction.recipient] = self.balances.get(transaction.recipient, 0) - (transaction.amount - burn)
+            if burn:
+                self.balances[BURN_ADDRESS] -= burn
+            if transaction.recipient == BURN_ADDRESS:
+                self.balances[BURN_ADDRESS] -= transaction.fee
+
+    # Method for rebuilding the index from a chain
+    def rebuild(self, chain):
+        # We reset the balances, the supply index and the work index
+        self.balances = {}
+        self.supply = []
+        self.supply_start = 0
+        self.work = []
+        # We apply all the blocks in the chain
+        for block in chain:
+            self.apply_block(block)
+
+    # Method to get the confirmed balance of an address
+    def get_balance(self, address):
+        return self.balances.get(address, 0)
+
+    # Method to get the mined, burned, commission and circulating coins after the block at the given height, or after the last block
+    def get_supply(self, height=None):
+        position = len(self.supply) - 1 if height is None else height - self.supply_start
+        # Return None for heights that are not in the index
+        if not 0 <= position < len(self.supply):
+            return None
+        mined, burned, fees = self.supply[position]
+        return {"height": self.supply_start + position, "mined": mined, "burned": burned, "fees": fees, "circulating": mined - burned - fees}
+
+    # Method to get the total work of the chain up to the block at the given height, or up to the last block
+    def get_work(self, height=None):
+        if height is None:
+            return self.work[-1] if self.work else 0
+        position = height - self.supply_start
+        # Return None for heights that are not in the index
+        if not 0 <= position < len(self.work):
+            return None
+        return self.work[position]
+
+# Defining the pool of pending transactions class
+class Mempool:
+    # Class constructor
+    def __init__(self, max_size=MEMPOOL_MAX_SIZE):
+        self.max_size = max_size # maximum total size of the pending transactions in bytes
+        self.size = 0 # current total size of the pending transactions in bytes
+        self.transactions = {} # pending transactions by hash, in the order of arrival
+        self.entries = {} # fee per byte, sequence number and size of every pending transaction by hash
+        self.best = [] # heap of transactions with the highest fee per byte on top
+        self.worst = [] # heap of transactions with the lowest fee per byte on top
+        self.senders = {} # hashes of the pending transactions of every sender, in the order of arrival
+        self.pending_spends = {} # coins reserved by pending transactions for every sender
+        self.sequence = 0 # number of the next added transaction
+
+    # Method for checking that a heap entry still describes a transaction in the pool
+    def is_current(self, hash, sequence):
+        entry = self.entries.get(hash)
+        return entry is not None and entry[1] == sequence
+
+    # Method for adding a transaction, evicting the cheapest transactions if the pool is full
+    def add(self, transaction):
+        # Return an error message if the transaction is already in the pool
+        if transaction.hash in self.transactions:
+            return "Duplicate transaction"
+        size = transaction.get_size()
+        fee_rate = transaction.fee / size
+        # We choose the cheapest transactions that have to leave the pool to free enough space
+        evicted = []
+        freed = 0
+        while self.size - freed + size > self.max_size and self.worst:
+            entry = heapq.heappop(self.worst)
+            if not self.is_current(entry[2], -entry[1]):
+                continue
+            evicted.append(entry)
+            freed += self.entries[entry[2]][2]
+            # Return an error message if the transaction does not pay more than the transactions it would replace
+            if entry[0] >= fee_rate:
+                for entry in evicted:
+                    heapq.heappush(self.worst, entry)
+                return "Mempool is full"
+        # Return an error message if the transaction is larger than the whole pool
+        if self.size - freed + size > self.max_size:
+            for entry in evicted:
+                heapq.heappush(self.worst, entry)
+            return "Mempool is full"
+        # We remove the evicted transactions
+        evicted = [self.remove(entry[2]) for entry in evicted]
+        # We add the transaction to the dictionaries and to both heaps
+        self.sequence += 1
+        self.transactions[transaction.hash] = transaction
+        self.entries[transaction.hash] = (fee_rate, self.sequence, size)
+        heapq.heappush(self.best, (-fee_rate, self.sequence, transaction.hash))
+        heapq.heappush(self.worst, (fee_rate, -self.sequence, transaction.hash))
+        self.size += size
+        # We reserve the funds spent by the transaction so that they cannot be spent twice
+        self.senders.setdefault(transaction.sender, {})[transaction.hash] = self.sequence
+        self.pending_spends[transaction.sender] = self.pending_spends.get(transaction.sender, 0) + transaction.amount + transaction.fee
+        # Returning the evicted transactions
+        return evicted
+
+    # Method for removing a transaction from the pool
+    def remove(self, hash):
+        transaction = self.transactions.pop(hash, None)
+        # Return None if the transaction is not in the pool
+        if transaction is None:
+            return None
+        # The heap entries are skipped later when they reach the top
+        self.size -= self.entries.pop(hash)[2]
+        # We release the funds reserved by the transaction
+        del self.senders[transaction.sender][hash]
+        if not self.senders[transaction.sender]:
+            del self.senders[transaction.sender]
+        self.pending_spends[transaction.sender] -= transaction.amount + transaction.fee
+        if not self.senders.get(transaction.sender):
+            del self.pending_spends[transaction.sender]
+        # We rebuild the heaps when most of their entries are outdated, so that their memory stays bounded
+        if max(len(self.best), len(self.worst)) > 2 * len(self.transactions) + 64:
+            self.best = [(-fee_rate, sequence, hash) for hash, (fee_rate, sequence, size) in self.entries.items()]
+            self.worst = [(fee_rate, -sequence, hash) for hash, (fee_rate, sequence, size) in self.entries.items()]
+            heapq.heapify(self.best)
+            heapq.heapify(self.worst)
+        return transaction
+
+    # Method for removing the transactions included in a block
+    def remove_included(self, block):
+        removed = [self.remove(transaction.hash) for transaction in block.transactions]
+        return [transaction for transaction in removed if transaction is not None]
+
+    # Method to get the hashes of the newest transactions of a sender that are no longer covered by the balance
+    def get_overspends(self, sender, balance):
+        hashes = []
+        spent = self.pending_spends.get(sender, 0)
+        # We go from the newest transaction to the oldest until the rest is covered
+        for hash in reversed(list(self.senders.get(sender, {}))):
+            if spent <= balance:
+                break
+            hashes.append(hash)
+            spent -= self.transactions[hash].amount + self.transactions[hash].fee
+        return hashes
+
+    # Method for selecting the transactions with the highest fee per byte that fit into a block
+    def get_block_template(self, max_size=MAX_BLOCK_SIZE):
+        selected = []
+        popped = []
+        size = 0
+        # We take transactions from the top of the heap until the next one does not fit
+        while self.best:
+            entry = heapq.heappop(self.best)
+            # Outdated entries are dropped for good
+            if not self.is_current(entry[2], entry[1]):
+                continue
+            popped.append(entry)
+            transaction_size = self.entries[entry[2]][2]
+            if size + transaction_size > max_size:
+                break
+            selected.append(self.transactions[entry[2]])
+            size += transaction_size
+        # We return the taken entries to the heap, the transactions stay in the pool until they are mined
+        for entry in popped:
+            heapq.heappush(self.best, entry)
+        return selected
+
+    # Method to get the coins reserved by the pending transactions of a sender
+    def get_pending_spend(self, sender):
+        return self.pending_spends.get(sender, 0)
+
+    # Method to get all pending transactions in the order of arrival
+    def get_transactions(self):
+        return list(self.transactions.values())
+
+    # Method to get the number of pending transactions
+    def __len__(self):
+        return len(self.transactions)
+
+# Defining the lookup index class for transactions, startups, NFTs, tokens and DApps
+class ChainIndex:
+    # Class constructor
+    def __init__(self):
+        self.blocks = {} # height of every block by its hash
+        self.transactions = {} # height of the block and position in it for every transaction hash
+        self.entities = {kind: {} for kind in ENTITY_KEYS} # height of the block and data of the first transaction in the chain for every entity name or token symbol
+        self.pending_entities = {kind: {} for kind in ENTITY_KEYS} # hash of the pending transaction for every entity name or token symbol
+        self.addresses = {} # height of the block and position in it of every transaction of an address, in the order of the chain
+        self.address_kinds = {} # the same for the transactions of an address that register an entity, by address and entity kind
+
+    # Method for adding all transactions of a new block to the index
+    def index_block(self, block):
+        self.index_locations(block)
+        # We go through all transactions in the block
+        for transaction in block.transactions:
+            # If the transaction contains data about a startup, NFT, token or DApp
+            if isinstance(transaction.data, dict):
+                for kind, key in ENTITY_KEYS.items():
+                    if key in transaction.data:
+                        # We remember the data by name, keeping the first occurrence
+                        self.entities[kind].setdefault(transaction.data[key], (block.index, transaction.data))
+
+    # Method for adding only the hashes of a block and its transactions to the index, when the names are restored from a snapshot
+    def index_locations(self, block):
+        # We remember the height of the block by its hash
+        self.blocks[block.hash] = block.index
+        # We remember where every transaction is, keeping the first occurrence
+        for position, transaction in enumerate(block.transactions):
+            self.transactions.setdefault(transaction.hash, (block.index, position))
+            # We add the transaction to the history of its sender and its recipient
+            kind = get_entity_kind(transaction)
+            for address in {transaction.sender, transaction.recipient}:
+                self.addresses.setdefault(address, []).append((block.index, position))
+                if kind is not None:
+                    self.address_kinds.setdefault((address, kind), []).append((block.index, position))
+
+    # Method for removing all transactions of a block removed from the chain from the index
+    def unindex_block(self, block):
+        # We forget the hash of the block
+        self.blocks.pop(block.hash, None)
+        # We go through all transactions in the block
+        for transaction in block.transactions:
+            # We remove only the entries that point to this block, entries of earlier blocks stay
+            if self.transactions.get(transaction.hash, (None,))[0] == block.index:
+                del self.transactions[transaction.hash]
+            # Blocks are removed from the end of the chain, so their entries are at the end of the address histories
+            kind = get_entity_kind(transaction)
+            for address in {transaction.sender, transaction.recipient}:
+                self.unindex_history(self.addresses, address, block.index)
+                if kind is not None:
+                    self.unindex_history(self.address_kinds, (address, kind), block.index)
+            if isinstance(transaction.data, dict):
+                for kind, key in ENTITY_KEYS.items():
+                    if key in transaction.data and self.entities[kind].get(transaction.data[key], (None,))[0] == block.index:
+                        del self.entities[kind][transaction.data[key]]
+
+    # Method for adding a pending transaction to the index of names
+    def index_pending(self, transaction):
+        if isinstance(transaction.data, dict):
+            for kind, key in ENTITY_KEYS.items():
+                if key in transaction.data:
+                    self.pending_entities[kind].setdefault(transaction.data[key], transaction.hash)
+
+    # Method for removing a pending transaction from the index of names
+    def unindex_pending(self, transaction):
+        if isinstance(transaction.data, dict):
+            for kind, key in ENTITY_KEYS.items():
+                # We release only the names reserved by this transaction
+                if key in transaction.data and self.pending_entities[kind].get(transaction.data[key]) == transaction.hash:
+                    del self.pending_entities[kind][transaction.data[key]]
+
+    # Method to get the hashes of pending transactions that reserved the names used by a block
+    def get_pending_conflicts(self, block):
+        hashes = set()
+        for transaction in block.transactions:
+            if isinstance(transaction.data, dict):
+                for kind, key in ENTITY_KEYS.items():
+                    if key in transaction.data and transaction.data[key] in self.pending_entities[kind]:
+                        hashes.add(self.pending_entities[kind][transaction.data[key]])
+        return hashes
+
+    # Method for removing all pending transactions from the index
+    def clear_pending(self):
+        self.pending_entities = {kind: {} for kind in ENTITY_KEYS}
+
+    # Method for rebuilding the index from a chain and a list of pending transactions
+    def rebuild(self, chain, pending_transactions):
+        # We reset the index
+        self.blocks = {}
+        self.transactions = {}
+        self.entities = {kind: {} for kind in ENTITY_KEYS}
+        self.addresses = {}
+        self.address_kinds = {}
+        self.clear_pending()
+        # We index all the blocks in the chain
+        for block in chain:
+            self.index_block(block)
+        # We index all pending transactions
+        for transaction in pending_transactions:
+            self.index_pending(transaction)
+
+    # Method to get the locations of all transactions in the index in a form that can be saved as JSON
+    def get_locations(self):
+        address_kinds = {kind: {} for kind in ENTITY_KINDS}
+        for (address, kind), locations in self.address_kinds.items():
+            address_kinds[kind][address] = locations
+        return {"transactions": self.transactions, "addresses": self.addresses, "address_kinds": address_kinds}
+
+    # Method for adding the locations of the transactions of later blocks saved as JSON to the index
+    def load_locations(self, locations):
+        # We keep the first occurrence of a transaction, as when the blocks are indexed one by one
+        for hash, location in locations["transactions"].items():
+            self.transactions.setdefault(hash, tuple(location))
+        # The histories of the later blocks continue the histories of the earlier ones
+        for address, history in locations["addresses"].items():
+            self.addresses.setdefault(address, []).extend(tuple(location) for location in history)
+        for kind, histories in locations["address_kinds"].items():
+            for address, history in histories.items():
+                self.address_kinds.setdefault((address, kind), []).extend(tuple(location) for location in history)
+
+    # Method to get the height of the block and the position in it of a transaction
+    def get_transaction_location(self, transaction_hash):
+        return self.transactions.get(transaction_hash)
+
+    # Method for removing the entries of a block from the end of one address history
+    @staticmethod
+    def unindex_history(histories, key, height):
+        locations = histories.get(key)
+        while locations and locations[-1][0] == height:
+            locations.pop()
+        # Empty histories are dropped, so addresses that only appeared in removed blocks do not stay in the index
+        if locations == []:
+            del histories[key]
+
+    # Method to get the locations of the transactions of an address, optionally only of those that register an entity of the given kind
+    def get_address_locations(self, address, kind=None):
+        if kind is None:
+            return self.addresses.get(address, [])
+        return self.address_kinds.get((address, kind), [])
+
+    # Method to get the height of a block by its hash
+    def get_block_height(self, block_hash):
+        return self.blocks.get(block_hash)
+
+    # Method to get the data of a startup, NFT, token or DApp from the chain
+    def get_entity(self, kind, name):
+        entry = self.entities[kind].get(name)
+        # Return None if the name is not in the chain
+        if entry is None:
+            return None
+        return entry[1]
+
+    # Method for checking whether a name is already used in the chain or by a pending transaction
+    def is_taken(self, kind, name):
+        return name in self.entities[kind] or name in self.pending_entities[kind]
+
+    # Method for checking whether a transaction registers a name that is already used in the chain or by a pending transaction
+    def uses_taken_name(self, transaction):
+        if isinstance(transaction.data, dict):
+            return any(key in transaction.data and self.is_taken(kind, transaction.data[key]) for kind, key in ENTITY_KEYS.items())
+        return False
+
+# Cancellation flag shared by the mining processes, set by the pool initializer
+mining_cancel_event = None
+
+# Function for initializing a mining process
+def init_mining_worker(cancel_event):
+    global mining_cancel_event
+    # We remember the flag with which the miner cancels the search
+    mining_cancel_event = cancel_event
+
+# Function for searching a range of nonces in a mining process
+def search_nonces(task):
+    # We unpack the fixed part of the block header and the range of nonces to check
+    header_prefix, target, start, end = task
+    # We hash the fixed part of the header once and copy this state for every nonce
+    midstate = hashlib.sha256(header_prefix)
+    # We go through all the nonces in the range
+    for nonce in range(start, end):
+        # From time to time we check whether the search has been cancelled
+        if nonce % CANCEL_CHECK_INTERVAL == 0 and mining_cancel_event.is_set():
+            return None, None, nonce - start
+        # We hash only the nonce on top of the copied state and compare the hash as a number with the target
+        block_hash = midstate.copy()
+        block_hash.update(UINT64.pack(nonce))
+        if int.from_bytes(block_hash.digest(), "big") <= target:
+            return nonce, block_hash.hexdigest(), nonce - start + 1
+    # Return no result if the range does not contain a suitable nonce
+    return None, None, end - start
+
+# Defining the parallel proof-of-work miner class
+class Miner:
+    # Class constructor
+    def __init__(self, workers=MINING_WORKERS, chunk_size=NONCE_CHUNK_SIZE):
+        self.workers = workers # number of mining processes
+        self.chunk_size = chunk_size # number of nonces in one mining task
+        self.cancel_event = multiprocessing.Event() # flag that stops the search in all processes
+        self.pool = None # pool of mining processes, started on the first search
+        self.hash_rate = 0 # hash rate achieved by the last search in hashes per second
+        self.lock = threading.Lock() # lock held by the running search
+
+    # Method for getting the pool of mining processes
+    def get_pool(self):
+        # We start the pool only once and reuse it for all the following blocks
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers, initializer=init_mining_worker, initargs=(self.cancel_event,))
+        return self.pool
+
+    # Method for searching the nonce of a block
+    def mine(self, header_prefix, target):
+        # Only one search runs at a time, because all searches share the cancellation flag
+        with self.lock:
+            # We reset the cancellation flag left from the previous search
+            self.cancel_event.clear()
+            pool = self.get_pool()
+            start_time = time.time()
+            # We keep two tasks per process in the queue so that no process stays idle
+            tasks = []
+            next_nonce = 0
+            hashes = 0
+            result = None
+            while result is None and not self.cancel_event.is_set():
+                # We split the next part of the nonce space into tasks
+                while len(tasks) < self.workers * 2:
+                    tasks.append(pool.apply_async(search_nonces, [(header_prefix, target, next_nonce, next_nonce + self.chunk_size)]))
+                    next_nonce += self.chunk_size
+                # We wait for the oldest task
+                nonce, hash, checked = tasks.pop(0).get()
+                hashes += checked
+                if nonce is not None:
+                    result = (nonce, hash)
+            # We stop the remaining tasks and wait for them so that they do not affect the next search
+            self.cancel_event.set()
+            for task in tasks:
+                hashes += task.get()[2]
+            # We calculate the achieved hash rate
+            elapsed = time.time() - start_time
+            self.hash_rate = hashes / elapsed if elapsed > 0 else 0
+            # Return None if the search was cancelled
+            if result is None:
+                return None
+            # Returning the winning nonce, the block hash and the hash rate
+            return result[0], result[1], self.hash_rate
+
+    # Method for cancelling the current search, for example when a competing block arrives
+    def cancel(self):
+        self.cancel_event.set()
+
+    # Method for stopping the mining processes
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+# Function for deriving an address from a seed and its number, the same seed and number always give the same address
+def derive_address(seed, index):
+    return hashlib.sha256(seed + UINT64.pack(index)).hexdigest()
+
+# Function for deriving a range of addresses from a seed in an address generation process
+def derive_addresses(task):
+    seed, start, end = task
+    # We hash the seed once and copy this state for every number, as the miner does with the block header
+    midstate = hashlib.sha256(seed)
+    addresses = []
+    for index in range(start, end):
+        address_hash = midstate.copy()
+        address_hash.update(UINT64.pack(index))
+        addresses.append(address_hash.hexdigest())
+    # The addresses are returned as ready lines of the output file, which is cheaper to pass between processes than a list
+    return ("\n".join(addresses) + "\n").encode()
+
+# Function for searching a range of numbers for an address with the given hexadecimal prefix in an address generation process
+def search_vanity(task):
+    seed, prefix, start, end = task
+    # We compare the whole bytes of the prefix directly with the digest and the odd last digit with the upper half of the next byte
+    prefix_bytes = bytes.fromhex(prefix[:len(prefix) // 2 * 2])
+    last_digit = int(prefix[-1], 16) if len(prefix) % 2 else None
+    midstate = hashlib.sha256(seed)
+    for index in range(start, end):
+        address_hash = midstate.copy()
+        address_hash.update(UINT64.pack(index))
+        digest = address_hash.digest()
+        if digest.startswith(prefix_bytes) and (last_digit is None or digest[len(prefix_bytes)] >> 4 == last_digit):
+            return index, address_hash.hexdigest(), index - start + 1
+    # Return no result if the range does not contain a suitable address
+    return None, None, end - start
+
+# Defining the class that generates addresses in bulk and searches for addresses with a chosen prefix
+class AddressGenerator:
+    # Class constructor
+    def __init__(self, workers=ADDRESS_WORKERS, chunk_size=ADDRESS_CHUNK_SIZE):
+        self.workers = workers # number of address generation processes
+        self.chunk_size = chunk_size # number of addresses in one task
+        self.pool = None # pool of address generation processes, started on the first use
+        self.rate = 0 # addresses generated or checked per second by the last call
+
+    # Method for getting the pool of address generation processes
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers)
+        return self.pool
+
+    # Method for creating a new random seed, which must be kept secret by the owner of the addresses
+    @staticmethod
+    def new_seed():
+        return secrets.token_bytes(ADDRESS_SEED_SIZE)
+
+    # Method for writing the given number of addresses derived from a seed to a binary file, one per line, and returning the seed
+    def generate(self, count, output, seed=None):
+        seed = seed if seed is not None else self.new_seed()
+        pool = self.get_pool()
+        start_time = time.time()
+        # We keep two tasks per process in the queue and write the results in order, so memory does not grow with the count
+        tasks = collections.deque()
+        next_index = 0
+        while next_index < count or tasks:
+            while next_index < count and len(tasks) < self.workers * 2:
+                tasks.append(pool.apply_async(derive_addresses, [(seed, next_index, min(next_index + self.chunk_size, count))]))
+                next_index += self.chunk_size
+            output.write(tasks.popleft().get())
+        elapsed = time.time() - start_time
+        self.rate = count / elapsed if elapsed > 0 else 0
+        return seed
+
+    # Method for searching for an address that starts with the given hexadecimal digits, calling the progress function with the attempts per second
+    def find_vanity(self, prefix, seed=None, max_attempts=None, progress=None):
+        # Addresses are lowercase hexadecimal, so other prefixes can never be found
+        if len(prefix) > 64 or any(digit not in "0123456789abcdef" for digit in prefix):
+            raise ValueError(f"invalid address prefix {prefix!r}")
+        seed = seed if seed is not None else self.new_seed()
+        pool = self.get_pool()
+        start_time = time.time()
+        # Without a limit the search goes on until an address is found
+        end = max_attempts if max_attempts is not None else float("inf")
+        tasks = collections.deque()
+        next_index = 0
+        attempts = 0
+        result = None
+        while result is None and (next_index < end or tasks):
+            while next_index < end and len(tasks) < self.workers * 2:
+                tasks.append(pool.apply_async(search_vanity, [(seed, prefix, next_index, min(next_index + self.chunk_size, end))]))
+                next_index += self.chunk_size
+            # The tasks are checked in order, so the address with the lowest number is found for a given seed
+            index, address, checked = tasks.popleft().get()
+            attempts += checked
+            if index is not None:
+                result = (address, seed, index)
+            elapsed = time.time() - start_time
+            self.rate = attempts / elapsed if elapsed > 0 else 0
+            if progress is not None:
+                progress(attempts, self.rate)
+        # We wait for the remaining tasks so that they do not delay the next call
+        for task in tasks:
+            task.get()
+        # Return None if no address was found within the allowed number of attempts
+        if result is None:
+            return None
+        # Returning the address, the seed and the number from which it is derived, and the attempts per second
+        return result[0], result[1], result[2], self.rate
+
+    # Method for stopping the address generation processes
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+# Function for checking the hashes, the targets, the proof of work and the links of a sequence of blocks in a validation process
+def check_blocks(task):
+    # We unpack the expected height of the first block, the times and targets of the blocks before it and the block headers with transaction hashes
+    start, window, headers = task
+    window = collections.deque(window, maxlen=RETARGET_WINDOW + 1)
+    now = time.time()
+    previous_hash = None
+    for height, (index, timestamp, transaction_hashes, previous_block_hash, target, nonce, hash) in enumerate(headers, start):
+        # We check the height of the block and the link to the previous block of the same sequence
+        if index != height or (previous_hash is not None and previous_block_hash != previous_hash):
+            return height, None, None
+        # We check that the block has a valid time and the target calculated from the blocks before it
+        if not check_timestamp(timestamp, window, now) or target != calculate_next_target(window):
+            return height, None, None
+        # We check that no transaction repeats, that the hash matches the block fields and satisfies the target
+        if has_duplicate_hashes(transaction_hashes) or hash != calculate_block_hash(index, timestamp, calculate_merkle_root(transaction_hashes), previous_block_hash, target, nonce) or not meets_target(hash, target):
+            return height, None, None
+        previous_hash = hash
+        window.append((timestamp, target))
+    # Returning no invalid height, the link of the first block and the hash of the last block for checking the links between sequences
+    return None, headers[0][3], headers[-1][6]
+
+# Defining the parallel chain validator class
+class ChainValidator:
+    # Class constructor
+    def __init__(self, workers=VALIDATION_WORKERS, chunk_size=VALIDATION_CHUNK_SIZE):
+        self.workers = workers # number of validation processes
+        self.chunk_size = chunk_size # number of blocks in one validation task
+        self.pool = None # pool of validation processes, started on the first large validation
+
+    # Method for getting the pool of validation processes
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers)
+        return self.pool
+
+    # Method for splitting the blocks of a chain between the start and the end height into validation tasks
+    def make_tasks(self, chain, start, end):
+        # Every task gets the times and targets of the blocks before it, so that the targets can be checked in all tasks at the same time
+        window = target_window(chain[max(start - RETARGET_WINDOW - 1, 0):start])
+        for chunk_start in range(start, end, self.chunk_size):
+            # We send only the header fields and the transaction hashes to the processes
+            headers = [(block.index, block.timestamp, [transaction.hash for transaction in block.transactions], block.previous_hash, block.target, block.nonce, block.hash) for block in chain[chunk_start:min(chunk_start + self.chunk_size, end)]]
+            yield chunk_start, list(window), headers
+            window.extend((header[1], header[4]) for header in headers)
+
+    # Method for checking the blocks of a chain starting from the given height and ending before the given end height or at the end of the chain
+    def validate(self, chain, start=1, end=None):
+        end = len(chain) if end is None else end
+        # There is nothing to check if there are no blocks after the start
+        if start >= end:
+            return True
+        tasks = self.make_tasks(chain, start, end)
+        # Small ranges are checked in this process, large ones are split between the processes of the pool
+        if self.workers <= 1 or end - start <= self.chunk_size:
+            results = map(check_blocks, tasks)
+        else:
+            results = self.get_pool().imap(check_blocks, tasks)
+        # We check the links between the sequences in one pass, starting from the block before the start
+        previous_hash = chain[start - 1].hash
+        for invalid_height, first_link, last_hash in results:
+            if invalid_height is not None or first_link != previous_hash:
+                return False
+            previous_hash = last_hash
+        # Return True if all blocks are valid
+        return True
+
+    # Method for stopping the validation processes
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+# Defining the blockchain class
+class Blockchain:
+    # Class constructor
+    def __init__(self, data_dir=None):
+        # The chain is kept in the block store on disk if a directory is given, otherwise in memory
+        self.data_dir = data_dir # directory of the block store and the snapshots
+        self.chain = BlockStore(data_dir) if data_dir else [] # list of blocks in the chain
+        self.mempool = Mempool() # pool of pending transactions ordered by fee
+        self.nodes = set() # many addresses of other network nodes
+        self.ledger = Ledger() # index of address balances maintained together with the chain
+        self.chain_index = ChainIndex() # index of transactions and entity names maintained together with the chain
+        self.miner = Miner() # parallel proof-of-work miner
+        self.validator = ChainValidator() # parallel chain validator
+        self.validated_height = 0 # height up to which our chain has already been checked
+        self.mining_stats = {"blocks": 0, "cancelled": 0, "seconds": 0.0, "last_seconds": 0.0} # number of mined and cancelled blocks and the time spent mining them
+        self.lock = threading.RLock() # lock held by the only thread that may change the blockchain
+        self.committer = None # identifier of the thread that holds the lock
+        self.commit_depth = 0 # number of nested changes made by the committer
+        self.version = 0 # counter of changes, odd while a change is in progress
+        # If the store already contains blocks, then we restore the balances and the index from the last saved state and the blocks after it
+        if len(self.chain):
+            self.restore_state()
+        else:
+            self.create_genesis_block() # create a genesis block
+
+    # Context manager through which all changes of the blockchain are made, one thread at a time
+    @contextlib.contextmanager
+    def commit(self):
+        with self.lock:
+            self.committer = threading.get_ident()
+            self.commit_depth += 1
+            # The version becomes odd when the outermost change starts, so that readers know that the state is changing
+            if self.commit_depth == 1:
+                self.version += 1
+            try:
+                yield
+            finally:
+                self.commit_depth -= 1
+                # The version becomes even again when the outermost change is finished
+                if self.commit_depth == 0:
+                    self.version += 1
+                    self.committer = None
+
+    # Method for reading a consistent state without blocking: the function is repeated if a change happened while it was running
+    def read(self, function):
+        # The committer itself reads its own state directly
+        if self.committer == threading.get_ident():
+            return function()
+        for _ in range(READ_ATTEMPTS):
+            version = self.version
+            # We wait without spinning until the committer finishes its change
+            if version % 2 == 1:
+                with self.lock:
+                    version = self.version
+            try:
+                result = function()
+            except Exception:
+                # Errors caused by a change in progress are ignored, other errors are raised
+                if self.version == version:
+                    raise
+            else:
+                if self.version == version:
+                    return result
+        # A read that is longer than the gaps between changes would be repeated forever, so after a few attempts we stop the changes while it runs
+        with self.lock:
+            return function()
+
+    # Number of coins burned in the chain
+    @property
+    def burned_coins(self):
+        return self.ledger.supply[-1][1] if self.ledger.supply else 0
+
+    # List of pending transactions in the order of arrival
+    @property
+    def pending_transactions(self):
+        return self.mempool.get_transactions()
+
+    # Method for creating a genesis block
+    def create_genesis_block(self):
+        # Generating the first address of the blockchain creator
+        creator_address = self.generate_address()
+        # We create a transaction that credits the maximum number of coins to this address
+        genesis_transaction = Transaction("0", creator_address, MAX_SUPPLY, 0, None)
+        # Create the first block with this transaction
+        genesis_block = Block(0, time.time(), [genesis_transaction], "0", 0, "0")
+        # The genesis block gets its own hash so that the locators of nodes with different genesis blocks do not match
+        genesis_block.hash = genesis_block.calculate_hash()
+        # Add it to the chain
+        self.append_block(genesis_block)
+
+    # Method for generating a new address
+    def generate_address(self):
+        # We derive the address from a new seed of the cryptographically secure generator, the result is 64 hexadecimal digits
+        return derive_address(AddressGenerator.new_seed(), 0)
+
+    # Method to get the last block in the chain
+    def get_last_block(self):
+        return self.chain[-1]
+
+    # Method for adding a new block to the chain
+    def add_block(self, block):
+        with self.commit():
+            window = self.get_target_window()
+            # We check that the block has the correct index, hash, link to the previous block, time and target, that its hash satisfies the target and that no transaction repeats
+            if block.index == len(self.chain) and not has_duplicate_hashes([transaction.hash for transaction in block.transactions]) and block.hash == block.calculate_hash() and block.previous_hash == self.get_last_block().hash and check_timestamp(block.timestamp, window, time.time()) and block.target == calculate_next_target(window) and meets_target(block.hash, block.target):
+                # We stop mining a competing block at the same height
+                self.miner.cancel()
+                # Adding a block to the chain
+                self.append_block(block)
+                # We remove from the pending transactions only those included in the block
+                for transaction in self.mempool.remove_included(block):
+                    self.chain_index.unindex_pending(transaction)
+                # We evict the pending transactions that the block made invalid
+                self.evict_invalid_pending(block)
+                return True
+            else:
+                # Return False if the block is invalid
+                return False
+
+    # Method for evicting the pending transactions that conflict with a new block
+    def evict_invalid_pending(self, block):
+        # Transactions that reserved names now used in the chain and transactions whose senders no longer have enough funds for them
+        self.evict_pending(self.chain_index.get_pending_conflicts(block), {transaction.sender for transaction in block.transactions})
+
+    # Method for evicting the given pending transactions and the pending transactions that the balances of the given addresses no longer cover
+    def evict_pending(self, hashes, addresses):
+        for address in addresses:
+            hashes.update(self.mempool.get_overspends(address, self.ledger.get_balance(address)))
+        # We remove them from the pool and release their names
+        for hash in hashes:
+            transaction = self.mempool.remove(hash)
+            if transaction is not None:
+                self.chain_index.unindex_pending(transaction)
+
+    # Method for appending a checked block to the chain and updating the balances and the index
+    def append_block(self, block):
+        # Adding a block to the chain
+        self.chain.append(block)
+        # We apply the transactions of the block to the balances
+        self.ledger.apply_block(block)
+        # We add the transactions of the block to the index
+        self.chain_index.index_block(block)
+        # A node with a block store regularly saves its state so that other nodes and the node itself after a restart can start from it
+        # The locations are saved only for the blocks since the previous snapshot, but the balances and the names are saved whole, so that save grows with the number of addresses
+        if self.data_dir and block.index and block.index % SNAPSHOT_INTERVAL == 0:
+            self.save_snapshot(os.path.join(self.data_dir, "snapshot.json"))
+            self.save_locations(block.index)
+
+    # Method for removing all blocks after the given height and returning their transactions to the pool of pending transactions
+    def rollback_to(self, height):
+        with self.commit():
+            self.readmit_transactions(self.remove_blocks(height))
+
+    # Method for removing all blocks after the given height and cancelling their transactions, returning the removed blocks in the order of the chain
+    def remove_blocks(self, height):
+        with self.commit():
+            blocks = []
+            # We go from the last block down to the given height
+            for block_height in range(len(self.chain) - 1, height, -1):
+                block = self.chain[block_height]
+                # We cancel the transactions of the block in the balances and the index
+                self.ledger.revert_block(block)
+                self.chain_index.unindex_block(block)
+                blocks.append(block)
+            # The removed blocks will have to be checked again
+            self.validated_height = min(self.validated_height, max(height, 0))
+            # We remove the blocks from the chain
+            if isinstance(self.chain, list):
+                del self.chain[height + 1:]
+            else:
+                self.chain.truncate(height + 1)
+            blocks.reverse()
+            return blocks
+
+    # Method for returning the transactions of removed blocks to the pool and evicting the pending transactions that the removal made invalid
+    def readmit_transactions(self, blocks):
+        with self.commit():
+            addresses = set()
+            for block in blocks:
+                for transaction in block.transactions:
+                    addresses.update((transaction.sender, transaction.recipient))
+                    # Coins issued by the chain, transactions that are in the chain again and transactions with names taken in the meantime are not returned
+                    if transaction.sender == "0" or self.chain_index.get_transaction_location(transaction.hash) is not None or self.chain_index.uses_taken_name(transaction):
+                        continue
+                    self.add_pending_transaction(transaction)
+            # The senders and the recipients of the removed transactions may no longer cover their pending transactions
+            self.evict_pending(set(), addresses)
+
+    # Method for building a block locator: hashes of the last blocks, then with exponentially growing gaps, down to the genesis block
+    def get_block_locator(self):
+        locator = []
+        height = len(self.chain) - 1
+        step = 1
+        while height > 0:
+            locator.append(self.chain[height].hash)
+            # After the first ten blocks we double the gap between the heights
+            if len(locator) >= 10:
+                step *= 2
+            height -= step
+        # The locator always ends with the genesis block
+        locator.append(self.chain[0].hash)
+        return locator
+
+    # Method to get the headers of the blocks that follow the last common block with a locator
+    def get_headers(self, locator, limit):
+        def build():
+            # We find the first block of the locator that is in our chain
+            fork_height = -1
+            for block_hash in locator:
+                height = self.chain_index.get_block_height(block_hash)
+                if height is not None:
+                    fork_height = height
+                    break
+            # Returning the height of the common block and the headers of the following blocks
+            return {
+                "fork_height": fork_height,
+                "headers": [self.chain[height].get_header() for height in range(fork_height + 1, min(fork_height + 1 + limit, len(self.chain)))]
+            }
+        return self.read(build)
+
+    # Method for going through the blocks from the given height without loading the whole chain into memory
+    def iter_blocks(self, start=0):
+        if isinstance(self.chain, list):
+            return iter(self.chain[start:])
+        return self.chain.iter_blocks(start)
+
+    # Method for exporting the blocks from the given height to a file
+    def export_chain(self, path, start=0, format="ndjson"):
+        with open(path, "wb") as output:
+            return write_blocks(self.iter_blocks(start), output, format)
+
+    # Method for importing blocks from a file, returning the number of added blocks
+    def import_chain(self, path, format="ndjson"):
+        count = 0
+        with open(path, "rb") as input:
+            for block in read_blocks(input, format):
+                # Blocks that we already have are skipped
+                if block.index < len(self.chain) and self.chain[block.index].hash == block.hash:
+                    continue
+                # A node that has only its own genesis block takes the genesis block of the file
+                if block.index == 0 and len(self.chain) == 1:
+                    with self.commit():
+                        self.rollback_to(-1)
+                        self.append_block(block)
+                # The other blocks are checked as blocks received from the network, and we stop at the first invalid one
+                elif not self.add_block(block):
+                    break
+                count += 1
+        return count
+
+    # Method for creating a snapshot of the balances, the supply totals and the names at the given height, with a hash committing to it
+    def create_snapshot(self, height=None):
+        def build():
+            snapshot_height = len(self.chain) - 1 if height is None else height
+            ledger = Ledger()
+            ledger.balances = dict(self.ledger.balances)
+            ledger.supply = list(self.ledger.supply)
+            ledger.supply_start = self.ledger.supply_start
+            ledger.work = list(self.ledger.work)
+            chain_index = ChainIndex()
+            chain_index.entities = {kind: dict(entities) for kind, entities in self.chain_index.entities.items()}
+            # For an earlier height we cancel the later blocks in copies of the balances and the names
+            for block_height in range(len(self.chain) - 1, snapshot_height, -1):
+                block = self.chain[block_height]
+                ledger.revert_block(block)
+                chain_index.unindex_block(block)
+            snapshot = {
+                "height": snapshot_height,
+                "block_hash": self.chain[snapshot_height].hash,
+                "supply": list(ledger.supply[-1]),
+                "work": ledger.work[-1],
+                "balances": ledger.balances,
+                "entities": chain_index.entities
+            }
+            snapshot["hash"] = calculate_snapshot_hash(snapshot)
+            return snapshot
+        return self.read(build)
+
+    # Method for saving a snapshot to a file, replacing the previous one only when the new one is completely written
+    def save_snapshot(self, path, height=None):
+        snapshot = self.create_snapshot(height)
+        with open(path + ".tmp", "w") as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        os.replace(path + ".tmp", path)
+        return snapshot
+
+    # Method for saving the locations of the transactions of the blocks since the previous snapshot, so that every save takes the same time however long the chain is
+    def save_locations(self, height):
+        directory = os.path.join(self.data_dir, "locations")
+        os.makedirs(directory, exist_ok=True)
+        # The first part also contains the genesis block
+        chain_index = ChainIndex()
+        for block in self.chain.iter_blocks(height - SNAPSHOT_INTERVAL + 1 if height > SNAPSHOT_INTERVAL else 0):
+            chain_index.index_locations(block)
+        locations = chain_index.get_locations()
+        locations.update({"height": height, "block_hash": self.chain[height].hash})
+        path = os.path.join(directory, f"{height}.json")
+        with open(path + ".tmp", "w") as locations_file:
+            json.dump(locations, locations_file)
+        os.replace(path + ".tmp", path)
+
+    # Method for taking the balances, the supply totals and the names from a checked snapshot
+    def apply_snapshot(self, snapshot):
+        self.ledger.balances = dict(snapshot["balances"])
+        self.chain_index.entities = {kind: {name: tuple(entry) for name, entry in snapshot["entities"][kind].items()} for kind in ENTITY_KEYS}
+        self.ledger.supply = [tuple(snapshot["supply"])]
+        self.ledger.work = [snapshot["work"]]
+        self.ledger.supply_start = snapshot["height"]
+        self.validated_height = snapshot["height"]
+
+    # Method for loading the state saved by the node at its last snapshot, returning the height of the snapshot or -1 if there is no usable state
+    def load_state(self):
+        try:
+            snapshot = load_snapshot(os.path.join(self.data_dir, "snapshot.json"))
+            height = snapshot["height"]
+            # The snapshot must match its hash and its block must still be in our chain
+            if snapshot.get("hash") != calculate_snapshot_hash(snapshot) or not 0 <= height < len(self.chain) or self.chain[height].hash != snapshot["block_hash"]:
+                return -1
+            # The locations are saved in parts at every snapshot height, and every part must end with a block of our chain
+            for part_height in range(SNAPSHOT_INTERVAL, height + 1, SNAPSHOT_INTERVAL):
+                locations = load_snapshot(os.path.join(self.data_dir, "locations", f"{part_height}.json"))
+                if locations["height"] != part_height or locations["block_hash"] != self.chain[part_height].hash:
+                    raise ValueError("locations of another chain")
+                self.chain_index.load_locations(locations)
+            if height % SNAPSHOT_INTERVAL:
+                raise ValueError("snapshot between the parts of the locations")
+            # The heights of the blocks up to the snapshot are already in the index file of the store
+            self.chain_index.blocks = {hash: block_height for hash, block_height in self.chain.hashes.items() if block_height <= height}
+            self.apply_snapshot(snapshot)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Without a usable state we start from empty balances and an empty index
+            self.ledger = Ledger()
+            self.chain_index = ChainIndex()
+            return -1
+        return height
+
+    # Method for restoring the balances and the index of the stored chain, replaying only the blocks after the last snapshot
+    def restore_state(self):
+        for block in self.chain.iter_blocks(self.load_state() + 1):
+            self.ledger.apply_block(block)
+            self.chain_index.index_block(block)
+
+    # Method for starting the node from a snapshot and a stream of blocks, replaying only the blocks after the snapshot
+    # The hash of the snapshot must be known from a trusted source, a snapshot that only matches its own hash could contain any balances
+    def bootstrap(self, snapshot, blocks, expected_hash):
+        # We check that the snapshot is the trusted one and that its balances add up to its supply totals
+        if not isinstance(snapshot, dict) or snapshot.get("hash") != expected_hash or calculate_snapshot_hash(snapshot) != expected_hash or not check_snapshot_balances(snapshot):
+            return "Invalid snapshot"
+        height = snapshot["height"]
+        # The chain is built by a separate node, so that our chain stays unchanged until the new one is complete
+        directory = os.path.join(self.data_dir, "bootstrap") if self.data_dir else None
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+        node = Blockchain(directory)
+        node.remove_blocks(-1)
+        window = target_window([])
+        now = time.time()
+        for block in blocks:
+            if block.index <= height:
+                # The state up to the snapshot is not replayed, but the blocks must be linked, match their hashes and have valid times and proof of work
+                if block.index != len(node.chain) or has_duplicate_hashes([transaction.hash for transaction in block.transactions]) or block.hash != block.calculate_hash():
+                    break
+                if block.index > 0 and (block.previous_hash != node.get_last_block().hash or not check_timestamp(block.timestamp, window, now) or block.target != calculate_next_target(window) or not meets_target(block.hash, block.target)):
+                    break
+                node.chain.append(block)
+                node.chain_index.index_locations(block)
+                window.append((block.timestamp, block.target))
+                # At the height of the snapshot we take the state from it instead of replaying the transactions
+                if block.index == height:
+                    if block.hash != snapshot["block_hash"]:
+                        break
+                    node.apply_snapshot(snapshot)
+            # The blocks after the snapshot are checked and applied as usual
+            elif not node.add_block(block):
+                break
+        # If the blocks do not reach the snapshot, then we keep our chain
+        if len(node.chain) <= height or node.chain[height].hash != snapshot["block_hash"]:
+            if directory:
+                node.chain.close()
+                shutil.rmtree(directory, ignore_errors=True)
+            return "Blocks do not match the snapshot"
+        with self.commit():
+            # We stop mining on our old chain and take the chain, the balances and the index of the new node with an empty pool of pending transactions
+            self.miner.cancel()
+            if directory:
+                # The files of the new block store replace ours
+                node.chain.close()
+                self.chain.close()
+                for name in os.listdir(directory):
+                    # The saved locations of our chain are replaced together
+                    if os.path.isdir(os.path.join(self.data_dir, name)):
+                        shutil.rmtree(os.path.join(self.data_dir, name))
+                    os.replace(os.path.join(directory, name), os.path.join(self.data_dir, name))
+                os.rmdir(directory)
+                self.chain = BlockStore(self.data_dir)
+            else:
+                self.chain = node.chain
+            self.ledger = node.ledger
+            self.chain_index = node.chain_index
+            self.validated_height = node.validated_height
+            self.mempool = Mempool()
+            return "Chain bootstrapped from the snapshot"
+
+    # Method for creating a new transaction
+    def create_transaction(self, sender, recipient, amount, fee, data):
+        with self.commit():
+            # Checking that the sender and recipient have the correct address format
+            if len(sender) == 64 and len(recipient) == 64:
+                # We check that the amount and commission are non-negative and do not exceed the maximum number of coins
+                if 0 <= amount <= MAX_SUPPLY and 0 <= fee <= MAX_SUPPLY:
+                    # We check that the sender has sufficient funds for the transfer
+                    if self.get_available_balance(sender) >= amount + fee:
+                        # Create a new transaction
+                        transaction = Transaction(sender, recipient, amount, fee, data)
+                        # Add it to the list of pending transactions
+                        error = self.add_pending_transaction(transaction)
+                        # Return an error message if the transaction was not accepted
+                        if error:
+                            return error
+                        # Returning the transaction hash
+                        return transaction.hash
+                    else:
+                        # Return an error message if there are insufficient funds
+                        return "Insufficient funds"
+                else:
+                    # We return an error message if the amount or commission is incorrect
+                    return "Invalid amount or fee"
+            else:
+                # Return an error message if the addresses are incorrect
+                return "Invalid sender or recipient address"
+
+    # Method for adding a transaction to the list of pending transactions
+    def add_pending_transaction(self, transaction):
+        with self.commit():
+            # Add it to the mempool, which reserves the funds spent by the transaction so that they cannot be spent twice
+            evicted = self.mempool.add(transaction)
+            # Return an error message if the mempool rejected the transaction
+            if isinstance(evicted, str):
+                return evicted
+            # We release the names of the transactions evicted from the mempool
+            for evicted_transaction in evicted:
+                self.chain_index.unindex_pending(evicted_transaction)
+            # We reserve the names used by the transaction so that they cannot be used twice
+            self.chain_index.index_pending(transaction)
+            return None
+
+    # Method to get address balance
+    def get_balance(self, address):
+        # We return the confirmed balance from the ledger
+        return self.ledger.get_balance(address)
+
+    # Method to get the mined, burned, commission and circulating coins at the given height without replaying the chain
+    def get_supply(self, height=None):
+        return self.read(lambda: self.ledger.get_supply(height))
+
+    # Method to get address balance minus the funds reserved by pending transactions
+    def get_available_balance(self, address):
+        # Both values are read from the same state, so that a block added in between does not count the same coins twice
+        return self.read(lambda: self.ledger.get_balance(address) - self.mempool.get_pending_spend(address))
+
+    # Method for calculating block hash
+    def calculate_hash(self, index, timestamp, transactions, previous_hash, target, nonce):
+        # Transactions are included in the block hash by the Merkle root of their hashes
+        return calculate_block_hash(index, timestamp, calculate_merkle_root([transaction.hash for transaction in transactions]), previous_hash, target, nonce)
+
+    # Method to get the times and targets of the last blocks, from which the time and the target of the next block are checked
+    def get_target_window(self):
+        return target_window(self.chain[max(len(self.chain) - RETARGET_WINDOW - 1, 0):])
+
+    # Method to get the target of the next block from the times and targets of the last blocks
+    def get_next_target(self):
+        return calculate_next_target(self.get_target_window())
+
+    # Method to get the total work of our blocks after the given height, with which another chain from the same block is compared
+    def get_work_after(self, height):
+        work = self.ledger.get_work(height) if height >= 0 else 0
+        # Below the first block of the work index the work is summed from the blocks themselves
+        if work is None:
+            return sum(calculate_block_work(block.index, block.target) for block in self.iter_blocks(height + 1))
+        return self.ledger.get_work() - work
+
+    # Method for mining a new block
+    def mine_block(self):
+        # We get the index, time and hash of the last block
+        # The block template is taken at once, and the transactions submitted while mining stay in the pool for the next block
+        with self.commit():
+            last_block = self.get_last_block()
+            # The target of the block follows from the times of the last blocks
+            target = self.get_next_target()
+            # We take the pending transactions with the highest fees that fit into the block
+            transactions = self.mempool.get_block_template(MAX_BLOCK_SIZE)
+        index = last_block.index + 1
+        timestamp = time.time()
+        previous_hash = last_block.hash
+        # We serialize the fixed part of the block header only once
+        header_prefix = block_header_prefix(index, timestamp, calculate_merkle_root([transaction.hash for transaction in transactions]), previous_hash, target)
+        # We search for a nonce whose hash satisfies the target on all processor cores
+        start_time = time.time()
+        result = self.miner.mine(header_prefix, target)
+        # We record the time spent mining, also when the search was cancelled, as a change so that readers see all statistics of one moment
+        with self.commit():
+            self.mining_stats["last_seconds"] = time.time() - start_time
+            self.mining_stats["seconds"] += self.mining_stats["last_seconds"]
+            self.mining_stats["cancelled" if result is None else "blocks"] += 1
+        # Return None if mining was cancelled by a competing block
+        if result is None:
+            return None
+        nonce, hash, hash_rate = result
+        # Create a new block with the received data
+        block = Block(index, timestamp, transactions, previous_hash, nonce, hash, target)
+        # Adding a new block to the chain, return None if another block took its place while mining
+        if not self.add_block(block):
+            return None
+        # Returning a new block
+        return block
+
+    # Method to get the current target, the block times, the hash rate and the time spent mining, for tuning the miners
+    def get_mining_stats(self):
+        def build():
+            blocks = self.chain[max(len(self.chain) - RETARGET_WINDOW - 1, 1):]
+            intervals = [block.timestamp - previous_block.timestamp for previous_block, block in zip(blocks, blocks[1:])]
+            target = self.get_next_target()
+            # The network hash rate is estimated from the expected number of hashes of the blocks in the window and the time they took
+            work = sum(calculate_block_work(block.index, block.target) for block in blocks[1:])
+            span = blocks[-1].timestamp - blocks[0].timestamp if intervals else 0
+            return {
+                "height": len(self.chain) - 1,
+                "target": target,
+                "difficulty": MAX_TARGET / target,
+                "target_block_interval": TARGET_BLOCK_INTERVAL,
+                "block_interval": {
+                    "count": len(intervals),
+                    "mean": statistics.mean(intervals) if intervals else None,
+                    "min": min(intervals) if intervals else None,
+                    "max": max(intervals) if intervals else None,
+                    "stdev": statistics.stdev(intervals) if len(intervals) > 1 else None
+                },
+                "network_hash_rate": work / span if span > 0 else None,
+                "local_hash_rate": self.miner.hash_rate,
+                "mining": dict(self.mining_stats)
+            }
+        return self.read(build)
+
+    # Method for checking the validity of the chain
+    def is_valid(self, chain=None):
+        # Another chain is checked completely, starting from the second block
+        if chain is not None:
+            return self.validator.validate(chain, 1)
+        while True:
+            # In our own chain we check only the blocks added since the last check, up to the last block at the start of the check
+            start, end, end_hash = self.read(lambda: (self.validated_height + 1, len(self.chain), self.get_last_block().hash))
+            try:
+                valid = self.validator.validate(self.chain, start, end)
+            except IndexError:
+                # The chain was shortened while it was being checked, so we check it again
+                continue
+            with self.commit():
+                # If the checked blocks were replaced in the meantime, then the result says nothing about our chain and we check it again
+                if len(self.chain) < end or self.chain[end - 1].hash != end_hash:
+                    continue
+                # We remember the checked height so that the next check starts after it, the blocks added during the check are checked next time
+                if valid:
+                    self.validated_height = end - 1
+                return valid
+
+    # Method for adding a new node to the network
+    def add_node(self, node_address):
+        # Checking that the host address is in the correct format
+        if node_address.startswith("http://") or node_address.startswith("https://"):
+            # Adding a node address to a set of nodes
+            self.nodes.add(node_address)
+            # Returning a success message
+            return f"Node {node_address} added to the network"
+        else:
+            # Returning an error message
+            return "Invalid node address"
+
+    # Method for synchronizing the chain with other network nodes
+    def sync_chain(self):
+        # We query all the nodes concurrently and download only the blocks we are missing from the best one
+        result = ChainSynchronizer(self).run()
+        # If a valid chain with more work is found
+        if result:
+            fork_height, blocks = result
+            with self.commit():
+                # Our chain may have changed during the download, then the blocks are applied only if they still continue it and have more work than our blocks
+                if fork_height >= len(self.chain) or (fork_height >= 0 and blocks[0].previous_hash != self.chain[fork_height].hash) or sum(calculate_block_work(block.index, block.target) for block in blocks) <= self.get_work_after(fork_height):
+                    return "Our chain is up to date"
+                # We remove our blocks after the last common block
+                removed = self.remove_blocks(fork_height)
+                # We add the missing blocks
+                for block in blocks:
+                    # The genesis block of another node is taken as is, the other blocks are checked again
+                    if block.index == 0:
+                        self.append_block(block)
+                    elif not self.add_block(block):
+                        # If a block is invalid, then we restore our own blocks and return the transactions of the received blocks to the pool
+                        received = self.remove_blocks(fork_height)
+                        for our_block in removed:
+                            self.append_block(our_block)
+                        self.readmit_transactions(received)
+                        return "Invalid blocks received from the network, our chain is kept"
+                # The transactions of our removed blocks that are not in the new chain return to the pool
+                self.readmit_transactions(removed)
+            # Returning a success message
+            return "Chain synchronized with the network"
+        else:
+            # We return a message that our chain is up to date
+            return "Our chain is up to date"
+
+    # Method for adding a new startup to a block
+    def create_startup(self, sender, startup_name, startup_description, startup_date, fundraising_date, investment_offer, nft_info, required_funds, token_name, dapp_name, dapp_url):
+        with self.commit():
+            # Checking that the sender has the correct address format
+            if len(sender) == 64:
+                # We check that the startup name is not empty and unique
+                if startup_name and not self.chain_index.is_taken("startup", startup_name):
+                    # We check that the required amount of funds in dollars is positive and does not exceed the maximum number of coins
+                    if 0 < required_funds <= MAX_SUPPLY:
+                        # We check that the sender has enough funds to pay the commission for adding a startup to the block
+                        if self.get_available_balance(sender) >= STARTUP_FEE:
+                            # Creating a dictionary with startup data
+                            startup_data = {
+                                "startup_name": startup_name,
+                                "startup_description": startup_description,
+                                "startup_date": startup_date,
+                                "fundraising_date": fundraising_date,
+                                "investment_offer": investment_offer,
+                                "nft_info": nft_info,
+                                "required_funds": required_funds,
+                                "token_name": token_name,
+                                "dapp_name": dapp_name,
+                                "dapp_url": dapp_url
+                            }
+                            # We create a transaction that sends a commission to the burning address and adds data about the startup to the block
+                            transaction = Transaction(sender, BURN_ADDRESS, 0, STARTUP_FEE, startup_data)
+                            # Adding a transaction to the list of pending transactions
+                            error = self.add_pending_transaction(transaction)
+                            # Return an error message if the transaction was not accepted
+                            if error:
+                                return error
+                            # Returning the transaction hash
+                            return transaction.hash
+                        else:
+                            # Return an error message if there are insufficient funds
+                            return "Insufficient funds"
+                    else:
+                        # Return an error message if the required amount of funds is incorrect
+                        return "Invalid required funds"
+                else:
+                    # Return an error message if the startup name is empty or not unique
+                    return "Invalid or duplicate startup name"
+            else:
+                # Return an error message if the sender address is incorrect
+                return "Invalid sender address"
+
+    # Method to get startup by name
+    def get_startup_by_name(self, startup_name):
+        # We look up the startup in the index
+        return self.chain_index.get_entity("startup", startup_name)
+
+    # Method for creating a new NFT into a block
+    def create_nft(self, sender, nft_name, nft_description, nft_image, nft_price, nft_owner):
+        with self.commit():
+            # Checking that the sender has the correct address format
+            if len(sender) == 64:
+                # Checking that the NFT name is not empty and unique
+                if nft_name and not self.chain_index.is_taken("nft", nft_name):
+                    # We check that the NFT price is positive and does not exceed the maximum number of coins
+                    if 0 < nft_price <= MAX_SUPPLY:
+                        # We check that the sender has enough funds to pay the fee for adding the NFT to the block
+                        if self.get_available_balance(sender) >= NFT_FEE:
+                            # Creating a dictionary with NFT data
+                            nft_data = {
+                                "nft_name": nft_name,
+                                "nft_description": nft_description,
+                                "nft_image": nft_image,
+                                "nft_price": nft_price,
+                                "nft_owner": nft_owner
+                            }
+                            # Create a transaction that sends a fee to the burn address and adds NFT data to the block
+                            transaction = Transaction(sender, BURN_ADDRESS, 0, NFT_FEE, nft_data)
+                            # Adding a transaction to the list of pending transactions
+                            error = self.add_pending_transaction(transaction)
+                            # Return an error message if the transaction was not accepted
+                            if error:
+                                return error
+                            # Returning the transaction hash
+                            return transaction.hash
+                        else:
+                            # Return an error message if there are insufficient funds
+                            return "Insufficient funds"
+                    else:
+                        # Returning an error message if the NFT price is incorrect
+                        return "Invalid nft price"
+                else:
+                    # Return an error message if the NFT name is empty or not unique
+                    return "Invalid or duplicate nft name"
+            else:
+                # Return an error message if the sender address is incorrect
+                return "Invalid sender address"
+
+    # Method to get NFT by name
+    def get_nft_by_name(self, nft_name):
+        # We look up the NFT in the index
+        return self.chain_index.get_entity("nft", nft_name)
+
+    # Method for creating a new token in a block
+    def create_token(self, sender, token_name, token_symbol, token_supply, token_price, token_owner):
+        with self.commit():
+            # Checking that the sender has the correct address format
+            if len(sender) == 64:
+                # We check that the name and symbol of the token are not empty and unique
+                if token_name and token_symbol and not self.chain_index.is_taken("token", token_name) and not self.chain_index.is_taken("token_symbol", token_symbol):
+                    # We check that the total quantity and price of the token are positive and do not exceed the maximum number of coins
+                    if 0 < token_supply <= MAX_SUPPLY and 0 < token_price <= MAX_SUPPLY:
+                        # We check that the sender has enough funds to pay the commission for adding the token to the block
+                        if self.get_available_balance(sender) >= TOKEN_FEE:
+                            # Create a dictionary with token data
+                            token_data = {
+                                "token_name": token_name,
+                                "token_symbol": token_symbol,
+                                "token_supply": token_supply,
+                                "token_price": token_price,
+                                "token_owner": token_owner
+                            }
+                            # Create a transaction that sends a commission to the burn address and adds token data to the block
+                            transaction = Transaction(sender, BURN_ADDRESS, 0, TOKEN_FEE, token_data)
+                            # Adding a transaction to the list of pending transactions
+                            error = self.add_pending_transaction(transaction)
+                            # Return an error message if the transaction was not accepted
+                            if error:
+                                return error
+                            # Returning the transaction hash
+
+                            return transaction.hash
+                        else:
+                            # Return an error message if there are insufficient funds
+                            return "Insufficient funds"
+                    else:
+                        # Return an error message if the total supply or price of a token is incorrect
+                        return "Invalid token supply or price"
+                else:
+                    # Return an error message if the token name or symbol is empty or not unique
+                    return "Invalid or duplicate token name or symbol"
+            else:
+                # Return an error message if the sender address is incorrect
+                return "Invalid sender address"
+
+    # Method for getting a token by name
+    def get_token_by_name(self, token_name):
+        # We look up the token in the index
+        return self.chain_index.get_entity("token", token_name)
+
+    # Method for getting a token by symbol
+    def get_token_by_symbol(self, token_symbol):
+        # We look up the token in the index
+        return self.chain_index.get_entity("token_symbol", token_symbol)
+
+    # Method for creating a new DApp in a block
+    def create_dapp(self, sender, dapp_name, dapp_description, dapp_url, dapp_owner):
+        with self.commit():
+            # Checking that the sender has the correct address format
+            if len(sender) == 64:
+                # Checking that the DApp name is not empty and unique
+                if dapp_name and not self.chain_index.is_taken("dapp", dapp_name):
+                    # Checking that the DApp URL is in the correct format
+                    if dapp_url.startswith("http://") or dapp_url.startswith("https://"):
+                        # We check that the sender has enough funds to pay the commission for adding the DApp to the block
+                        if self.get_available_balance(sender) >= DAPP_FEE:
+                            # Creating a dictionary with data about DApp
+                            dapp_data = {
+                                "dapp_name": dapp_name,
+                                "dapp_description": dapp_description,
+                                "dapp_url": dapp_url,
+                                "dapp_owner": dapp_owner
+                            }
+                            # Create a transaction that sends a commission to the burn address and adds data about the DApp to the block
+                            transaction = Transaction(sender, BURN_ADDRESS, 0, DAPP_FEE, dapp_data)
+                            # Adding a transaction to the list of pending transactions
+                            error = self.add_pending_transaction(transaction)
+                            # Return an error message if the transaction was not accepted
+                            if error:
+                                return error
+                            # Returning the transaction hash
+                            return transaction.hash
+                        else:
+                            # Return an error message if there are insufficient funds
+                            return "Insufficient funds"
+                    else:
+                        # Return an error message if the DApp URL is incorrect
+                        return "Invalid dapp url"
+                else:
+                    # Return an error message if the DApp name is empty or not unique
+                    return "Invalid or duplicate dapp name"
+            else:
+                # Return an error message if the sender address is incorrect
+                return "Invalid sender address"
+
+    # Method to get DApp by name
+    def get_dapp_by_name(self, dapp_name):
+        # We look up the DApp in the index
+        return self.chain_index.get_entity("dapp", dapp_name)
+
+    # Method for receiving a transaction by hash
+    def get_transaction_by_hash(self, transaction_hash):
+        def build():
+            # We look up the location of the transaction in the index
+            location = self.chain_index.get_transaction_location(transaction_hash)
+            # Return None if transaction not found
+            if location is None:
+                return None
+            # Returning the transaction from its block
+            height, position = location
+            return self.chain[height].transactions[position]
+        return self.read(build)
+
+    # Method for getting the inclusion proof of a transaction for light clients
+    def get_transaction_proof(self, transaction_hash):
+        def build():
+            # We look up the location of the transaction in the index
+            location = self.chain_index.get_transaction_location(transaction_hash)
+            # Return None if transaction not found
+            if location is None:
+                return None
+            height, position = location
+            block = self.chain[height]
+            # Returning the block header and the path from the transaction to its Merkle root
+            return {"header": block.get_header(), "proof": MerkleTree([transaction.hash for transaction in block.transactions]).get_proof(position)}
+        return self.read(build)
+
+    # Method to get a page of the transactions of an address from the newest to the oldest, the cursor of the next page continues after the last one
+    def get_history(self, address, cursor=None, limit=HISTORY_PAGE_SIZE, kind=None):
+        # Return an error message if the filter or the page size is incorrect
+        if kind is not None and kind not in ENTITY_KINDS:
+            return "Invalid kind"
+        if not isinstance(limit, int) or limit <= 0:
+            return "Invalid limit"
+        # The cursor is the height and the position of the last transaction of the previous page
+        if cursor is not None:
+            try:
+                cursor = tuple(int(part) for part in cursor.split(":"))
+            except (AttributeError, ValueError):
+                return "Invalid cursor"
+            if len(cursor) != 2:
+                return "Invalid cursor"
+        def build():
+            locations = self.chain_index.get_address_locations(address, kind)
+            # We find the end of the page by the cursor in the sorted locations, so the time does not depend on the length of the history
+            end = len(locations) if cursor is None else bisect.bisect_left(locations, cursor)
+            start = max(end - limit, 0)
+            page = locations[start:end]
+            return {
+                "transactions": [{"height": height, "position": position, "transaction": self.chain[height].transactions[position]} for height, position in reversed(page)],
+                "next_cursor": f"{page[0][0]}:{page[0][1]}" if start > 0 else None
+            }
+        return self.read(build)
+
+    # Method for transferring coins between addresses
+    def transfer_coins(self, sender, recipient, amount, fee):
+        with self.commit():
+            # Checking that the sender and recipient have the correct address format
+            if len(sender) == 64 and len(recipient) == 64:
+                # We check that the amount and commission are non-negative and do not exceed the maximum number of coins
+                if 0 <= amount <= MAX_SUPPLY and 0 <= fee <= MAX_SUPPLY:
+                    # We check that the sender has sufficient funds for the transfer
+                    if self.get_available_balance(sender) >= amount + fee:
+                        # Create a new transaction
+                        transaction = Transaction(sender, recipient, amount, fee, None)
+                        # Add it to the list of pending transactions
+                        error = self.add_pending_transaction(transaction)
+                        # Return an error message if the transaction was not accepted
+                        if error:
+                            return error
+                        # Returning the transaction hash
+                        return transaction.hash
+                    else:
+                        # Return an error message if there are insufficient funds
+                        return "Insufficient funds"
+                else:
+                    # We return an error message if the amount or commission is incorrect
+                    return "Invalid amount or fee"
+            else:
+                # Return an error message if the addresses are incorrect
+                return "Invalid sender or recipient address"
+
+    # Method for submitting a batch of transfers given as (sender, recipient, amount, fee) and getting the result of each of them
+    # A transaction has no nonce and the mempool keys on its hash, so a row identical to an earlier row of the batch gets "Duplicate transaction"
+    def submit_batch(self, transfers):
+        with self.commit():
+            count = len(transfers)
+            # An item that is not a (sender, recipient, amount, fee) sequence is rejected alone, the other items of the batch are still settled
+            valid_items = np.fromiter((isinstance(transfer, (tuple, list)) and len(transfer) == 4 for transfer in transfers), dtype=bool, count=count)
+            transfers = [transfer if valid_items[i] else (None, None, None, None) for i, transfer in enumerate(transfers)]
+            # One pass coerces every field to a number: the lengths of the addresses, -1 for addresses that are not strings, and the amounts and commissions, NaN for values that are not numbers
+            fields = np.array([(len(sender) if isinstance(sender, str) else -1, len(recipient) if isinstance(recipient, str) else -1, coin_to_float(amount), coin_to_float(fee)) for sender, recipient, amount, fee in transfers], dtype=np.float64).reshape(count, 4)
+            sender_lengths, recipient_lengths, amounts, fees = fields.T
+            # We check the lengths of all addresses at once
+            valid_addresses = (sender_lengths == 64) & (recipient_lengths == 64)
+            # We check the ranges of all amounts and commissions at once, NaN fails every comparison
+            valid_amounts = (amounts >= 0) & (amounts <= MAX_SUPPLY) & (fees >= 0) & (fees <= MAX_SUPPLY)
+            # We take one snapshot of the available balances of the senders with valid addresses
+            available = {sender: self.get_available_balance(sender) for sender in {transfer[0] for i, transfer in enumerate(transfers) if valid_addresses[i]}}
+            results = []
+            # We settle the transfers in order, so that each sender's transfers are applied one after another
+            for i, (sender, recipient, amount, fee) in enumerate(transfers):
+                if not valid_items[i]:
+                    results.append("Invalid transfer")
+                elif not valid_addresses[i]:
+                    results.append("Invalid sender or recipient address")
+                elif not valid_amounts[i]:
+                    results.append("Invalid amount or fee")
+                elif available[sender] < amount + fee:
+                    results.append("Insufficient funds")
+                else:
+                    # Create a new transaction and add it to the list of pending transactions
+                    transaction = Transaction(sender, recipient, amount, fee, None)
+                    error = self.add_pending_transaction(transaction)
+                    if error:
+                        results.append(error)
+                    else:
+                        # We reduce the snapshot balance of the sender
+                        available[sender] -= amount + fee
+                        results.append(transaction.hash)
+            # Returning the transaction hash or an error message for every transfer
+            return results
+
+# Defining the class of a cache shared by threads that forgets the least recently used entries when it holds too many entries or bytes
+class ByteCache:
+    # Class constructor
+    def __init__(self, max_entries, max_bytes):
+        self.entries = collections.OrderedDict() # value and size of every entry, from the least recently used
+        self.max_entries = max_entries # maximum number of entries
+        self.max_bytes = max_bytes # maximum total size of the entries in bytes
+        self.size = 0 # total size of the entries in bytes
+        self.lock = threading.Lock() # lock for the entries, which are used by several threads
+
+    # Method to get the value of an entry, or None if it is not in the cache
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    # Method for adding an entry of the given size, values larger than the whole cache are not kept
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self.entries[key] = (value, size)
+            self.size += size
+            # We forget the entries that were used the longest time ago
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self.size -= self.entries.popitem(last=False)[1][1]
+
+    # Method for removing all entries
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    # Method to get the number of entries
+    def __len__(self):
+        return len(self.entries)
+
+# Defining the HTTP server class that serves the chain of a node
+class NodeServer:
+    # Class constructor
+    def __init__(self, blockchain, host=NODE_HOST, port=NODE_PORT):
+        self.blockchain = blockchain # blockchain being served
+        self.host = host # address on which the server listens
+        self.port = port # port on which the server listens
+        self.block_cache = ByteCache(SERIALIZED_BLOCK_CACHE_SIZE, SERIALIZED_BLOCK_CACHE_BYTES) # recently serialized blocks by hash and format
+        self.response_cache = ByteCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_BYTES) # ready responses by last block, path and compression
+        self.cache_tip = None # hash of the last block for which the responses were cached
+        self.runner = None # runner of the started server
+
+    # Method for creating the web application with all endpoints
+    def create_app(self):
+        app = web.Application()
+        app.router.add_get("/height", self.get_height)
+        app.router.add_get("/chain", self.get_chain)
+        app.router.add_get("/headers", self.get_headers)
+        app.router.add_get("/blocks", self.get_blocks)
+        app.router.add_get("/blocks/{hash}", self.get_block)
+        app.router.add_get("/balance/{address}", self.get_balance)
+        app.router.add_get("/supply", self.get_supply)
+        app.router.add_get("/history/{address}", self.get_history)
+        app.router.add_post("/transactions", self.submit_transactions)
+        return app
+
+    # Method for running blocking work in a thread of the pool, so that the event loop keeps serving other requests
+    @staticmethod
+    async def run_blocking(function, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    # Method to get a block serialized as JSON or in binary form, each block is serialized only once
+    def serialize_block(self, block, format):
+        key = (block.hash, format)
+        data = self.block_cache.get(key)
+        if data is None:
+            data = block.to_json().encode() if format == "json" else block.to_bytes()
+            self.block_cache.put(key, data, len(data))
+        return data
+
+    # Method for creating a response, which is compressed if the client accepts it and is not sent again if the client has it
+    def make_response(self, request, status, content_type, body, etag=None, compressed=None):
+        headers = {"Vary": "Accept-Encoding"}
+        if etag is not None:
+            headers["ETag"] = etag
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers=headers)
+        if compressed is None and "gzip" in request.headers.get("Accept-Encoding", "") and len(body) >= GZIP_MIN_SIZE:
+            body, compressed = gzip.compress(body), True
+        if compressed:
+            headers["Content-Encoding"] = "gzip"
+        return web.Response(status=status, body=body, content_type=content_type, headers=headers)
+
+    # Method for answering a request from the responses cached for the last block, building and compressing the response only once
+    def cached_response(self, request, build):
+        tip_hash = self.blockchain.get_last_block().hash
+        # A new last block makes all cached responses outdated, the responses for the old block that other threads still add are never used
+        if tip_hash != self.cache_tip:
+            self.response_cache.clear()
+            self.cache_tip = tip_hash
+        # The tag changes with the last block, so clients can keep their copy until a new block arrives
+        etag = '"' + hashlib.sha256((tip_hash + request.path_qs).encode()).hexdigest()[:32] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return self.make_response(request, 304, None, b"", etag)
+        compress = "gzip" in request.headers.get("Accept-Encoding", "")
+        key = (tip_hash, request.path_qs, compress)
+        entry = self.response_cache.get(key)
+        if entry is None:
+            # The response is built from one consistent state of the chain, together with the hash of its last block
+            built_tip_hash, (status, content_type, body) = self.blockchain.read(lambda: (self.blockchain.get_last_block().hash, build()))
+            compressed = compress and len(body) >= GZIP_MIN_SIZE
+            entry = (status, content_type, gzip.compress(body) if compressed else body, compressed)
+            # A response built after a new block arrived is sent with the tag of that block and is not cached for the old one
+            if built_tip_hash != tip_hash:
+                etag = '"' + hashlib.sha256((built_tip_hash + request.path_qs).encode()).hexdigest()[:32] + '"'
+            else:
+                self.response_cache.put(key, entry, len(entry[2]))
+        status, content_type, body, compressed = entry
+        return self.make_response(request, status, content_type, body, etag, compressed)
+
+    # Method for reading the start and the number of blocks from the query of a request
+    def get_range(self, request, default_limit):
+        start = int(request.query.get("from", 0))
+        limit = int(request.query.get("limit", default_limit))
+        if start < 0 or limit < 0:
+            raise ValueError("negative range")
+        return start, min(limit, MAX_CHAIN_PAGE_SIZE)
+
+    # Method for encoding a JSON answer with its status
+    @staticmethod
+    def json_answer(data, status=200):
+        return status, "application/json", json.dumps(data).encode()
+
+    # Endpoint with the height, the hash of the last block and the total work of the chain
+    async def get_height(self, request):
+        def build():
+            return self.json_answer({"height": len(self.blockchain.chain) - 1, "tip_hash": self.blockchain.get_last_block().hash, "work": self.blockchain.ledger.get_work()})
+        return await self.run_blocking(self.cached_response, request, build)
+
+    # Endpoint with a page of blocks as JSON
+    async def get_chain(self, request):
+        def build():
+            try:
+                start, limit = self.get_range(request, CHAIN_PAGE_SIZE)
+            except ValueError:
+                return self.json_answer({"error": "Invalid range"}, 400)
+            chain = self.blockchain.chain
+            # The page is assembled from the blocks serialized earlier
+            blocks = b",".join(self.serialize_block(block, "json") for block in chain[start:start + limit])
+            return 200, "application/json", b'{"length": ' + str(len(chain)).encode() + b', "chain": [' + blocks + b"]}"
+        return await self.run_blocking(self.cached_response, request, build)
+
+    # Endpoint with the headers that follow the last common block with a locator
+    async def get_headers(self, request):
+        def build():
+            try:
+                limit = min(int(request.query.get("limit", HEADERS_BATCH_SIZE)), HEADERS_BATCH_SIZE)
+            except ValueError:
+                return self.json_answer({"error": "Invalid limit"}, 400)
+            return self.json_answer(self.blockchain.get_headers(request.query.get("locator", "").split(","), limit))
+        return await self.run_blocking(self.cached_response, request, build)
+
+    # Endpoint with a range of blocks in binary form
+    async def get_blocks(self, request):
+        def build():
+            try:
+                start, limit = self.get_range(request, BLOCKS_BATCH_SIZE)
+            except ValueError:
+                return self.json_answer({"error": "Invalid range"}, 400)
+            output = bytearray()
+            for block in self.blockchain.chain[start:start + limit]:
+                data = self.serialize_block(block, "binary")
+                output += UINT32.pack(len(data))
+                output += data
+            return 200, "application/octet-stream", bytes(output)
+        return await self.run_blocking(self.cached_response, request, build)
+
+    # Endpoint with one block as JSON by its hash
+    async def get_block(self, request):
+        def build():
+            height = self.blockchain.chain_index.get_block_height(request.match_info["hash"])
+            if height is None:
+                return self.json_answer({"error": "Block not found"}, 404)
+            return 200, "application/json", self.serialize_block(self.blockchain.chain[height], "json")
+        return await self.run_blocking(self.cached_response, request, build)
+
+    # Endpoint with the mined, burned and circulating coins at the height given in the query or after the last block
+    async def get_supply(self, request):
+        def build():
+            try:
+                height = int(request.query["height"]) if "height" in request.query else None
+            except ValueError:
+                return self.json_answer({"error": "Invalid height"}, 400)
+            supply = self.blockchain.ledger.get_supply(height)
+            if supply is None:
+                return self.json_answer({"error": "Height not found"}, 404)
+            return self.json_answer(supply)
+        return await self.run_blocking(self.cached_response, request, build)
+
+    # Endpoint with a page of the transactions of an address
+    async def get_history(self, request):
+        def build():
+            try:
+                limit = min(int(request.query.get("limit", HISTORY_PAGE_SIZE)), MAX_CHAIN_PAGE_SIZE)
+            except ValueError:
+                return self.json_answer({"error": "Invalid limit"}, 400)
+            history = self.blockchain.get_history(request.match_info["address"], request.query.get("cursor"), limit, request.query.get("kind"))
+            if isinstance(history, str):
+                return self.json_answer({"error": history}, 400)
+            for entry in history["transactions"]:
+                entry["transaction"] = entry["transaction"].to_dict()
+            return self.json_answer(history)
+        return await self.run_blocking(self.cached_response, request, build)
+
+    # Endpoint with the balance of an address, which also depends on the pending transactions and therefore is not cached
+    async def get_balance(self, request):
+        address = request.match_info["address"]
+        def build():
+            return self.json_answer({"address": address, "balance": self.blockchain.get_balance(address), "available_balance": self.blockchain.get_available_balance(address)})
+        status, content_type, body = await self.run_blocking(build)
+        return self.make_response(request, status, content_type, body)
+
+    # Endpoint for submitting a transfer or a list of transfers with the fields sender, recipient, amount and fee
+    async def submit_transactions(self, request):
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        # The transfers are checked and added to the pool in a thread of the pool
+        def build():
+            try:
+                if isinstance(data, list):
+                    # A list of transfers is submitted as one batch, and the result of every transfer is returned, items that are not objects get their own error
+                    return self.json_answer({"results": self.blockchain.submit_batch([(transfer.get("sender"), transfer.get("recipient"), transfer.get("amount"), transfer.get("fee")) if isinstance(transfer, dict) else None for transfer in data])})
+                result = self.blockchain.transfer_coins(data["sender"], data["recipient"], data["amount"], data["fee"])
+                # The transfer was accepted if the hash of its transaction was returned instead of an error message, even if a new block has already taken it from the pool
+                if result == Transaction(data["sender"], data["recipient"], data["amount"], data["fee"], None).hash:
+                    return self.json_answer({"hash": result}, 201)
+                return self.json_answer({"error": result}, 400)
+            except (ValueError, TypeError, KeyError):
+                return self.json_answer({"error": "Invalid transaction"}, 400)
+        status, content_type, body = await self.run_blocking(build)
+        return self.make_response(request, status, content_type, body)
+
+    # Method for starting the server in a running event loop
+    async def start(self):
+        self.runner = web.AppRunner(self.create_app())
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    # Method for stopping the server
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    # Method for running the server until it is interrupted
+    def run(self):
+        web.run_app(self.create_app(), host=self.host, port=self.port)
+
+# Creating a Blockchain Instance, kept on disk if a directory is given in the environment
+up_chain = Blockchain(os.environ.get("UPCHAIN_DATA_DIR"))
+
+# Running the node server when the module is started as a program
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a node of the blockchain")
+    parser.add_argument("--data-dir", default=os.environ.get("UPCHAIN_DATA_DIR", DATA_DIR), help="directory of the block store and the snapshots, so that the node keeps its chain after a restart")
+    parser.add_argument("--host", default=NODE_HOST, help="address on which the node server listens")
+    parser.add_argument("--port", type=int, default=NODE_PORT, help="port on which the node server listens")
+    arguments = parser.parse_args()
+    # The node started as a program always keeps its chain on disk
+    if arguments.data_dir != up_chain.data_dir:
+        up_chain = Blockchain(arguments.data_dir)
+    NodeServer(up_chain, arguments.host, arguments.port).run()